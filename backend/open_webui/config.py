@@ -4,6 +4,8 @@ import os
 import shutil
 import base64
 import redis
+import threading
+import time
 
 from datetime import datetime
 from pathlib import Path
@@ -252,18 +254,66 @@ class PersistentConfig(Generic[T]):
 
 
 class AppConfig:
+    """
+    Process-local view of the persistent config.
+
+    Reads are served from memory. With Redis, every change is stored under
+    `open-webui:config:{key}` and announced on the `open-webui:config` channel, and a
+    listener thread refreshes the changed keys on all instances. Keys are loaded from
+    Redis on first read and resynchronized whenever the listener (re)subscribes.
+    """
+
     _state: dict[str, PersistentConfig]
     _redis: Optional[redis.Redis] = None
+    _synced: set[str]
 
     def __init__(
         self, redis_url: Optional[str] = None, redis_sentinels: Optional[list] = []
     ):
         super().__setattr__("_state", {})
+        super().__setattr__("_synced", set())
         if redis_url:
             super().__setattr__(
                 "_redis",
                 get_redis_connection(redis_url, redis_sentinels, decode_responses=True),
             )
+            threading.Thread(target=self._listen, daemon=True).start()
+
+    def _sync_from_redis(self, keys: list[str]):
+        redis_values = self._redis.mget([f"open-webui:config:{key}" for key in keys])
+
+        for key, redis_value in zip(keys, redis_values):
+            self._synced.add(key)
+            if redis_value is None:
+                continue
+
+            try:
+                decoded_value = json.loads(redis_value)
+
+                # Update the in-memory value if different
+                if self._state[key].value != decoded_value:
+                    self._state[key].value = decoded_value
+                    log.info(f"Updated {key} from Redis: {decoded_value}")
+
+            except json.JSONDecodeError:
+                log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe("open-webui:config")
+
+                # Catch up on changes published while not subscribed
+                if self._state:
+                    self._sync_from_redis(list(self._state.keys()))
+
+                for message in pubsub.listen():
+                    if message["type"] == "message" and message["data"] in self._state:
+                        self._sync_from_redis([message["data"]])
+            except Exception as e:
+                log.error(f"Config listener disconnected from Redis: {e}")
+                time.sleep(1)
 
     def __setattr__(self, key, value):
         if isinstance(value, PersistentConfig):
@@ -275,27 +325,18 @@ class AppConfig:
             if self._redis:
                 redis_key = f"open-webui:config:{key}"
                 self._redis.set(redis_key, json.dumps(self._state[key].value))
+                self._redis.publish("open-webui:config", key)
 
     def __getattr__(self, key):
         if key not in self._state:
             raise AttributeError(f"Config key '{key}' not found")
 
-        # If Redis is available, check for an updated value
-        if self._redis:
-            redis_key = f"open-webui:config:{key}"
-            redis_value = self._redis.get(redis_key)
-
-            if redis_value is not None:
-                try:
-                    decoded_value = json.loads(redis_value)
-
-                    # Update the in-memory value if different
-                    if self._state[key].value != decoded_value:
-                        self._state[key].value = decoded_value
-                        log.info(f"Updated {key} from Redis: {decoded_value}")
-
-                except json.JSONDecodeError:
-                    log.error(f"Invalid JSON format in Redis for {key}: {redis_value}")
+        # Later changes are pushed by the listener
+        if self._redis and key not in self._synced:
+            try:
+                self._sync_from_redis([key])
+            except Exception as e:
+                log.error(f"Error reading {key} from Redis: {e}")
 
         return self._state[key].value
 
@@ -735,6 +776,23 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Size in MB of the local copies kept of the files in S3, GCS or Azure storage, per worker
+try:
+    STORAGE_CACHE_MAX_SIZE = int(os.environ.get("STORAGE_CACHE_MAX_SIZE", "1024"))
+except ValueError:
+    STORAGE_CACHE_MAX_SIZE = 1024
+
+# How the content of files in S3, GCS or Azure storage is served: "local" from a local
+# copy, "stream" straight from the storage, or "redirect" to a presigned URL
+STORAGE_DELIVERY_MODE = os.environ.get("STORAGE_DELIVERY_MODE", "local")
+
+try:
+    STORAGE_PRESIGNED_URL_EXPIRES = int(
+        os.environ.get("STORAGE_PRESIGNED_URL_EXPIRES", "300")
+    )
+except ValueError:
+    STORAGE_PRESIGNED_URL_EXPIRES = 300
+
 ####################################
 # File Upload DIR
 ####################################
@@ -819,6 +877,23 @@ OLLAMA_API_CONFIGS = PersistentConfig(
     {},
 )
 
+# One of "random", "least_in_flight", "ewma", "weighted" or "consistent_hash"
+OLLAMA_LOAD_BALANCING_STRATEGY = os.environ.get(
+    "OLLAMA_LOAD_BALANCING_STRATEGY", "least_in_flight"
+)
+
+try:
+    OLLAMA_BACKEND_MAX_FAILURES = int(
+        os.environ.get("OLLAMA_BACKEND_MAX_FAILURES", "3")
+    )
+except Exception:
+    OLLAMA_BACKEND_MAX_FAILURES = 3
+
+try:
+    OLLAMA_BACKEND_COOLDOWN = float(os.environ.get("OLLAMA_BACKEND_COOLDOWN", "30"))
+except Exception:
+    OLLAMA_BACKEND_COOLDOWN = 30.0
+
 ####################################
 # OPENAI_API
 ####################################
@@ -1595,6 +1670,9 @@ Ensure that the tools are effectively utilized to achieve the highest-quality an
 
 VECTOR_DB = os.environ.get("VECTOR_DB", "chroma")
 
+# Persistent BM25 indexes used by hybrid search
+BM25_INDEX_DIR = os.environ.get("BM25_INDEX_DIR", f"{DATA_DIR}/bm25")
+
 # Chroma
 CHROMA_DATA_PATH = f"{DATA_DIR}/vector_db"
 
@@ -1832,6 +1910,32 @@ RAG_EMBEDDING_PREFIX_FIELD_NAME = os.environ.get(
     "RAG_EMBEDDING_PREFIX_FIELD_NAME", None
 )
 
+ENABLE_RAG_EMBEDDING_CACHE = (
+    os.environ.get("ENABLE_RAG_EMBEDDING_CACHE", "True").lower() == "true"
+)
+
+RAG_EMBEDDING_CACHE_DIR = os.environ.get(
+    "RAG_EMBEDDING_CACHE_DIR", f"{CACHE_DIR}/embeddings"
+)
+
+# Size in MB of the local embedding cache
+try:
+    RAG_EMBEDDING_CACHE_MAX_SIZE = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_MAX_SIZE", "1024")
+    )
+except Exception:
+    RAG_EMBEDDING_CACHE_MAX_SIZE = 1024
+
+# Optional shared cache, eviction is left to the Redis maxmemory policy
+RAG_EMBEDDING_CACHE_REDIS_URL = os.environ.get("RAG_EMBEDDING_CACHE_REDIS_URL", "")
+
+try:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = int(
+        os.environ.get("RAG_EMBEDDING_CACHE_REDIS_TTL", str(60 * 60 * 24 * 30))
+    )
+except Exception:
+    RAG_EMBEDDING_CACHE_REDIS_TTL = 60 * 60 * 24 * 30
+
 RAG_RERANKING_MODEL = PersistentConfig(
     "RAG_RERANKING_MODEL",
     "rag.reranking_model",
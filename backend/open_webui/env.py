@@ -310,6 +310,21 @@ else:
     except Exception:
         DATABASE_POOL_RECYCLE = 3600
 
+# Threads used to run synchronous database calls off the event loop
+DATABASE_EXECUTOR_MAX_WORKERS = os.environ.get("DATABASE_EXECUTOR_MAX_WORKERS", 16)
+
+if DATABASE_EXECUTOR_MAX_WORKERS == "":
+    DATABASE_EXECUTOR_MAX_WORKERS = 16
+else:
+    try:
+        DATABASE_EXECUTOR_MAX_WORKERS = int(DATABASE_EXECUTOR_MAX_WORKERS)
+    except Exception:
+        DATABASE_EXECUTOR_MAX_WORKERS = 16
+
+ENABLE_ASYNC_DATABASE = (
+    os.environ.get("ENABLE_ASYNC_DATABASE", "False").lower() == "true"
+)
+
 RESET_CONFIG_ON_START = (
     os.environ.get("RESET_CONFIG_ON_START", "False").lower() == "true"
 )
@@ -318,6 +333,21 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Realtime saves are coalesced and flushed once either window is exceeded
+REALTIME_CHAT_SAVE_INTERVAL = os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1")
+
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = float(REALTIME_CHAT_SAVE_INTERVAL)
+except Exception:
+    REALTIME_CHAT_SAVE_INTERVAL = 1.0
+
+REALTIME_CHAT_SAVE_MAX_BYTES = os.environ.get("REALTIME_CHAT_SAVE_MAX_BYTES", "4096")
+
+try:
+    REALTIME_CHAT_SAVE_MAX_BYTES = int(REALTIME_CHAT_SAVE_MAX_BYTES)
+except Exception:
+    REALTIME_CHAT_SAVE_MAX_BYTES = 4096
+
 ####################################
 # REDIS
 ####################################
@@ -372,6 +402,21 @@ WEBUI_AUTH_COOKIE_SECURE = (
 if WEBUI_AUTH and WEBUI_SECRET_KEY == "":
     raise ValueError(ERROR_MESSAGES.ENV_VAR_NOT_FOUND)
 
+# Users resolved from a token or API key are cached for this many seconds, 0 disables
+AUTH_PRINCIPAL_CACHE_TTL = os.environ.get("AUTH_PRINCIPAL_CACHE_TTL", "30")
+
+try:
+    AUTH_PRINCIPAL_CACHE_TTL = int(AUTH_PRINCIPAL_CACHE_TTL)
+except Exception:
+    AUTH_PRINCIPAL_CACHE_TTL = 30
+
+AUTH_PRINCIPAL_CACHE_MAX_SIZE = os.environ.get("AUTH_PRINCIPAL_CACHE_MAX_SIZE", "10000")
+
+try:
+    AUTH_PRINCIPAL_CACHE_MAX_SIZE = int(AUTH_PRINCIPAL_CACHE_MAX_SIZE)
+except Exception:
+    AUTH_PRINCIPAL_CACHE_MAX_SIZE = 10000
+
 ENABLE_WEBSOCKET_SUPPORT = (
     os.environ.get("ENABLE_WEBSOCKET_SUPPORT", "True").lower() == "true"
 )
@@ -408,6 +453,182 @@ else:
     except Exception:
         AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST = 10
 
+AIOHTTP_CLIENT_LIMIT_PER_HOST = os.environ.get("AIOHTTP_CLIENT_LIMIT_PER_HOST", "100")
+
+try:
+    AIOHTTP_CLIENT_LIMIT_PER_HOST = int(AIOHTTP_CLIENT_LIMIT_PER_HOST)
+except Exception:
+    AIOHTTP_CLIENT_LIMIT_PER_HOST = 100
+
+AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = os.environ.get(
+    "AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30"
+)
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT)
+except Exception:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+
+AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH = os.environ.get(
+    "AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH", "10"
+)
+
+if AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH == "":
+    AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH = None
+else:
+    try:
+        AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH = int(AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH)
+    except Exception:
+        AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH = 10
+
+# Concurrent requests sent to a single web search engine
+WEB_SEARCH_ENGINE_CONCURRENCY = os.environ.get("WEB_SEARCH_ENGINE_CONCURRENCY", "4")
+
+try:
+    WEB_SEARCH_ENGINE_CONCURRENCY = max(int(WEB_SEARCH_ENGINE_CONCURRENCY), 1)
+except Exception:
+    WEB_SEARCH_ENGINE_CONCURRENCY = 4
+
+####################################
+# USER ACTIVITY
+####################################
+
+# Last active timestamps are rounded to this many seconds and written in batches
+USER_LAST_ACTIVE_PRECISION = os.environ.get("USER_LAST_ACTIVE_PRECISION", "60")
+
+try:
+    USER_LAST_ACTIVE_PRECISION = max(int(USER_LAST_ACTIVE_PRECISION), 1)
+except Exception:
+    USER_LAST_ACTIVE_PRECISION = 60
+
+####################################
+# FUNCTION EXECUTION
+####################################
+
+# Threads running synchronous pipes, filters, actions and tools off the event loop
+FUNCTION_EXECUTOR_MAX_WORKERS = os.environ.get("FUNCTION_EXECUTOR_MAX_WORKERS", "32")
+
+try:
+    FUNCTION_EXECUTOR_MAX_WORKERS = int(FUNCTION_EXECUTOR_MAX_WORKERS)
+except Exception:
+    FUNCTION_EXECUTOR_MAX_WORKERS = 32
+
+# Concurrent calls allowed per function, so one slow function can't take every thread
+FUNCTION_MAX_CONCURRENCY = os.environ.get("FUNCTION_MAX_CONCURRENCY", "8")
+
+try:
+    FUNCTION_MAX_CONCURRENCY = max(int(FUNCTION_MAX_CONCURRENCY), 1)
+except Exception:
+    FUNCTION_MAX_CONCURRENCY = 8
+
+# Seconds a synchronous handler may run, async handlers are not bounded
+FUNCTION_TIMEOUT = os.environ.get("FUNCTION_TIMEOUT", "300")
+
+if FUNCTION_TIMEOUT == "":
+    FUNCTION_TIMEOUT = None
+else:
+    try:
+        FUNCTION_TIMEOUT = float(FUNCTION_TIMEOUT)
+    except Exception:
+        FUNCTION_TIMEOUT = 300.0
+
+# Load the modules of all active functions at startup instead of on first use
+ENABLE_FUNCTION_PREWARM = (
+    os.environ.get("ENABLE_FUNCTION_PREWARM", "True").lower() == "true"
+)
+
+####################################
+# MODEL LIST CACHE
+####################################
+
+# Upstream model lists younger than the TTL are served as is, older ones are served
+# while being refreshed in the background, for up to MAX_STALE seconds.
+MODEL_LIST_CACHE_TTL = os.environ.get("MODEL_LIST_CACHE_TTL", "10")
+
+try:
+    MODEL_LIST_CACHE_TTL = float(MODEL_LIST_CACHE_TTL)
+except Exception:
+    MODEL_LIST_CACHE_TTL = 10.0
+
+MODEL_LIST_CACHE_MAX_STALE = os.environ.get("MODEL_LIST_CACHE_MAX_STALE", "3600")
+
+try:
+    MODEL_LIST_CACHE_MAX_STALE = float(MODEL_LIST_CACHE_MAX_STALE)
+except Exception:
+    MODEL_LIST_CACHE_MAX_STALE = 3600.0
+
+MODEL_LIST_CACHE_REDIS_URL = os.environ.get("MODEL_LIST_CACHE_REDIS_URL", "")
+
+####################################
+# WEB PAGE CACHE
+####################################
+
+# Fetched web pages are reused for this many seconds, after which they are
+# revalidated with ETag / Last-Modified. 0 disables.
+WEB_PAGE_CACHE_TTL = os.environ.get("WEB_PAGE_CACHE_TTL", "600")
+
+try:
+    WEB_PAGE_CACHE_TTL = int(WEB_PAGE_CACHE_TTL)
+except Exception:
+    WEB_PAGE_CACHE_TTL = 600
+
+# Total size of the cached pages in MB
+WEB_PAGE_CACHE_MAX_SIZE = os.environ.get("WEB_PAGE_CACHE_MAX_SIZE", "100")
+
+try:
+    WEB_PAGE_CACHE_MAX_SIZE = int(WEB_PAGE_CACHE_MAX_SIZE)
+except Exception:
+    WEB_PAGE_CACHE_MAX_SIZE = 100
+
+####################################
+# FILE INGESTION
+####################################
+
+# Process uploaded files in the background ingestion queue instead of inside the
+# upload request. Can be overridden per upload with `process_in_background`.
+ENABLE_BACKGROUND_FILE_PROCESSING = (
+    os.environ.get("ENABLE_BACKGROUND_FILE_PROCESSING", "False").lower() == "true"
+)
+
+# Ingestion jobs processed at once by each instance
+INGESTION_WORKER_CONCURRENCY = os.environ.get("INGESTION_WORKER_CONCURRENCY", "2")
+
+try:
+    INGESTION_WORKER_CONCURRENCY = max(int(INGESTION_WORKER_CONCURRENCY), 1)
+except Exception:
+    INGESTION_WORKER_CONCURRENCY = 2
+
+INGESTION_JOB_MAX_ATTEMPTS = os.environ.get("INGESTION_JOB_MAX_ATTEMPTS", "3")
+
+try:
+    INGESTION_JOB_MAX_ATTEMPTS = max(int(INGESTION_JOB_MAX_ATTEMPTS), 1)
+except Exception:
+    INGESTION_JOB_MAX_ATTEMPTS = 3
+
+# Seconds before the first retry of a failed job, doubled for every further attempt
+INGESTION_JOB_RETRY_BACKOFF = os.environ.get("INGESTION_JOB_RETRY_BACKOFF", "30")
+
+try:
+    INGESTION_JOB_RETRY_BACKOFF = int(INGESTION_JOB_RETRY_BACKOFF)
+except Exception:
+    INGESTION_JOB_RETRY_BACKOFF = 30
+
+# Running jobs not heard from for this many seconds are considered abandoned, e.g.
+# after a restart, and are queued again
+INGESTION_JOB_LEASE = os.environ.get("INGESTION_JOB_LEASE", "300")
+
+try:
+    INGESTION_JOB_LEASE = max(int(INGESTION_JOB_LEASE), 30)
+except Exception:
+    INGESTION_JOB_LEASE = 300
+
+INGESTION_QUEUE_POLL_INTERVAL = os.environ.get("INGESTION_QUEUE_POLL_INTERVAL", "10")
+
+try:
+    INGESTION_QUEUE_POLL_INTERVAL = max(int(INGESTION_QUEUE_POLL_INTERVAL), 1)
+except Exception:
+    INGESTION_QUEUE_POLL_INTERVAL = 10
+
 ####################################
 # OFFLINE_MODE
 ####################################
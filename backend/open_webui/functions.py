@@ -28,8 +28,9 @@ from open_webui.socket.main import (
 from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
 from open_webui.utils.tools import get_tools
+from open_webui.utils.function_executor import FUNCTION_EXECUTOR
 from open_webui.utils.access_control import has_access
 
 from open_webui.env import SRC_LOG_LEVELS, GLOBAL_LOG_LEVEL
@@ -53,12 +54,7 @@ log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
 
 def get_function_module_by_id(request: Request, pipe_id: str):
-    # Check if function is already loaded
-    if pipe_id not in request.app.state.FUNCTIONS:
-        function_module, _, _ = load_function_module_by_id(pipe_id)
-        request.app.state.FUNCTIONS[pipe_id] = function_module
-    else:
-        function_module = request.app.state.FUNCTIONS[pipe_id]
+    function_module = FUNCTION_REGISTRY.get(pipe_id)
 
     if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
         valves = Functions.get_function_valves_by_id(pipe_id)
@@ -137,17 +133,22 @@ async def get_function_models(request):
 async def generate_function_chat_completion(
     request, form_data, user, models: dict = {}
 ):
-    async def execute_pipe(pipe, params):
-        if inspect.iscoroutinefunction(pipe):
-            return await pipe(**params)
-        else:
-            return pipe(**params)
+    async def execute_pipe(pipe_id, pipe, params):
+        # Sync pipes run off the event loop, under the limits of their function
+        return await FUNCTION_EXECUTOR.run(pipe_id, pipe, **params)
 
-    async def get_message_content(res: str | Generator | AsyncGenerator) -> str:
+    async def get_message_content(
+        pipe_id: str, res: str | Generator | AsyncGenerator
+    ) -> str:
         if isinstance(res, str):
             return res
         if isinstance(res, Generator):
-            return "".join(map(str, res))
+            return "".join(
+                [
+                    str(stream)
+                    async for stream in FUNCTION_EXECUTOR.iterate(pipe_id, res)
+                ]
+            )
         if isinstance(res, AsyncGenerator):
             return "".join([str(stream) async for stream in res])
 
@@ -268,7 +269,7 @@ async def generate_function_chat_completion(
 
         async def stream_content():
             try:
-                res = await execute_pipe(pipe, params)
+                res = await execute_pipe(pipe_id, pipe, params)
 
                 # Directly return if the response is a StreamingResponse
                 if isinstance(res, StreamingResponse):
@@ -289,7 +290,7 @@ async def generate_function_chat_completion(
                 yield f"data: {json.dumps(message)}\n\n"
 
             if isinstance(res, Iterator):
-                for line in res:
+                async for line in FUNCTION_EXECUTOR.iterate(pipe_id, res):
                     yield process_line(form_data, line)
 
             if isinstance(res, AsyncGenerator):
@@ -307,7 +308,7 @@ async def generate_function_chat_completion(
         return StreamingResponse(stream_content(), media_type="text/event-stream")
     else:
         try:
-            res = await execute_pipe(pipe, params)
+            res = await execute_pipe(pipe_id, pipe, params)
 
         except Exception as e:
             log.error(f"Error: {e}")
@@ -318,5 +319,5 @@ async def generate_function_chat_completion(
         if isinstance(res, BaseModel):
             return res.model_dump()
 
-        message = await get_message_content(res)
+        message = await get_message_content(pipe_id, res)
         return openai_chat_completion_message_template(form_data["model"], message)
@@ -1,7 +1,11 @@
+import asyncio
+import functools
 import json
 import logging
-from contextlib import contextmanager
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Optional, TypeVar
+from urllib.parse import parse_qsl, urlencode
 
 from open_webui.internal.wrappers import register_connection
 from open_webui.env import (
@@ -13,9 +17,12 @@ from open_webui.env import (
     DATABASE_POOL_RECYCLE,
     DATABASE_POOL_SIZE,
     DATABASE_POOL_TIMEOUT,
+    DATABASE_EXECUTOR_MAX_WORKERS,
+    ENABLE_ASYNC_DATABASE,
 )
 from peewee_migrate import Router
 from sqlalchemy import Dialect, create_engine, MetaData, types
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import QueuePool, NullPool
@@ -114,3 +121,107 @@ def get_session():
 
 
 get_db = contextmanager(get_session)
+
+
+####################################
+# Async database access
+####################################
+
+# Async drivers for the supported dialects, used instead of the sync DBAPI
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+# libpq query parameters with an asyncpg equivalent
+ASYNCPG_QUERY_PARAMS = {"sslmode": "ssl"}
+
+
+def get_async_database_url(database_url: str) -> Optional[str]:
+    """
+    Return the URL for the async driver, or None when the dialect has no async
+    driver or the URL has query parameters the driver does not support.
+    """
+    scheme, _, rest = database_url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme)
+    if driver is None:
+        return None
+
+    if scheme == "postgresql":
+        location, _, query = rest.partition("?")
+        params = []
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            if key not in ASYNCPG_QUERY_PARAMS:
+                log.info(
+                    f"The async database driver does not support the '{key}' parameter, using the database executor"
+                )
+                return None
+            params.append((ASYNCPG_QUERY_PARAMS[key], value))
+        rest = f"{location}?{urlencode(params)}" if params else location
+
+    return f"{driver}://{rest}"
+
+
+async_engine = None
+ASYNC_SQLALCHEMY_DATABASE_URL = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+if ENABLE_ASYNC_DATABASE and ASYNC_SQLALCHEMY_DATABASE_URL:
+    try:
+        if "sqlite" in ASYNC_SQLALCHEMY_DATABASE_URL:
+            async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+        elif DATABASE_POOL_SIZE > 0:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL,
+                pool_size=DATABASE_POOL_SIZE,
+                max_overflow=DATABASE_POOL_MAX_OVERFLOW,
+                pool_timeout=DATABASE_POOL_TIMEOUT,
+                pool_recycle=DATABASE_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+        else:
+            async_engine = create_async_engine(
+                ASYNC_SQLALCHEMY_DATABASE_URL, pool_pre_ping=True, poolclass=NullPool
+            )
+    except Exception as e:
+        log.warning(
+            f"Async database driver not available, falling back to the database executor: {e}"
+        )
+        async_engine = None
+
+AsyncSessionLocal = (
+    async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+    )
+    if async_engine is not None
+    else None
+)
+
+
+@asynccontextmanager
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def is_async_db_enabled() -> bool:
+    return AsyncSessionLocal is not None
+
+
+# Bounded pool for sync database calls made from async code paths
+db_executor = ThreadPoolExecutor(
+    max_workers=DATABASE_EXECUTOR_MAX_WORKERS, thread_name_prefix="db"
+)
+
+T = TypeVar("T")
+
+
+async def run_in_db_executor(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a synchronous database call in the bounded database executor so it does
+    not block the event loop. Meant for `*Table` methods without an async variant.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        db_executor, functools.partial(func, *args, **kwargs)
+    )
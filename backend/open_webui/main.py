@@ -84,9 +84,10 @@ from open_webui.routers.retrieval import (
     get_rf,
 )
 
-from open_webui.internal.db import Session, engine
+from open_webui.internal.db import Session, engine, run_in_db_executor
 
 from open_webui.models.functions import Functions
+from open_webui.models.groups import Groups
 from open_webui.models.models import Models
 from open_webui.models.users import UserModel, Users
 from open_webui.models.chats import Chats
@@ -337,6 +338,7 @@ from open_webui.env import (
     RESET_CONFIG_ON_START,
     OFFLINE_MODE,
     ENABLE_OTEL,
+    ENABLE_FUNCTION_PREWARM,
 )
 
 
@@ -365,6 +367,10 @@ from open_webui.utils.security_headers import SecurityHeadersMiddleware
 from open_webui.tasks import stop_task, list_tasks  # Import from tasks.py
 
 from open_webui.utils.redis import get_sentinels_from_env
+from open_webui.utils.session_pool import SESSION_POOL
+from open_webui.utils.activity import ACTIVITY_TRACKER
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.ingestion import INGESTION_QUEUE
 
 
 if SAFE_MODE:
@@ -417,9 +423,19 @@ async def lifespan(app: FastAPI):
     if LICENSE_KEY:
         get_license_data(app, LICENSE_KEY)
 
+    if ENABLE_FUNCTION_PREWARM:
+        await asyncio.to_thread(FUNCTION_REGISTRY.warm_up)
+
     asyncio.create_task(periodic_usage_pool_cleanup())
+    activity_task = asyncio.create_task(ACTIVITY_TRACKER.run())
+    INGESTION_QUEUE.start(app)
     yield
 
+    INGESTION_QUEUE.stop()
+    activity_task.cancel()
+    await run_in_db_executor(ACTIVITY_TRACKER.flush)
+    await SESSION_POOL.close()
+
 
 app = FastAPI(
     docs_url="/docs" if ENV == "dev" else None,
@@ -554,7 +570,6 @@ app.state.AUTH_TRUSTED_NAME_HEADER = WEBUI_AUTH_TRUSTED_NAME_HEADER
 
 app.state.USER_COUNT = None
 app.state.TOOLS = {}
-app.state.FUNCTIONS = {}
 
 ########################################
 #
@@ -958,6 +973,15 @@ if audit_level != AuditLevel.NONE:
 @app.get("/api/models")
 async def get_models(request: Request, user=Depends(get_verified_user)):
     def get_filtered_models(models, user):
+        # Resolve the models and the user's groups once for all access checks
+        model_infos = {
+            model_info.id: model_info
+            for model_info in Models.get_models_by_ids(
+                [model["id"] for model in models if not model.get("arena")]
+            )
+        }
+        user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+
         filtered_models = []
         for model in models:
             if model.get("arena"):
@@ -967,14 +991,18 @@ async def get_models(request: Request, user=Depends(get_verified_user)):
                     access_control=model.get("info", {})
                     .get("meta", {})
                     .get("access_control", {}),
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
                 continue
 
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                    user.id,
+                    type="read",
+                    access_control=model_info.access_control,
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
 
@@ -0,0 +1,51 @@
+"""Add group_member table
+
+Revision ID: b10670c03dd5
+Revises: 3781e22d8b01
+Create Date: 2025-01-20 10:00:00.000000
+
+"""
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+
+revision = "b10670c03dd5"
+down_revision = "3781e22d8b01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "group_member",
+        sa.Column("group_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint("group_id", "user_id"),
+    )
+    op.create_index("group_member_user_id_idx", "group_member", ["user_id"])
+
+    # Backfill the membership rows from the user_ids column of existing groups
+    conn = op.get_bind()
+    group = table("group", column("id", sa.Text()), column("user_ids", sa.JSON()))
+    group_member = table(
+        "group_member", column("group_id", sa.Text()), column("user_id", sa.Text())
+    )
+
+    rows = []
+    for group_id, user_ids in conn.execute(select(group.c.id, group.c.user_ids)):
+        if isinstance(user_ids, str):
+            user_ids = json.loads(user_ids)
+
+        for user_id in dict.fromkeys(user_ids or []):
+            rows.append({"group_id": group_id, "user_id": user_id})
+
+    if rows:
+        op.bulk_insert(group_member, rows)
+
+
+def downgrade():
+    op.drop_index("group_member_user_id_idx", table_name="group_member")
+    op.drop_table("group_member")
@@ -0,0 +1,33 @@
+"""Add file_blob table
+
+Revision ID: d31c5e8f2a47
+Revises: b10670c03dd5
+Create Date: 2025-01-24 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "d31c5e8f2a47"
+down_revision = "b10670c03dd5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "file_blob",
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.Column("path", sa.Text(), nullable=True),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("file_id", sa.String(), nullable=True),
+        sa.Column("ref_count", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+
+
+def downgrade():
+    op.drop_table("file_blob")
@@ -0,0 +1,45 @@
+"""Add ingestion_job table
+
+Revision ID: e7a24b9c1f03
+Revises: d31c5e8f2a47
+Create Date: 2025-01-27 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "e7a24b9c1f03"
+down_revision = "d31c5e8f2a47"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingestion_job",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=True),
+        sa.Column("file_id", sa.String(), nullable=True),
+        sa.Column("user_id", sa.String(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("progress", sa.Float(), nullable=True),
+        sa.Column("attempts", sa.BigInteger(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.BigInteger(), nullable=True),
+        sa.Column("queued_at", sa.BigInteger(), nullable=True),
+        sa.Column("created_at", sa.BigInteger(), nullable=True),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ingestion_job_file_id_idx", "ingestion_job", ["file_id"])
+    op.create_index(
+        "ingestion_job_status_idx", "ingestion_job", ["status", "next_attempt_at"]
+    )
+
+
+def downgrade():
+    op.drop_index("ingestion_job_status_idx", table_name="ingestion_job")
+    op.drop_index("ingestion_job_file_id_idx", table_name="ingestion_job")
+    op.drop_table("ingestion_job")
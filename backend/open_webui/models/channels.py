@@ -4,6 +4,7 @@ import uuid
 from typing import Optional
 
 from open_webui.internal.db import Base, get_db
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 from pydantic import BaseModel, ConfigDict
@@ -97,11 +98,13 @@ class ChannelTable:
         self, user_id: str, permission: str = "read"
     ) -> list[ChannelModel]:
         channels = self.get_channels()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
         return [
             channel
             for channel in channels
             if channel.user_id == user_id
-            or has_access(user_id, permission, channel.access_control)
+            or has_access(user_id, permission, channel.access_control, user_group_ids)
         ]
 
     def get_channel_by_id(self, id: str) -> Optional[ChannelModel]:
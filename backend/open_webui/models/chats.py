@@ -1,10 +1,18 @@
+import asyncio
 import logging
 import json
 import time
 import uuid
+import weakref
 from typing import Optional
 
-from open_webui.internal.db import Base, get_db
+from open_webui.internal.db import (
+    Base,
+    get_db,
+    get_async_db,
+    is_async_db_enabled,
+    run_in_db_executor,
+)
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -105,6 +113,17 @@ class ChatTitleIdResponse(BaseModel):
 
 
 class ChatTable:
+    def __init__(self):
+        self.write_locks = weakref.WeakValueDictionary()
+
+    def get_write_lock(self, id: str) -> asyncio.Lock:
+        """Lock serializing the read-modify-write updates of a chat in this process."""
+        lock = self.write_locks.get(id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.write_locks[id] = lock
+        return lock
+
     def insert_new_chat(self, user_id: str, form_data: ChatForm) -> Optional[ChatModel]:
         with get_db() as db:
             id = str(uuid.uuid4())
@@ -172,6 +191,29 @@ class ChatTable:
         except Exception:
             return None
 
+    async def update_chat_by_id_async(self, id: str, chat: dict) -> Optional[ChatModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.update_chat_by_id, id, chat)
+
+        try:
+            async with get_async_db() as db:
+                chat_item = await db.get(Chat, id)
+                if chat_item is None:
+                    return None
+
+                chat_item.chat = chat
+                chat_item.title = chat["title"] if "title" in chat else "New Chat"
+                chat_item.updated_at = int(time.time())
+                await db.commit()
+                await db.refresh(chat_item)
+
+                return ChatModel.model_validate(chat_item)
+        except Exception as e:
+            log.warning(
+                f"Error updating chat {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.update_chat_by_id, id, chat)
+
     def update_chat_title_by_id(self, id: str, title: str) -> Optional[ChatModel]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -209,6 +251,13 @@ class ChatTable:
 
         return chat.chat.get("title", "New Chat")
 
+    async def get_chat_title_by_id_async(self, id: str) -> Optional[str]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        return chat.chat.get("title", "New Chat")
+
     def get_messages_by_chat_id(self, id: str) -> Optional[dict]:
         chat = self.get_chat_by_id(id)
         if chat is None:
@@ -225,6 +274,15 @@ class ChatTable:
 
         return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
 
+    async def get_message_by_id_and_message_id_async(
+        self, id: str, message_id: str
+    ) -> Optional[dict]:
+        chat = await self.get_chat_by_id_async(id)
+        if chat is None:
+            return None
+
+        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+
     def upsert_message_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, message: dict
     ) -> Optional[ChatModel]:
@@ -248,6 +306,109 @@ class ChatTable:
         chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
+    async def upsert_message_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, message: dict
+    ) -> bool:
+        """
+        Patch only the given fields of the message, so that concurrent writes to
+        other fields or messages of the chat are not overwritten. The chat is not read
+        back, callers needing it load it themselves.
+        """
+        async with self.get_write_lock(id):
+            return await run_in_db_executor(
+                self.patch_message_by_id_and_message_id, id, message_id, message
+            )
+
+    def patch_message_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict
+    ) -> bool:
+        """
+        Update the given fields of an existing message in place using the database JSON
+        functions, so only the changed values travel to the database instead of the
+        whole chat document. Falls back to a full upsert when the message does not
+        exist yet or the dialect has no JSON path support.
+        """
+        if not message:
+            return True
+
+        updated = False
+        if '"' not in message_id and all('"' not in key for key in message):
+            try:
+                with get_db() as db:
+                    dialect_name = db.bind.dialect.name
+                    params = {
+                        "id": id,
+                        "message_id": message_id,
+                        "updated_at": int(time.time()),
+                    }
+
+                    if dialect_name == "sqlite":
+                        params["message_path"] = f'$.history.messages."{message_id}"'
+
+                        assignments = []
+                        for idx, (key, value) in enumerate(message.items()):
+                            assignments.append(f":path_{idx}, json(:value_{idx})")
+                            params[f"path_{idx}"] = f'{params["message_path"]}."{key}"'
+                            params[f"value_{idx}"] = json.dumps(value)
+                        assignments.append("'$.history.currentId', :message_id")
+
+                        result = db.execute(
+                            text(
+                                f"""
+                                UPDATE chat
+                                SET chat = json_set(chat, {', '.join(assignments)}),
+                                    updated_at = :updated_at
+                                WHERE id = :id
+                                AND json_extract(chat, :message_path) IS NOT NULL
+                                """
+                            ),
+                            params,
+                        )
+                    elif dialect_name == "postgresql":
+                        expression = "chat::jsonb"
+                        for idx, (key, value) in enumerate(message.items()):
+                            expression = f"jsonb_set({expression}, CAST(:path_{idx} AS text[]), CAST(:value_{idx} AS jsonb))"
+                            params[f"path_{idx}"] = [
+                                "history",
+                                "messages",
+                                message_id,
+                                key,
+                            ]
+                            params[f"value_{idx}"] = json.dumps(value)
+                        expression = f"jsonb_set({expression}, '{{history,currentId}}', to_jsonb(CAST(:message_id AS text)))"
+
+                        result = db.execute(
+                            text(
+                                f"""
+                                UPDATE chat
+                                SET chat = CAST({expression} AS json),
+                                    updated_at = :updated_at
+                                WHERE id = :id
+                                AND chat->'history'->'messages'->:message_id IS NOT NULL
+                                """
+                            ),
+                            params,
+                        )
+                    else:
+                        result = None
+
+                    if result is not None:
+                        db.commit()
+                        updated = result.rowcount > 0
+            except Exception as e:
+                log.warning(
+                    f"Error patching message {message_id} of chat {id}, falling back to a full update: {e}"
+                )
+
+        if not updated:
+            return (
+                self.upsert_message_to_chat_by_id_and_message_id(
+                    id, message_id, message
+                )
+                is not None
+            )
+        return True
+
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
     ) -> Optional[ChatModel]:
@@ -266,6 +427,28 @@ class ChatTable:
         chat["history"] = history
         return self.update_chat_by_id(id, chat)
 
+    async def add_message_status_to_chat_by_id_and_message_id_async(
+        self, id: str, message_id: str, status: dict
+    ) -> Optional[ChatModel]:
+        async with self.get_write_lock(id):
+            chat = await self.get_chat_by_id_async(id)
+            if chat is None:
+                return None
+
+            message = chat.chat.get("history", {}).get("messages", {}).get(message_id)
+            if message is None:
+                return chat
+
+            patched = await run_in_db_executor(
+                self.patch_message_by_id_and_message_id,
+                id,
+                message_id,
+                {"statusHistory": [*message.get("statusHistory", []), status]},
+            )
+        if not patched:
+            return None
+        return await self.get_chat_by_id_async(id)
+
     def insert_shared_chat_by_chat_id(self, chat_id: str) -> Optional[ChatModel]:
         with get_db() as db:
             # Get the existing chat to share
@@ -470,6 +653,20 @@ class ChatTable:
         except Exception:
             return None
 
+    async def get_chat_by_id_async(self, id: str) -> Optional[ChatModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_chat_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                chat = await db.get(Chat, id)
+                return ChatModel.model_validate(chat) if chat else None
+        except Exception as e:
+            log.warning(
+                f"Error getting chat {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_chat_by_id, id)
+
     def get_chat_by_share_id(self, id: str) -> Optional[ChatModel]:
         try:
             with get_db() as db:
@@ -492,6 +689,29 @@ class ChatTable:
         except Exception:
             return None
 
+    async def get_chat_by_id_and_user_id_async(
+        self, id: str, user_id: str
+    ) -> Optional[ChatModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(
+                self.get_chat_by_id_and_user_id, id, user_id
+            )
+
+        try:
+            async with get_async_db() as db:
+                result = await db.execute(
+                    select(Chat).filter_by(id=id, user_id=user_id)
+                )
+                chat = result.scalars().first()
+                return ChatModel.model_validate(chat) if chat else None
+        except Exception as e:
+            log.warning(
+                f"Error getting chat {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(
+                self.get_chat_by_id_and_user_id, id, user_id
+            )
+
     def get_chats(self, skip: int = 0, limit: int = 50) -> list[ChatModel]:
         with get_db() as db:
             all_chats = (
@@ -2,10 +2,18 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    is_async_db_enabled,
+    run_in_db_executor,
+)
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy.exc import IntegrityError
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -33,6 +41,22 @@ class File(Base):
     updated_at = Column(BigInteger)
 
 
+class FileBlob(Base):
+    __tablename__ = "file_blob"
+
+    # Stored content shared by the files uploaded with identical bytes
+    hash = Column(String, primary_key=True)  # sha256 of the raw bytes
+    path = Column(Text)
+    size = Column(BigInteger)
+
+    # The file whose extracted content and vectors are reused by the others
+    file_id = Column(String, nullable=True)
+    ref_count = Column(BigInteger)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+
 class FileModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -80,6 +104,20 @@ class FileModelResponse(BaseModel):
     model_config = ConfigDict(extra="allow")
 
 
+class FileBlobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    hash: str
+    path: str
+    size: Optional[int] = None
+
+    file_id: Optional[str] = None
+    ref_count: int
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
 class FileMetadataResponse(BaseModel):
     id: str
     meta: dict
@@ -130,6 +168,20 @@ class FilesTable:
             except Exception:
                 return None
 
+    async def get_file_by_id_async(self, id: str) -> Optional[FileModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_file_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                file = await db.get(File, id)
+                return FileModel.model_validate(file) if file else None
+        except Exception as e:
+            log.warning(
+                f"Error getting file {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_file_by_id, id)
+
     def get_file_metadata_by_id(self, id: str) -> Optional[FileMetadataResponse]:
         with get_db() as db:
             try:
@@ -233,3 +285,139 @@ class FilesTable:
 
 
 Files = FilesTable()
+
+
+class FileBlobsTable:
+    def _increment(self, db, hash: str) -> Optional[FileBlob]:
+        if (
+            db.query(FileBlob)
+            .filter_by(hash=hash)
+            .update(
+                {
+                    FileBlob.ref_count: FileBlob.ref_count + 1,
+                    FileBlob.updated_at: int(time.time()),
+                }
+            )
+        ):
+            db.commit()
+            return db.get(FileBlob, hash)
+        return None
+
+    def acquire_blob(
+        self, hash: str, path: str, size: int, file_id: str
+    ) -> Optional[FileBlobModel]:
+        """
+        Reference the stored content with `hash`, recording `path` as its location if
+        it's new. The returned path is the one to use for the file.
+        """
+        with get_db() as db:
+            try:
+                blob = self._increment(db, hash)
+                if blob is None:
+                    try:
+                        blob = FileBlob(
+                            hash=hash,
+                            path=path,
+                            size=size,
+                            file_id=file_id,
+                            ref_count=1,
+                            created_at=int(time.time()),
+                            updated_at=int(time.time()),
+                        )
+                        db.add(blob)
+                        db.commit()
+                    except IntegrityError:
+                        # Stored concurrently by another upload
+                        db.rollback()
+                        blob = self._increment(db, hash)
+
+                return FileBlobModel.model_validate(blob)
+            except Exception as e:
+                log.exception(f"Error acquiring file blob: {e}")
+                return None
+
+    def release_blob(self, hash: Optional[str], path: str, file_id: str) -> bool:
+        """
+        Drop the reference of a deleted file to its content. Returns True when no file
+        uses the stored content anymore and it can be deleted.
+        """
+        if not hash:
+            return True
+
+        with get_db() as db:
+            try:
+                query = db.query(FileBlob).filter_by(hash=hash, path=path)
+                if not query.update({FileBlob.ref_count: FileBlob.ref_count - 1}):
+                    # Content stored before deduplication, owned by this file only
+                    return True
+
+                query.filter_by(file_id=file_id).update({FileBlob.file_id: None})
+                deleted = query.filter(FileBlob.ref_count <= 0).delete()
+                db.commit()
+                return bool(deleted)
+            except Exception as e:
+                log.exception(f"Error releasing file blob: {e}")
+                return False
+
+    def get_source_file(self, file: FileModel) -> Optional[FileModel]:
+        """
+        Return the processed file with the same content as `file`, whose extracted
+        content and vectors can be reused, if there is one.
+        """
+        hash = (file.meta or {}).get("sha256")
+        if not hash:
+            return None
+
+        with get_db() as db:
+            blob = db.get(FileBlob, hash)
+            if (
+                blob is None
+                or blob.path != file.path
+                or blob.file_id in [None, file.id]
+            ):
+                return None
+            source_file_id = blob.file_id
+
+        source = Files.get_file_by_id(source_file_id)
+        if source and source.hash and (source.data or {}).get("content"):
+            return source
+        return None
+
+    def update_blob_file_id_by_hash(
+        self, hash: str, file_id: str, path: Optional[str] = None
+    ) -> bool:
+        """Make `file_id` the source of the extracted content of the blob."""
+        with get_db() as db:
+            try:
+                query = db.query(FileBlob).filter_by(hash=hash)
+                if path is not None:
+                    query = query.filter_by(path=path)
+                query.update({FileBlob.file_id: file_id})
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+    def reset_blob_file_id(self, file_id: str) -> bool:
+        """Stop reusing the content of `file_id`, e.g. once it has been edited."""
+        with get_db() as db:
+            try:
+                db.query(FileBlob).filter_by(file_id=file_id).update(
+                    {FileBlob.file_id: None}
+                )
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+    def delete_all_blobs(self) -> bool:
+        with get_db() as db:
+            try:
+                db.query(FileBlob).delete()
+                db.commit()
+                return True
+            except Exception:
+                return False
+
+
+FileBlobs = FileBlobsTable()
@@ -2,7 +2,14 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    is_async_db_enabled,
+    run_in_db_executor,
+)
 from open_webui.models.users import Users
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
@@ -116,6 +123,20 @@ class FunctionsTable:
         except Exception:
             return None
 
+    async def get_function_by_id_async(self, id: str) -> Optional[FunctionModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_function_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                function = await db.get(Function, id)
+                return FunctionModel.model_validate(function) if function else None
+        except Exception as e:
+            log.warning(
+                f"Error getting function {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_function_by_id, id)
+
     def get_functions(self, active_only=False) -> list[FunctionModel]:
         with get_db() as db:
             if active_only:
@@ -173,6 +194,22 @@ class FunctionsTable:
                 log.exception(f"Error getting function valves by id {id}: {e}")
                 return None
 
+    async def get_function_valves_by_id_async(self, id: str) -> Optional[dict]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_function_valves_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                function = await db.get(Function, id)
+                if function is None:
+                    return None
+                return function.valves if function.valves else {}
+        except Exception as e:
+            log.warning(
+                f"Error getting function valves {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_function_valves_by_id, id)
+
     def update_function_valves_by_id(
         self, id: str, valves: dict
     ) -> Optional[FunctionValves]:
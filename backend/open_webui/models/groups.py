@@ -11,7 +11,7 @@ from open_webui.models.files import FileMetadataResponse
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON, func
+from sqlalchemy import BigInteger, Column, Index, Text, JSON
 
 
 log = logging.getLogger(__name__)
@@ -41,6 +41,16 @@ class Group(Base):
     updated_at = Column(BigInteger)
 
 
+class GroupMember(Base):
+    __tablename__ = "group_member"
+
+    # Indexed copy of Group.user_ids, so membership lookups don't scan every group
+    group_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+
+    __table_args__ = (Index("group_member_user_id_idx", "user_id"),)
+
+
 class GroupModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str
@@ -88,6 +98,15 @@ class GroupUpdateForm(GroupForm):
 
 
 class GroupTable:
+    def _set_members(self, db, id: str, user_ids: list[str]):
+        db.query(GroupMember).filter_by(group_id=id).delete()
+        db.add_all(
+            [
+                GroupMember(group_id=id, user_id=user_id)
+                for user_id in dict.fromkeys(user_ids)
+            ]
+        )
+
     def insert_new_group(
         self, user_id: str, form_data: GroupForm
     ) -> Optional[GroupModel]:
@@ -105,6 +124,7 @@ class GroupTable:
             try:
                 result = Group(**group.model_dump())
                 db.add(result)
+                self._set_members(db, result.id, group.user_ids)
                 db.commit()
                 db.refresh(result)
                 if result:
@@ -127,16 +147,21 @@ class GroupTable:
             return [
                 GroupModel.model_validate(group)
                 for group in db.query(Group)
-                .filter(
-                    func.json_array_length(Group.user_ids) > 0
-                )  # Ensure array exists
-                .filter(
-                    Group.user_ids.cast(String).like(f'%"{user_id}"%')
-                )  # String-based check
+                .join(GroupMember, GroupMember.group_id == Group.id)
+                .filter(GroupMember.user_id == user_id)
                 .order_by(Group.updated_at.desc())
                 .all()
             ]
 
+    def get_group_ids_by_member_id(self, user_id: str) -> set[str]:
+        with get_db() as db:
+            return {
+                group_id
+                for (group_id,) in db.query(GroupMember.group_id).filter_by(
+                    user_id=user_id
+                )
+            }
+
     def get_group_by_id(self, id: str) -> Optional[GroupModel]:
         try:
             with get_db() as db:
@@ -163,6 +188,8 @@ class GroupTable:
                         "updated_at": int(time.time()),
                     }
                 )
+                if form_data.user_ids is not None:
+                    self._set_members(db, id, form_data.user_ids)
                 db.commit()
                 return self.get_group_by_id(id=id)
         except Exception as e:
@@ -173,6 +200,7 @@ class GroupTable:
         try:
             with get_db() as db:
                 db.query(Group).filter_by(id=id).delete()
+                db.query(GroupMember).filter_by(group_id=id).delete()
                 db.commit()
                 return True
         except Exception:
@@ -182,6 +210,7 @@ class GroupTable:
         with get_db() as db:
             try:
                 db.query(Group).delete()
+                db.query(GroupMember).delete()
                 db.commit()
 
                 return True
@@ -201,7 +230,9 @@ class GroupTable:
                             "updated_at": int(time.time()),
                         }
                     )
-                    db.commit()
+
+                db.query(GroupMember).filter_by(user_id=user_id).delete()
+                db.commit()
 
                 return True
             except Exception:
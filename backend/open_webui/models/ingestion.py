@@ -0,0 +1,235 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from open_webui.internal.db import Base, get_db
+from open_webui.env import SRC_LOG_LEVELS
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import BigInteger, Column, Float, Index, String, Text, JSON, or_
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+####################
+# Ingestion Jobs DB Schema
+####################
+
+# pending -> extracting -> embedding -> done | failed
+RUNNING_STATUSES = ["extracting", "embedding"]
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_job"
+
+    id = Column(String, primary_key=True)
+    type = Column(String)
+    file_id = Column(String)
+    user_id = Column(String)
+    data = Column(JSON, nullable=True)
+
+    status = Column(String)
+    progress = Column(Float)
+    attempts = Column(BigInteger)
+    error = Column(Text, nullable=True)
+
+    next_attempt_at = Column(BigInteger)
+    queued_at = Column(BigInteger, nullable=True)
+
+    created_at = Column(BigInteger)
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index("ingestion_job_file_id_idx", "file_id"),
+        Index("ingestion_job_status_idx", "status", "next_attempt_at"),
+    )
+
+
+class IngestionJobModel(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    type: str
+    file_id: str
+    user_id: str
+    data: Optional[dict] = None
+
+    status: str
+    progress: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+    next_attempt_at: int
+    queued_at: Optional[int] = None
+
+    created_at: int  # timestamp in epoch
+    updated_at: int  # timestamp in epoch
+
+
+class IngestionJobResponse(BaseModel):
+    id: str
+    file_id: str
+    status: str
+    progress: float
+    attempts: int
+    error: Optional[str] = None
+    updated_at: int  # timestamp in epoch
+
+
+class IngestionJobsTable:
+    def insert_new_job(
+        self, type: str, file_id: str, user_id: str, data: Optional[dict] = None
+    ) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            now = int(time.time())
+            job = IngestionJobModel(
+                **{
+                    "id": str(uuid.uuid4()),
+                    "type": type,
+                    "file_id": file_id,
+                    "user_id": user_id,
+                    "data": data,
+                    "status": "pending",
+                    "next_attempt_at": now,
+                    "queued_at": now,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+
+            try:
+                result = IngestionJob(**job.model_dump())
+                db.add(result)
+                db.commit()
+                db.refresh(result)
+                return IngestionJobModel.model_validate(result)
+            except Exception as e:
+                log.exception(f"Error inserting a new ingestion job: {e}")
+                return None
+
+    def get_job_by_id(self, id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            try:
+                job = db.get(IngestionJob, id)
+                return IngestionJobModel.model_validate(job)
+            except Exception:
+                return None
+
+    def get_latest_job_by_file_id(self, file_id: str) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            job = (
+                db.query(IngestionJob)
+                .filter_by(file_id=file_id)
+                .order_by(IngestionJob.created_at.desc())
+                .first()
+            )
+            return IngestionJobModel.model_validate(job) if job else None
+
+    def get_jobs_to_queue(
+        self, queued_before: int, limit: int = 100
+    ) -> list[IngestionJobModel]:
+        """Pending jobs due to run, never queued or not queued since `queued_before`."""
+        with get_db() as db:
+            return [
+                IngestionJobModel.model_validate(job)
+                for job in db.query(IngestionJob)
+                .filter(
+                    IngestionJob.status == "pending",
+                    IngestionJob.next_attempt_at <= int(time.time()),
+                    or_(
+                        IngestionJob.queued_at.is_(None),
+                        IngestionJob.queued_at < queued_before,
+                    ),
+                )
+                .order_by(IngestionJob.next_attempt_at)
+                .limit(limit)
+                .all()
+            ]
+
+    def queue_job(self, id: str, queued_at: Optional[int]) -> bool:
+        """Mark a job queued, unless another instance did since it was read."""
+        with get_db() as db:
+            query = db.query(IngestionJob).filter_by(id=id, status="pending")
+            query = query.filter(
+                IngestionJob.queued_at.is_(None)
+                if queued_at is None
+                else IngestionJob.queued_at == queued_at
+            )
+            result = query.update({IngestionJob.queued_at: int(time.time())})
+            db.commit()
+            return bool(result)
+
+    def claim_job(self, id: str) -> Optional[IngestionJobModel]:
+        """Start a pending job, so that it runs once even if it was queued twice."""
+        with get_db() as db:
+            now = int(time.time())
+            result = (
+                db.query(IngestionJob)
+                .filter(
+                    IngestionJob.id == id,
+                    IngestionJob.status == "pending",
+                    IngestionJob.next_attempt_at <= now,
+                )
+                .update(
+                    {
+                        IngestionJob.status: RUNNING_STATUSES[0],
+                        IngestionJob.progress: 0.0,
+                        IngestionJob.attempts: IngestionJob.attempts + 1,
+                        IngestionJob.updated_at: now,
+                    }
+                )
+            )
+            db.commit()
+
+            if not result:
+                return None
+            return IngestionJobModel.model_validate(db.get(IngestionJob, id))
+
+    def update_job_by_id(self, id: str, updated: dict) -> Optional[IngestionJobModel]:
+        with get_db() as db:
+            try:
+                job = db.get(IngestionJob, id)
+                for key, value in updated.items():
+                    setattr(job, key, value)
+                job.updated_at = int(time.time())
+                db.commit()
+                db.refresh(job)
+                return IngestionJobModel.model_validate(job)
+            except Exception as e:
+                log.exception(f"Error updating ingestion job {id}: {e}")
+                return None
+
+    def reset_stale_jobs(self, updated_before: int, max_attempts: int) -> int:
+        """
+        Queue again the running jobs not updated since `updated_before`, whose
+        instance stopped, or fail them when they have no attempts left.
+        """
+        with get_db() as db:
+            now = int(time.time())
+            query = db.query(IngestionJob).filter(
+                IngestionJob.status.in_(RUNNING_STATUSES),
+                IngestionJob.updated_at < updated_before,
+            )
+
+            failed = query.filter(IngestionJob.attempts >= max_attempts).update(
+                {
+                    IngestionJob.status: "failed",
+                    IngestionJob.error: "The job was interrupted",
+                    IngestionJob.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+            reset = query.filter(IngestionJob.attempts < max_attempts).update(
+                {
+                    IngestionJob.status: "pending",
+                    IngestionJob.next_attempt_at: now,
+                    IngestionJob.queued_at: None,
+                    IngestionJob.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            return failed + reset
+
+
+IngestionJobs = IngestionJobsTable()
@@ -2,7 +2,14 @@ import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    is_async_db_enabled,
+    run_in_db_executor,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 from open_webui.models.users import Users, UserResponse
@@ -15,6 +22,7 @@ from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy import BigInteger, Column, Text, JSON, Boolean
 
 
+from open_webui.models.groups import Groups
 from open_webui.utils.access_control import has_access
 
 
@@ -199,13 +207,25 @@ class ModelsTable:
         self, user_id: str, permission: str = "write"
     ) -> list[ModelUserResponse]:
         models = self.get_models()
+        user_group_ids = Groups.get_group_ids_by_member_id(user_id)
+
         return [
             model
             for model in models
             if model.user_id == user_id
-            or has_access(user_id, permission, model.access_control)
+            or has_access(user_id, permission, model.access_control, user_group_ids)
         ]
 
+    def get_models_by_ids(self, ids: list[str]) -> list[ModelModel]:
+        if not ids:
+            return []
+
+        with get_db() as db:
+            return [
+                ModelModel.model_validate(model)
+                for model in db.query(Model).filter(Model.id.in_(set(ids))).all()
+            ]
+
     def get_model_by_id(self, id: str) -> Optional[ModelModel]:
         try:
             with get_db() as db:
@@ -214,6 +234,20 @@ class ModelsTable:
         except Exception:
             return None
 
+    async def get_model_by_id_async(self, id: str) -> Optional[ModelModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_model_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                model = await db.get(Model, id)
+                return ModelModel.model_validate(model) if model else None
+        except Exception as e:
+            log.warning(
+                f"Error getting model {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_model_by_id, id)
+
     def toggle_model_by_id(self, id: str) -> Optional[ModelModel]:
         with get_db() as db:
             try:
@@ -1,15 +1,28 @@
+import logging
 import time
 from typing import Optional
 
-from open_webui.internal.db import Base, JSONField, get_db
+from open_webui.internal.db import (
+    Base,
+    JSONField,
+    get_db,
+    get_async_db,
+    is_async_db_enabled,
+    run_in_db_executor,
+)
 
 
 from open_webui.models.chats import Chats
 from open_webui.models.groups import Groups
+from open_webui.utils.principal_cache import PRINCIPAL_CACHE
+from open_webui.env import SRC_LOG_LEVELS
 
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text
+from sqlalchemy import BigInteger, Column, String, Text, case, select
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
 
 ####################
 # User DB Schema
@@ -135,6 +148,20 @@ class UsersTable:
         except Exception:
             return None
 
+    async def get_user_by_id_async(self, id: str) -> Optional[UserModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_user_by_id, id)
+
+        try:
+            async with get_async_db() as db:
+                user = await db.get(User, id)
+                return UserModel.model_validate(user) if user else None
+        except Exception as e:
+            log.warning(
+                f"Error getting user {id} with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_user_by_id, id)
+
     def get_user_by_api_key(self, api_key: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -143,6 +170,21 @@ class UsersTable:
         except Exception:
             return None
 
+    async def get_user_by_api_key_async(self, api_key: str) -> Optional[UserModel]:
+        if not is_async_db_enabled():
+            return await run_in_db_executor(self.get_user_by_api_key, api_key)
+
+        try:
+            async with get_async_db() as db:
+                result = await db.execute(select(User).filter_by(api_key=api_key))
+                user = result.scalars().first()
+                return UserModel.model_validate(user) if user else None
+        except Exception as e:
+            log.warning(
+                f"Error getting user by api key with the async database, falling back to the database executor: {e}"
+            )
+            return await run_in_db_executor(self.get_user_by_api_key, api_key)
+
     def get_user_by_email(self, email: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
@@ -208,11 +250,24 @@ class UsersTable:
         except Exception:
             return None
 
+    async def get_user_webhook_url_by_id_async(self, id: str) -> Optional[str]:
+        user = await self.get_user_by_id_async(id)
+        if user is None or user.settings is None:
+            return None
+
+        return (
+            user.settings.model_dump()
+            .get("ui", {})
+            .get("notifications", {})
+            .get("webhook_url", None)
+        )
+
     def update_user_role_by_id(self, id: str, role: str) -> Optional[UserModel]:
         try:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"role": role})
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
         except Exception:
@@ -227,6 +282,7 @@ class UsersTable:
                     {"profile_image_url": profile_image_url}
                 )
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -246,6 +302,22 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_users_last_active(self, last_active: dict[str, int]) -> bool:
+        """Set the last active timestamps of many users with a single UPDATE."""
+        if not last_active:
+            return True
+
+        try:
+            with get_db() as db:
+                db.query(User).filter(User.id.in_(list(last_active.keys()))).update(
+                    {"last_active_at": case(last_active, value=User.id)},
+                    synchronize_session=False,
+                )
+                db.commit()
+                return True
+        except Exception:
+            return False
+
     def update_user_oauth_sub_by_id(
         self, id: str, oauth_sub: str
     ) -> Optional[UserModel]:
@@ -253,6 +325,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update({"oauth_sub": oauth_sub})
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -264,6 +337,7 @@ class UsersTable:
             with get_db() as db:
                 db.query(User).filter_by(id=id).update(updated)
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -283,6 +357,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -301,6 +376,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
 
                 return True
             else:
@@ -313,6 +389,7 @@ class UsersTable:
             with get_db() as db:
                 result = db.query(User).filter_by(id=id).update({"api_key": api_key})
                 db.commit()
+                PRINCIPAL_CACHE.invalidate_user(id)
                 return True if result == 1 else False
         except Exception:
             return False
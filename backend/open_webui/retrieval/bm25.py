@@ -0,0 +1,321 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import uuid
+from contextlib import closing
+from typing import Callable, Optional
+from urllib.request import pathname2url
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from open_webui.config import BM25_INDEX_DIR
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class BM25Index:
+    """
+    Persistent inverted BM25 index, one SQLite FTS5 database per collection.
+
+    The index mirrors the chunks stored in the vector database. It is updated
+    incrementally when chunks are added or deleted, and built once from the vector
+    database for collections that were created before it existed.
+
+    Indexes live on the local disk of each instance. With Redis, every change of a
+    collection bumps its generation in Redis, and each index records the generation
+    it is up to date with. An index behind the current generation was changed on
+    another disk, so it is built again from the vector database on next use. Workers
+    sharing the disk update the same index, so they never drop each other's changes.
+    """
+
+    GENERATION_KEY = "open-webui:bm25:generation"
+
+    def __init__(
+        self,
+        index_dir: str = BM25_INDEX_DIR,
+        redis_url: str = REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.index_dir = index_dir
+        os.makedirs(self.index_dir, exist_ok=True)
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+            except Exception as e:
+                log.exception(f"Error connecting to BM25 index Redis: {e}")
+
+    def _get_generation(
+        self, collection_name: str, bump: bool = False
+    ) -> Optional[str]:
+        """
+        Return the generation of the collection, bumping it first if `bump` is set.
+        Resets of all indexes bump a shared generation, which is part of the result.
+        """
+        if self.redis is None:
+            return None
+
+        key = f"{self.GENERATION_KEY}:{collection_name}"
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.get(self.GENERATION_KEY)
+            if bump:
+                pipeline.incr(key)
+            else:
+                pipeline.get(key)
+            reset, generation = pipeline.execute()
+            return f"{int(reset or 0)}:{int(generation or 0)}"
+        except Exception as e:
+            log.error(f"Error getting BM25 index generation: {e}")
+            return None
+
+    @staticmethod
+    def _get_previous_generation(generation: Optional[str]) -> Optional[str]:
+        if generation is None:
+            return None
+        reset, _, counter = generation.partition(":")
+        return f"{reset}:{int(counter) - 1}"
+
+    def _is_current(self, conn: sqlite3.Connection, generation: Optional[str]) -> bool:
+        """Whether the index holds all changes up to `generation`."""
+        if generation is None:
+            return True
+
+        try:
+            row = conn.execute(
+                "SELECT value FROM info WHERE key = 'generation'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # Index built without Redis
+            return False
+        return row is not None and row[0] == generation
+
+    def _set_generation(self, conn: sqlite3.Connection, generation: Optional[str]):
+        if generation is not None:
+            conn.execute(
+                "INSERT OR REPLACE INTO info (key, value) VALUES ('generation', ?)",
+                (generation,),
+            )
+
+    def _get_path(self, collection_name: str) -> str:
+        name = hashlib.sha256(collection_name.encode()).hexdigest()
+        return os.path.join(self.index_dir, f"{name}.db")
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        # Do not create an empty database if the index was removed meanwhile
+        conn = sqlite3.connect(
+            f"file:{pathname2url(path)}?mode=rw", uri=True, timeout=30
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _insert(self, conn: sqlite3.Connection, items: list[dict]):
+        conn.executemany(
+            "INSERT INTO chunks (id, text, metadata) VALUES (?, ?, ?)",
+            [
+                (item["id"], item["text"], json.dumps(item["metadata"] or {}))
+                for item in items
+            ],
+        )
+
+    def has_index(self, collection_name: str) -> bool:
+        return os.path.exists(self._get_path(collection_name))
+
+    def build(self, collection_name: str, generation: Optional[str] = None) -> bool:
+        """
+        Build the index of a collection from the chunks in the vector database, as up
+        to date with `generation`, read before the chunks.
+        """
+        result = VECTOR_DB_CLIENT.get(collection_name=collection_name)
+        if result is None or not result.ids:
+            return False
+
+        path = self._get_path(collection_name)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+        try:
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                conn.execute(
+                    "CREATE VIRTUAL TABLE chunks USING fts5(text, id UNINDEXED, metadata UNINDEXED)"
+                )
+                conn.execute("CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT)")
+                self._insert(
+                    conn,
+                    [
+                        {"id": id, "text": text, "metadata": metadata}
+                        for id, text, metadata in zip(
+                            result.ids[0], result.documents[0], result.metadatas[0]
+                        )
+                    ],
+                )
+                self._set_generation(conn, generation)
+                conn.commit()
+
+            # Publish the index atomically so readers never see a partial build
+            os.replace(tmp_path, path)
+            log.info(f"Built BM25 index for collection {collection_name}")
+            return True
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _update(
+        self,
+        collection_name: str,
+        generation: Optional[str],
+        update: Callable[[sqlite3.Connection], None],
+    ) -> bool:
+        """
+        Apply `update` to the index of the collection and record it as up to date with
+        `generation`. Returns False if there is no index holding all earlier changes.
+        """
+        if not self.has_index(collection_name):
+            return False
+
+        with closing(self._connect(self._get_path(collection_name))) as conn:
+            # Check and update atomically with the workers sharing the disk
+            conn.execute("BEGIN IMMEDIATE")
+            if not self._is_current(conn, self._get_previous_generation(generation)):
+                conn.rollback()
+                return False
+
+            update(conn)
+            self._set_generation(conn, generation)
+            conn.commit()
+        return True
+
+    def add(self, collection_name: str, items: list[dict]):
+        generation = self._get_generation(collection_name, bump=True)
+        try:
+            if not self._update(
+                collection_name, generation, lambda conn: self._insert(conn, items)
+            ):
+                # Items are already in the vector database, so the build includes them
+                self._remove(collection_name)
+                self.build(collection_name, generation)
+        except Exception as e:
+            # Drop the index so it is rebuilt from the vector database on next use
+            log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+            self._remove(collection_name)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[list[str]] = None,
+        filter: Optional[dict] = None,
+    ):
+        def update(conn: sqlite3.Connection):
+            if ids:
+                conn.executemany(
+                    "DELETE FROM chunks WHERE id = ?", [(id,) for id in ids]
+                )
+            elif filter:
+                conditions = " AND ".join(
+                    "json_extract(metadata, ?) = ?" for _ in filter
+                )
+                params = []
+                for key, value in filter.items():
+                    params.extend([f'$."{key}"', value])
+                conn.execute(f"DELETE FROM chunks WHERE {conditions}", params)
+
+        generation = self._get_generation(collection_name, bump=True)
+        try:
+            if not self._update(collection_name, generation, update):
+                # Built again from the vector database on next use
+                self._remove(collection_name)
+        except Exception as e:
+            log.exception(f"Error updating BM25 index for {collection_name}: {e}")
+            self._remove(collection_name)
+
+    def _remove(self, collection_name: str):
+        path = self._get_path(collection_name)
+        for suffix in ["", "-wal", "-shm"]:
+            if os.path.exists(f"{path}{suffix}"):
+                os.remove(f"{path}{suffix}")
+
+    def _clear(self):
+        shutil.rmtree(self.index_dir, ignore_errors=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def delete_collection(self, collection_name: str):
+        self._remove(collection_name)
+        self._get_generation(collection_name, bump=True)
+
+    def reset(self):
+        self._clear()
+        if self.redis is not None:
+            try:
+                # Makes the indexes of all collections on other disks stale
+                self.redis.incr(self.GENERATION_KEY)
+            except Exception as e:
+                log.error(f"Error resetting BM25 index generation: {e}")
+
+    def search(self, collection_name: str, query: str, k: int) -> list[Document]:
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+
+        match = " OR ".join(f'"{term}"' for term in dict.fromkeys(terms))
+        generation = self._get_generation(collection_name)
+        for _ in range(2):
+            try:
+                if self.has_index(collection_name):
+                    path = self._get_path(collection_name)
+                    with closing(self._connect(path)) as conn:
+                        if self._is_current(conn, generation):
+                            rows = conn.execute(
+                                "SELECT id, text, metadata FROM chunks WHERE chunks MATCH ? ORDER BY bm25(chunks) LIMIT ?",
+                                (match, k),
+                            ).fetchall()
+                            break
+
+                    # Changed on another disk
+                    self._remove(collection_name)
+
+                if not self.build(collection_name, generation):
+                    return []
+            except sqlite3.OperationalError:
+                # Build the index again if another worker dropped it
+                if self.has_index(collection_name):
+                    raise
+        else:
+            return []
+
+        return [
+            Document(id=id, page_content=text, metadata=json.loads(metadata))
+            for id, text, metadata in rows
+        ]
+
+
+BM25_INDEX = BM25Index(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
+
+
+class BM25IndexRetriever(BaseRetriever):
+    collection_name: str
+    k: int
+
+    def _get_relevant_documents(
+        self,
+        query: str,
+        *,
+        run_manager: CallbackManagerForRetrieverRun,
+    ) -> list[Document]:
+        return BM25_INDEX.search(self.collection_name, query, self.k)
@@ -0,0 +1,259 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from open_webui.config import (
+    ENABLE_RAG_EMBEDDING_CACHE,
+    RAG_EMBEDDING_CACHE_DIR,
+    RAG_EMBEDDING_CACHE_MAX_SIZE,
+    RAG_EMBEDDING_CACHE_REDIS_URL,
+    RAG_EMBEDDING_CACHE_REDIS_TTL,
+)
+from open_webui.env import SRC_LOG_LEVELS, REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings keyed by (engine, model, prefix, sha256(text)).
+
+    Vectors are kept as float32 blobs in a local SQLite database with LRU eviction once
+    `max_size` MB are exceeded. When a Redis URL is configured, it is used as a shared
+    second level so that all instances benefit from each other's work.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = ENABLE_RAG_EMBEDDING_CACHE,
+        cache_dir: str = RAG_EMBEDDING_CACHE_DIR,
+        max_size: int = RAG_EMBEDDING_CACHE_MAX_SIZE,
+        redis_url: str = RAG_EMBEDDING_CACHE_REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+        redis_ttl: int = RAG_EMBEDDING_CACHE_REDIS_TTL,
+    ):
+        self.enabled = enabled
+        self.max_size = max_size * 1024 * 1024
+        self.redis_ttl = redis_ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+        self.lock = threading.Lock()
+        self.conn = None
+        self.size = 0
+
+        self.redis = None
+        if not self.enabled:
+            return
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.conn = sqlite3.connect(
+                os.path.join(cache_dir, "embeddings.db"),
+                timeout=30,
+                check_same_thread=False,
+            )
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB, accessed_at REAL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)"
+            )
+            self.conn.commit()
+            self.size = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+            ).fetchone()[0]
+        except Exception as e:
+            log.exception(f"Error opening embedding cache: {e}")
+            self.conn = None
+
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(
+                    redis_url, redis_sentinels, decode_responses=False
+                )
+            except Exception as e:
+                log.exception(f"Error connecting to embedding cache Redis: {e}")
+
+    @staticmethod
+    def get_key(engine: str, model: str, prefix: Optional[str], text: str) -> str:
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        return hashlib.sha256(
+            "\0".join([engine or "", model or "", prefix or "", text_hash]).encode()
+        ).hexdigest()
+
+    def _get_local(self, keys: list[str]) -> dict[str, bytes]:
+        if self.conn is None or not keys:
+            return {}
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' for _ in keys)})",
+                keys,
+            ).fetchall()
+            if rows:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key, _ in rows],
+                )
+                self.conn.commit()
+        return dict(rows)
+
+    def _set_local(self, items: dict[str, bytes]):
+        if self.conn is None or not items:
+            return
+
+        with self.lock:
+            now = time.time()
+            existing = self.conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({', '.join('?' for _ in items)})",
+                list(items.keys()),
+            ).fetchone()[0]
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)",
+                [(key, vector, now) for key, vector in items.items()],
+            )
+            self.size += sum(len(vector) for vector in items.values()) - existing
+
+            if self.size > self.max_size:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        # Drop the least recently used entries until the cache is back under 90%
+        target = int(self.max_size * 0.9)
+        rows = self.conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY accessed_at"
+        )
+
+        keys = []
+        for key, size in rows:
+            if self.size <= target:
+                break
+            keys.append((key,))
+            self.size -= size
+
+        self.conn.executemany("DELETE FROM embeddings WHERE key = ?", keys)
+        log.debug(f"Evicted {len(keys)} entries from the embedding cache")
+
+    def _get_redis(self, keys: list[str]) -> dict[str, bytes]:
+        if self.redis is None or not keys:
+            return {}
+
+        values = self.redis.mget([f"open-webui:embedding:{key}" for key in keys])
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def _set_redis(self, items: dict[str, bytes]):
+        if self.redis is None or not items:
+            return
+
+        pipeline = self.redis.pipeline()
+        for key, vector in items.items():
+            pipeline.set(f"open-webui:embedding:{key}", vector, ex=self.redis_ttl)
+        pipeline.execute()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        try:
+            # Stay well below the SQLite bound parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                found.update(self._get_local(batch))
+
+                missing = [key for key in batch if key not in found]
+                from_redis = self._get_redis(missing)
+                if from_redis:
+                    self.redis_hits += len(from_redis)
+                    self._set_local(from_redis)
+                    found.update(from_redis)
+        except Exception as e:
+            log.exception(f"Error reading embedding cache: {e}")
+
+        return {
+            key: np.frombuffer(vector, dtype=np.float32).tolist()
+            for key, vector in found.items()
+        }
+
+    def set_many(self, items: dict[str, list[float]]):
+        items = {
+            key: np.asarray(embedding, dtype=np.float32).tobytes()
+            for key, embedding in items.items()
+        }
+
+        try:
+            keys = list(items.keys())
+            for i in range(0, len(keys), 500):
+                batch = {key: items[key] for key in keys[i : i + 500]}
+                self._set_local(batch)
+                self._set_redis(batch)
+        except Exception as e:
+            log.exception(f"Error writing embedding cache: {e}")
+
+    def embed(
+        self,
+        engine: str,
+        model: str,
+        prefix: Optional[str],
+        text: Union[str, list[str]],
+        func: Callable[[list[str]], Optional[list[list[float]]]],
+    ):
+        """
+        Embed `text` with `func`, a batch embedding function, only for the texts that
+        are not cached yet. Returns a single embedding for a string, a list otherwise.
+        """
+        texts = [text] if isinstance(text, str) else text
+
+        if not self.enabled or not texts:
+            embeddings = func(texts)
+        else:
+            keys = [self.get_key(engine, model, prefix, t) for t in texts]
+            cached = self.get_many(list(dict.fromkeys(keys)))
+
+            # Embed each missing text once, even if it appears several times
+            missing = {key: t for key, t in zip(keys, texts) if key not in cached}
+            self.hits += len(texts) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+
+            if missing:
+                new_embeddings = func(list(missing.values()))
+                if new_embeddings is None:
+                    return None
+
+                new_embeddings = dict(zip(missing.keys(), new_embeddings))
+                self.set_many(new_embeddings)
+                cached.update(new_embeddings)
+
+            embeddings = [cached[key] for key in keys]
+
+        if embeddings is None:
+            return None
+        return embeddings[0] if isinstance(text, str) else embeddings
+
+    def get_stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "redis_hits": self.redis_hits,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": self.size,
+            "max_size": self.max_size,
+        }
+
+
+EMBEDDING_CACHE = EmbeddingCache(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
@@ -8,17 +8,16 @@ from concurrent.futures import ThreadPoolExecutor
 
 from huggingface_hub import snapshot_download
 from langchain.retrievers import ContextualCompressionRetriever, EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
 from langchain_core.documents import Document
 
 from open_webui.config import VECTOR_DB
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25IndexRetriever
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 from open_webui.models.users import UserModel
 from open_webui.models.files import Files
 
-from open_webui.retrieval.vector.main import GetResult
-
 
 from open_webui.env import (
     SRC_LOG_LEVELS,
@@ -66,6 +65,7 @@ class VectorSearchRetriever(BaseRetriever):
         for idx in range(len(ids)):
             results.append(
                 Document(
+                    id=ids[idx],
                     metadata=metadatas[idx],
                     page_content=documents[idx],
                 )
@@ -107,7 +107,6 @@ def get_doc(collection_name: str, user: UserModel = None):
 
 def query_doc_with_hybrid_search(
     collection_name: str,
-    collection_result: GetResult,
     query: str,
     embedding_function,
     k: int,
@@ -116,11 +115,7 @@ def query_doc_with_hybrid_search(
     r: float,
 ) -> dict:
     try:
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=collection_result.documents[0],
-            metadatas=collection_result.metadatas[0],
-        )
-        bm25_retriever.k = k
+        bm25_retriever = BM25IndexRetriever(collection_name=collection_name, k=k)
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -132,6 +127,7 @@ def query_doc_with_hybrid_search(
             retrievers=[bm25_retriever, vector_search_retriever], weights=[0.5, 0.5]
         )
         compressor = RerankCompressor(
+            collection_name=collection_name,
             embedding_function=embedding_function,
             top_n=k_reranker,
             reranking_function=reranking_function,
@@ -287,17 +283,6 @@ def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
-    # Avoid fetching the same data multiple times later
-    collection_results = {}
-    for collection_name in collection_names:
-        try:
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
-            )
-        except Exception as e:
-            log.exception(f"Failed to fetch collection {collection_name}: {e}")
-            collection_results[collection_name] = None
 
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
@@ -307,7 +292,6 @@ def query_collection_with_hybrid_search(
         try:
             result = query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -353,9 +337,15 @@ def get_embedding_function(
     embedding_batch_size,
 ):
     if embedding_engine == "":
-        return lambda query, prefix=None, user=None: embedding_function.encode(
-            query, prompt=prefix if prefix else None
-        ).tolist()
+        return lambda query, prefix=None, user=None: EMBEDDING_CACHE.embed(
+            embedding_engine,
+            embedding_model,
+            prefix,
+            query,
+            lambda texts: embedding_function.encode(
+                texts, prompt=prefix if prefix else None
+            ).tolist(),
+        )
     elif embedding_engine in ["ollama", "openai"]:
         func = lambda query, prefix=None, user=None: generate_embeddings(
             engine=embedding_engine,
@@ -697,49 +687,32 @@ def generate_embeddings(
     key = kwargs.get("key", "")
     user = kwargs.get("user")
 
-    if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
-        if isinstance(text, list):
-            text = [f"{prefix}{text_element}" for text_element in text]
-        else:
-            text = f"{prefix}{text}"
+    def generate_batch_embeddings(texts: list[str]):
+        if prefix is not None and RAG_EMBEDDING_PREFIX_FIELD_NAME is None:
+            texts = [f"{prefix}{text_element}" for text_element in texts]
 
-    if engine == "ollama":
-        if isinstance(text, list):
-            embeddings = generate_ollama_batch_embeddings(
+        if engine == "ollama":
+            return generate_ollama_batch_embeddings(
                 **{
                     "model": model,
-                    "texts": text,
+                    "texts": texts,
                     "url": url,
                     "key": key,
                     "prefix": prefix,
                     "user": user,
                 }
             )
-        else:
-            embeddings = generate_ollama_batch_embeddings(
-                **{
-                    "model": model,
-                    "texts": [text],
-                    "url": url,
-                    "key": key,
-                    "prefix": prefix,
-                    "user": user,
-                }
+        elif engine == "openai":
+            return generate_openai_batch_embeddings(
+                model, texts, url, key, prefix, user
             )
-        return embeddings[0] if isinstance(text, str) else embeddings
-    elif engine == "openai":
-        if isinstance(text, list):
-            embeddings = generate_openai_batch_embeddings(
-                model, text, url, key, prefix, user
-            )
-        else:
-            embeddings = generate_openai_batch_embeddings(
-                model, [text], url, key, prefix, user
-            )
-        return embeddings[0] if isinstance(text, str) else embeddings
+
+    return EMBEDDING_CACHE.embed(engine, model, prefix, text, generate_batch_embeddings)
 
 
 import operator
+
+import numpy as np
 from typing import Optional, Sequence
 
 from langchain_core.callbacks import Callbacks
@@ -751,11 +724,47 @@ class RerankCompressor(BaseDocumentCompressor):
     top_n: int
     reranking_function: Any
     r_score: float
+    collection_name: Optional[str] = None
 
     class Config:
         extra = "forbid"
         arbitrary_types_allowed = True
 
+    def get_document_embeddings(
+        self, documents: Sequence[Document], dimension: int
+    ) -> np.ndarray:
+        # Reuse the vectors stored at ingestion time, only embed chunks without one
+        stored = {}
+        ids = [doc.id for doc in documents if doc.id]
+        if self.collection_name and ids:
+            try:
+                stored = {
+                    id: np.asarray(vector, dtype=np.float32)
+                    for id, vector in VECTOR_DB_CLIENT.get_vectors(
+                        self.collection_name, ids
+                    ).items()
+                }
+            except Exception as e:
+                log.warning(f"RerankCompressor: error getting stored vectors: {e}")
+
+        # Vectors may be zero-padded by the vector database (e.g. pgvector)
+        stored = {
+            id: vector[:dimension]
+            for id, vector in stored.items()
+            if len(vector) >= dimension and not vector[dimension:].any()
+        }
+
+        missing = [doc for doc in documents if doc.id not in stored]
+        if missing:
+            log.debug(f"RerankCompressor: embedding {len(missing)} documents")
+            embeddings = self.embedding_function(
+                [doc.page_content for doc in missing], RAG_EMBEDDING_CONTENT_PREFIX
+            )
+            for doc, embedding in zip(missing, embeddings):
+                stored[doc.id or id(doc)] = np.asarray(embedding, dtype=np.float32)
+
+        return np.vstack([stored[doc.id or id(doc)] for doc in documents])
+
     def compress_documents(
         self,
         documents: Sequence[Document],
@@ -769,13 +778,18 @@ class RerankCompressor(BaseDocumentCompressor):
                 [(query, doc.page_content) for doc in documents]
             )
         else:
-            from sentence_transformers import util
+            query_embedding = np.asarray(
+                self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX),
+                dtype=np.float32,
+            )
+            document_embeddings = self.get_document_embeddings(
+                documents, len(query_embedding)
+            )
 
-            query_embedding = self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-            document_embedding = self.embedding_function(
-                [doc.page_content for doc in documents], RAG_EMBEDDING_CONTENT_PREFIX
+            norms = np.linalg.norm(document_embeddings, axis=1) * np.linalg.norm(
+                query_embedding
             )
-            scores = util.cos_sim(query_embedding, document_embedding)[0]
+            scores = document_embeddings @ query_embedding / np.maximum(norms, 1e-12)
 
         docs_with_scores = list(zip(documents, scores.tolist()))
         if self.r_score:
@@ -1,11 +1,17 @@
 import chromadb
 import logging
+import uuid
 from chromadb import Settings
 from chromadb.utils.batch_utils import create_batches
 
 from typing import Optional
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     CHROMA_DATA_PATH,
     CHROMA_HTTP_HOST,
@@ -23,7 +29,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class ChromaClient:
+class ChromaClient(VectorDBBase):
     def __init__(self):
         settings_dict = {
             "allow_reset": True,
@@ -130,6 +136,17 @@ class ChromaClient:
             )
         return None
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        try:
+            collection = self.client.get_collection(name=collection_name)
+        except Exception:
+            return {}
+
+        result = collection.get(ids=ids, include=["embeddings"])
+        return {
+            id: list(vector) for id, vector in zip(result["ids"], result["embeddings"])
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
@@ -150,6 +167,38 @@ class ChromaClient:
         ):
             collection.add(*batch)
 
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> list[VectorItem]:
+        # Copy the items matching the filter to another collection, reusing their embeddings.
+        try:
+            source = self.client.get_collection(name=source_collection_name)
+        except Exception:
+            return []
+
+        result = source.get(
+            where=filter or None, include=["documents", "metadatas", "embeddings"]
+        )
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": text,
+                "vector": list(vector),
+                "metadata": {**(item_metadata or {}), **(metadata or {})},
+            }
+            for text, vector, item_metadata in zip(
+                result["documents"], result["embeddings"], result["metadatas"]
+            )
+        ]
+
+        if items:
+            self.insert(collection_name, items)
+        return items
+
     def upsert(self, collection_name: str, items: list[VectorItem]):
         # Update the items in the collection, if the items are not present, insert them. If the collection does not exist, it will be created.
         collection = self.client.get_or_create_collection(
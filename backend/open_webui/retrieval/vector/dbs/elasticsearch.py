@@ -1,8 +1,14 @@
 from elasticsearch import Elasticsearch, BadRequestError
 from typing import Optional
 import ssl
+import uuid
 from elasticsearch.helpers import bulk, scan
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     ELASTICSEARCH_URL,
     ELASTICSEARCH_CA_CERTS,
@@ -15,7 +21,7 @@ from open_webui.config import (
 )
 
 
-class ElasticsearchClient:
+class ElasticsearchClient(VectorDBBase):
     """
     Important:
     in order to reduce the number of indexes and since the embedding vector length is fixed, we avoid creating
@@ -224,6 +230,23 @@ class ElasticsearchClient:
 
         return self._scan_result_to_get_result(results)
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        query = {
+            "query": {
+                "bool": {
+                    "filter": [
+                        {"term": {"collection": collection_name}},
+                        {"ids": {"values": ids}},
+                    ]
+                }
+            },
+            "_source": ["vector"],
+        }
+        result = self.client.search(
+            index=f"{self.index_prefix}*", body=query, size=len(ids)
+        )
+        return {hit["_id"]: hit["_source"]["vector"] for hit in result["hits"]["hits"]}
+
     # Status: works
     def insert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
@@ -245,6 +268,42 @@ class ElasticsearchClient:
             ]
             bulk(self.client, actions)
 
+    # Copy the documents matching the filter to another collection, reusing their vectors.
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> list[VectorItem]:
+        query = {
+            "query": {
+                "bool": {"filter": [{"term": {"collection": source_collection_name}}]}
+            },
+            "_source": ["text", "metadata", "vector"],
+        }
+        for field, value in (filter or {}).items():
+            query["query"]["bool"]["filter"].append(
+                {"term": {f"metadata.{field}": value}}
+            )
+
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": hit["_source"].get("text"),
+                "vector": hit["_source"]["vector"],
+                "metadata": {
+                    **(hit["_source"].get("metadata") or {}),
+                    **(metadata or {}),
+                },
+            }
+            for hit in scan(self.client, index=f"{self.index_prefix}*", query=query)
+        ]
+
+        if items:
+            self.insert(collection_name, items)
+        return items
+
     # Upsert documents using the update API with doc_as_upsert=True.
     def upsert(self, collection_name: str, items: list[VectorItem]):
         if not self._has_index(dimension=len(items[0]["vector"])):
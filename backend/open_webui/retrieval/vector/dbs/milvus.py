@@ -2,9 +2,15 @@ from pymilvus import MilvusClient as Client
 from pymilvus import FieldSchema, DataType
 import json
 import logging
+import uuid
 from typing import Optional
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     MILVUS_URI,
     MILVUS_DB,
@@ -16,7 +22,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class MilvusClient:
+class MilvusClient(VectorDBBase):
     def __init__(self):
         self.collection_prefix = "open_webui"
         if MILVUS_TOKEN is None:
@@ -219,6 +225,21 @@ class MilvusClient:
         )
         return self._result_to_get_result([result])
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        collection_name = collection_name.replace("-", "_")
+        if not self.has_collection(collection_name):
+            return {}
+
+        results = self.client.get(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            output_fields=["vector"],
+        )
+        return {
+            result["id"]: [float(value) for value in result["vector"]]
+            for result in results
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
@@ -242,6 +263,53 @@ class MilvusClient:
             ],
         )
 
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> list[VectorItem]:
+        # Copy the items matching the filter to another collection, reusing their vectors.
+        source_collection_name = source_collection_name.replace("-", "_")
+        if not self.has_collection(source_collection_name):
+            return []
+
+        filter_string = " && ".join(
+            [
+                f'metadata["{key}"] == {json.dumps(value)}'
+                for key, value in (filter or {}).items()
+            ]
+        )
+
+        max_limit = 16383  # The maximum number of records per request
+        items = []
+        offset = 0
+        while True:
+            results = self.client.query(
+                collection_name=f"{self.collection_prefix}_{source_collection_name}",
+                filter=filter_string or 'id != ""',
+                output_fields=["vector", "data", "metadata"],
+                limit=max_limit,
+                offset=offset,
+            )
+            items.extend(
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": result.get("data", {}).get("text"),
+                    "vector": [float(value) for value in result.get("vector")],
+                    "metadata": {**(result.get("metadata") or {}), **(metadata or {})},
+                }
+                for result in results
+            )
+            offset += len(results)
+            if len(results) < max_limit:
+                break
+
+        if items:
+            self.insert(collection_name, items)
+        return items
+
     def upsert(self, collection_name: str, items: list[VectorItem]):
         # Update the items in the collection, if the items are not present, insert them. If the collection does not exist, it will be created.
         collection_name = collection_name.replace("-", "_")
@@ -1,8 +1,14 @@
 from opensearchpy import OpenSearch
-from opensearchpy.helpers import bulk
+from opensearchpy.helpers import bulk, scan
 from typing import Optional
+import uuid
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import (
     OPENSEARCH_URI,
     OPENSEARCH_SSL,
@@ -12,7 +18,7 @@ from open_webui.config import (
 )
 
 
-class OpenSearchClient:
+class OpenSearchClient(VectorDBBase):
     def __init__(self):
         self.index_prefix = "open_webui"
         self.client = OpenSearch(
@@ -181,6 +187,21 @@ class OpenSearchClient:
         )
         return self._result_to_get_result(result)
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        if not self.has_collection(collection_name):
+            return {}
+
+        result = self.client.mget(
+            index=self._get_index_name(collection_name),
+            body={"ids": ids},
+            params={"_source_includes": "vector"},
+        )
+        return {
+            doc["_id"]: doc["_source"]["vector"]
+            for doc in result["docs"]
+            if doc.get("found")
+        }
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
@@ -202,6 +223,47 @@ class OpenSearchClient:
             ]
             bulk(self.client, actions)
 
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> list[VectorItem]:
+        # Copy the documents matching the filter to another index, reusing their vectors.
+        if not self.has_collection(source_collection_name):
+            return []
+
+        query_body = {
+            "query": {"bool": {"filter": []}},
+            "_source": ["text", "metadata", "vector"],
+        }
+        for field, value in (filter or {}).items():
+            query_body["query"]["bool"]["filter"].append(
+                {"match": {"metadata." + str(field): value}}
+            )
+
+        items = [
+            {
+                "id": str(uuid.uuid4()),
+                "text": hit["_source"].get("text"),
+                "vector": hit["_source"]["vector"],
+                "metadata": {
+                    **(hit["_source"].get("metadata") or {}),
+                    **(metadata or {}),
+                },
+            }
+            for hit in scan(
+                self.client,
+                index=self._get_index_name(source_collection_name),
+                query=query_body,
+            )
+        ]
+
+        if items:
+            self.insert(collection_name, items)
+        return items
+
     def upsert(self, collection_name: str, items: list[VectorItem]):
         self._create_index_if_not_exists(
             collection_name=collection_name, dimension=len(items[0]["vector"])
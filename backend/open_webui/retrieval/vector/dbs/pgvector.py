@@ -4,6 +4,9 @@ from sqlalchemy import (
     cast,
     column,
     create_engine,
+    func,
+    insert,
+    literal,
     Column,
     Integer,
     MetaData,
@@ -22,7 +25,12 @@ from pgvector.sqlalchemy import Vector
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.exc import NoSuchTableError
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import PGVECTOR_DB_URL, PGVECTOR_INITIALIZE_MAX_VECTOR_LENGTH
 
 from open_webui.env import SRC_LOG_LEVELS
@@ -44,7 +52,7 @@ class DocumentChunk(Base):
     vmetadata = Column(MutableDict.as_mutable(JSONB), nullable=True)
 
 
-class PgvectorClient:
+class PgvectorClient(VectorDBBase):
     def __init__(self) -> None:
 
         # if no pgvector uri, use the existing database connection
@@ -164,6 +172,60 @@ class PgvectorClient:
             log.exception(f"Error during insert: {e}")
             raise
 
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[VectorItem]:
+        # Copy the chunks matching the filter inside the database, reusing their vectors.
+        try:
+            query = select(
+                cast(func.gen_random_uuid(), Text),
+                DocumentChunk.vector,
+                literal(collection_name),
+                DocumentChunk.text,
+                (
+                    DocumentChunk.vmetadata.op("||")(literal(metadata, JSONB))
+                    if metadata
+                    else DocumentChunk.vmetadata
+                ),
+            ).where(DocumentChunk.collection_name == source_collection_name)
+            for key, value in (filter or {}).items():
+                query = query.where(DocumentChunk.vmetadata[key].astext == str(value))
+
+            results = self.session.execute(
+                insert(DocumentChunk)
+                .from_select(
+                    ["id", "vector", "collection_name", "text", "vmetadata"], query
+                )
+                .returning(
+                    DocumentChunk.id,
+                    DocumentChunk.vector,
+                    DocumentChunk.text,
+                    DocumentChunk.vmetadata,
+                )
+            ).all()
+            self.session.commit()
+            log.info(
+                f"Copied {len(results)} items from collection '{source_collection_name}' to '{collection_name}'."
+            )
+
+            return [
+                {
+                    "id": result.id,
+                    "text": result.text,
+                    "vector": [float(value) for value in result.vector],
+                    "metadata": result.vmetadata,
+                }
+                for result in results
+            ]
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during copy: {e}")
+            raise
+
     def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
         try:
             for item in items:
@@ -347,6 +409,25 @@ class PgvectorClient:
             log.exception(f"Error during get: {e}")
             return None
 
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        try:
+            results = self.session.execute(
+                select(DocumentChunk.id, DocumentChunk.vector).where(
+                    DocumentChunk.collection_name == collection_name,
+                    DocumentChunk.id.in_(ids),
+                )
+            ).all()
+            return {
+                result.id: [float(value) for value in result.vector]
+                for result in results
+            }
+        except Exception as e:
+            self.session.rollback()
+            log.exception(f"Error during get_vectors: {e}")
+            return {}
+
     def delete(
         self,
         collection_name: str,
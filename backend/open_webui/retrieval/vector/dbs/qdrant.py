@@ -1,11 +1,17 @@
 from typing import Optional
 import logging
+import uuid
 
 from qdrant_client import QdrantClient as Qclient
 from qdrant_client.http.models import PointStruct
 from qdrant_client.models import models
 
-from open_webui.retrieval.vector.main import VectorItem, SearchResult, GetResult
+from open_webui.retrieval.vector.main import (
+    VectorDBBase,
+    VectorItem,
+    SearchResult,
+    GetResult,
+)
 from open_webui.config import QDRANT_URI, QDRANT_API_KEY
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -15,7 +21,7 @@ log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-class QdrantClient:
+class QdrantClient(VectorDBBase):
     def __init__(self):
         self.collection_prefix = "open-webui"
         self.QDRANT_URI = QDRANT_URI
@@ -137,12 +143,72 @@ class QdrantClient:
         )
         return self._result_to_get_result(points.points)
 
+    def get_vectors(self, collection_name: str, ids: list[str]) -> dict[str, list]:
+        if not self.has_collection(collection_name):
+            return {}
+
+        points = self.client.retrieve(
+            collection_name=f"{self.collection_prefix}_{collection_name}",
+            ids=ids,
+            with_payload=False,
+            with_vectors=True,
+        )
+        return {str(point.id): point.vector for point in points}
+
     def insert(self, collection_name: str, items: list[VectorItem]):
         # Insert the items into the collection, if the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
         points = self._create_points(items)
         self.client.upload_points(f"{self.collection_prefix}_{collection_name}", points)
 
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> list[VectorItem]:
+        # Copy the items matching the filter to another collection, reusing their vectors.
+        if not self.has_collection(source_collection_name):
+            return []
+
+        field_conditions = [
+            models.FieldCondition(
+                key=f"metadata.{key}", match=models.MatchValue(value=value)
+            )
+            for key, value in (filter or {}).items()
+        ]
+
+        items = []
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=f"{self.collection_prefix}_{source_collection_name}",
+                scroll_filter=models.Filter(must=field_conditions),
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            items.extend(
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": point.payload["text"],
+                    "vector": point.vector,
+                    "metadata": {
+                        **(point.payload["metadata"] or {}),
+                        **(metadata or {}),
+                    },
+                }
+                for point in points
+            )
+            if offset is None:
+                break
+
+        if items:
+            self.insert(collection_name, items)
+        return items
+
     def upsert(self, collection_name: str, items: list[VectorItem]):
         # Update the items in the collection, if the items are not present, insert them. If the collection does not exist, it will be created.
         self._create_collection_if_not_exists(collection_name, len(items[0]["vector"]))
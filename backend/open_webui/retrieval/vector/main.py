@@ -1,5 +1,7 @@
+from abc import ABC, abstractmethod
+
 from pydantic import BaseModel
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict
 
 
 class VectorItem(BaseModel):
@@ -17,3 +19,29 @@ class GetResult(BaseModel):
 
 class SearchResult(GetResult):
     distances: Optional[List[List[float | int]]]
+
+
+class VectorDBBase(ABC):
+    @abstractmethod
+    def get_vectors(
+        self, collection_name: str, ids: List[str]
+    ) -> Dict[str, List[float]]:
+        """
+        Return the stored vectors of the items of `collection_name` with `ids`, by id.
+        Unknown ids are skipped.
+        """
+
+    @abstractmethod
+    def copy(
+        self,
+        source_collection_name: str,
+        collection_name: str,
+        filter: Optional[dict] = None,
+        metadata: Optional[dict] = None,
+    ) -> List[VectorItem]:
+        """
+        Copy the items of `source_collection_name` matching `filter` to
+        `collection_name`, reusing their vectors instead of embedding them again.
+        `metadata`, if any, is merged into the metadata of the copies, which are
+        returned.
+        """
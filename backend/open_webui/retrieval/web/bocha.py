@@ -1,9 +1,12 @@
 import logging
 from typing import Optional
 
-import requests
 import json
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    get_json_response,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
@@ -34,7 +37,7 @@ def _parse_response(response):
     return result
 
 
-def search_bocha(
+async def search_bocha(
     api_key: str, query: str, count: int, filter_list: Optional[list[str]] = None
 ) -> list[SearchResult]:
     """Search using Bocha's Search API and return the results as a list of SearchResult objects.
@@ -50,9 +53,9 @@ def search_bocha(
         {"query": query, "summary": True, "freshness": "noLimit", "count": count}
     )
 
-    response = requests.post(url, headers=headers, data=payload, timeout=5)
-    response.raise_for_status()
-    results = _parse_response(response.json())
+    results = _parse_response(
+        await get_json_response("POST", url, headers=headers, data=payload)
+    )
     print(results)
     if filter_list:
         results = get_filtered_results(results, filter_list)
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    WEB_PAGE_CACHE_MAX_SIZE,
+    WEB_PAGE_CACHE_TTL,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+
+class WebPage:
+    def __init__(
+        self, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ):
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.monotonic()
+
+
+class WebPageCache:
+    """
+    Web pages fetched by the web loader, shared by all searches.
+
+    Pages younger than `ttl` seconds are served as is. Older pages are revalidated
+    with their ETag / Last-Modified, so unchanged pages cost a 304 instead of a full
+    download. Concurrent fetches of the same URL share one request and the least
+    recently used pages are evicted above `max_size` MB.
+    """
+
+    def __init__(
+        self, ttl: int = WEB_PAGE_CACHE_TTL, max_size: int = WEB_PAGE_CACHE_MAX_SIZE
+    ):
+        self.ttl = ttl
+        self.max_size = max_size * 1024 * 1024
+        self.size = 0
+        self.pages: OrderedDict[str, WebPage] = OrderedDict()
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def _set(self, url: str, page: WebPage):
+        self._remove(url)
+        if len(page.text) > self.max_size:
+            return
+
+        self.pages[url] = page
+        self.size += len(page.text)
+        while self.size > self.max_size:
+            self._remove(next(iter(self.pages)))
+
+    def _remove(self, url: str):
+        page = self.pages.pop(url, None)
+        if page is not None:
+            self.size -= len(page.text)
+
+    async def _revalidate(
+        self,
+        url: str,
+        fetch: Callable[[dict], Awaitable[tuple[int, str, dict]]],
+        page: Optional[WebPage],
+    ) -> str:
+        headers = {}
+        if page is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+
+        status, text, response_headers = await fetch(headers)
+
+        if status == 304 and page is not None:
+            log.debug(f"Web page not modified: {url}")
+            page.fetched_at = time.monotonic()
+            return page.text
+
+        if status != 200 or "no-store" in response_headers.get("Cache-Control", ""):
+            self._remove(url)
+        else:
+            self._set(
+                url,
+                WebPage(
+                    text,
+                    etag=response_headers.get("ETag"),
+                    last_modified=response_headers.get("Last-Modified"),
+                ),
+            )
+        return text
+
+    async def fetch(
+        self, url: str, fetch: Callable[[dict], Awaitable[tuple[int, str, dict]]]
+    ) -> str:
+        """
+        Return the content of `url`. `fetch` is called with the conditional headers to
+        send and returns the status, text and headers of the response.
+        """
+        if self.ttl <= 0:
+            _, text, _ = await fetch({})
+            return text
+
+        page = self.pages.get(url)
+        if page is not None and time.monotonic() - page.fetched_at < self.ttl:
+            self.pages.move_to_end(url)
+            return page.text
+
+        task = self.tasks.get(url)
+        if task is None:
+            task = asyncio.create_task(self._revalidate(url, fetch, page))
+            task.add_done_callback(lambda _: self.tasks.pop(url, None))
+            self.tasks[url] = task
+        return await asyncio.shield(task)
+
+
+WEB_PAGE_CACHE = WebPageCache()
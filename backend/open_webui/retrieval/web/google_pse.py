@@ -1,15 +1,18 @@
 import logging
 from typing import Optional
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    get_json_response,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def search_google_pse(
+async def search_google_pse(
     api_key: str,
     search_engine_id: str,
     query: str,
@@ -43,9 +46,9 @@ def search_google_pse(
             "num": num_results_this_page,
             "start": start_index,
         }
-        response = requests.request("GET", url, headers=headers, params=params)
-        response.raise_for_status()
-        json_response = response.json()
+        json_response = await get_json_response(
+            "GET", url, headers=headers, params=params
+        )
         results = json_response.get("items", [])
         if results:  # check if results are returned. If not, no more pages to fetch.
             all_results.extend(results)
@@ -1,10 +1,18 @@
+import asyncio
 import validators
 
 from typing import Optional
 from urllib.parse import urlparse
 
+import aiohttp
 from pydantic import BaseModel
 
+from open_webui.env import (
+    AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH,
+    WEB_SEARCH_ENGINE_CONCURRENCY,
+)
+from open_webui.utils.session_pool import get_session
+
 
 def get_filtered_results(results, filter_list):
     if not filter_list:
@@ -20,6 +28,30 @@ def get_filtered_results(results, filter_list):
     return filtered_results
 
 
+async def get_json_response(method: str, url: str, **kwargs):
+    """Send a request to a search API on the shared client session and return its JSON."""
+    async with get_session(url).request(
+        method,
+        url,
+        timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH),
+        **kwargs,
+    ) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
+
+
+SEARCH_ENGINE_SEMAPHORES: dict[str, asyncio.Semaphore] = {}
+
+
+def get_search_engine_semaphore(engine: str) -> asyncio.Semaphore:
+    """Limit the requests sent to a search engine at once, across all chats."""
+    if engine not in SEARCH_ENGINE_SEMAPHORES:
+        SEARCH_ENGINE_SEMAPHORES[engine] = asyncio.Semaphore(
+            WEB_SEARCH_ENGINE_CONCURRENCY
+        )
+    return SEARCH_ENGINE_SEMAPHORES[engine]
+
+
 class SearchResult(BaseModel):
     link: str
     title: Optional[str]
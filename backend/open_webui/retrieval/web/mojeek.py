@@ -1,15 +1,18 @@
 import logging
 from typing import Optional
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    get_json_response,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def search_mojeek(
+async def search_mojeek(
     api_key: str, query: str, count: int, filter_list: Optional[list[str]] = None
 ) -> list[SearchResult]:
     """Search using Mojeek's Search API and return the results as a list of SearchResult objects.
@@ -24,9 +27,7 @@ def search_mojeek(
     }
     params = {"q": query, "api_key": api_key, "fmt": "json", "t": count}
 
-    response = requests.get(url, headers=headers, params=params)
-    response.raise_for_status()
-    json_response = response.json()
+    json_response = await get_json_response("GET", url, headers=headers, params=params)
     results = json_response.get("response", {}).get("results", [])
     print(results)
     if filter_list:
@@ -1,15 +1,18 @@
 import logging
 from typing import Optional
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    get_json_response,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def search_searxng(
+async def search_searxng(
     query_url: str,
     query: str,
     count: int,
@@ -36,7 +39,7 @@ def search_searxng(
         list[SearchResult]: A list of SearchResults sorted by relevance score in descending order.
 
     Raise:
-        requests.exceptions.RequestException: If a request error occurs during the search process.
+        aiohttp.ClientError: If a request error occurs during the search process.
     """
 
     # Default values for optional parameters are provided as empty strings or None when not specified.
@@ -64,7 +67,8 @@ def search_searxng(
 
     log.debug(f"searching {query_url}")
 
-    response = requests.get(
+    json_response = await get_json_response(
+        "GET",
         query_url,
         headers={
             "User-Agent": "Open WebUI (https://github.com/open-webui/open-webui) RAG Bot",
@@ -76,9 +80,6 @@ def search_searxng(
         params=params,
     )
 
-    response.raise_for_status()  # Raise an exception for HTTP errors.
-
-    json_response = response.json()
     results = json_response.get("results", [])
     sorted_results = sorted(results, key=lambda x: x.get("score", 0), reverse=True)
     if filter_list:
@@ -2,15 +2,18 @@ import logging
 from typing import Optional
 from urllib.parse import urlencode
 
-import requests
-from open_webui.retrieval.web.main import SearchResult, get_filtered_results
+from open_webui.retrieval.web.main import (
+    SearchResult,
+    get_filtered_results,
+    get_json_response,
+)
 from open_webui.env import SRC_LOG_LEVELS
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["RAG"])
 
 
-def search_serpapi(
+async def search_serpapi(
     api_key: str,
     engine: str,
     query: str,
@@ -30,9 +33,7 @@ def search_serpapi(
     payload = {"engine": engine, "q": query, "api_key": api_key}
 
     url = f"{url}?{urlencode(payload)}"
-    response = requests.request("GET", url)
-
-    json_response = response.json()
+    json_response = await get_json_response("GET", url)
     log.info(f"results from serpapi search: {json_response}")
 
     results = sorted(
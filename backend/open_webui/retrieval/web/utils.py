@@ -25,6 +25,7 @@ from langchain_community.document_loaders.firecrawl import FireCrawlLoader
 from langchain_community.document_loaders.base import BaseLoader
 from langchain_core.documents import Document
 from open_webui.retrieval.loaders.tavily import TavilyLoader
+from open_webui.retrieval.web.cache import WEB_PAGE_CACHE
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.config import (
     ENABLE_RAG_LOCAL_WEB_FETCH,
@@ -493,14 +494,19 @@ class SafeWebBaseLoader(WebBaseLoader):
         super().__init__(*args, **kwargs)
         self.trust_env = trust_env
 
-    async def _fetch(
-        self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
-    ) -> str:
+    async def _fetch_page(
+        self,
+        url: str,
+        headers: dict,
+        retries: int = 3,
+        cooldown: int = 2,
+        backoff: float = 1.5,
+    ) -> tuple[int, str, dict]:
         async with aiohttp.ClientSession(trust_env=self.trust_env) as session:
             for i in range(retries):
                 try:
                     kwargs: Dict = dict(
-                        headers=self.session.headers,
+                        headers={**self.session.headers, **headers},
                         cookies=self.session.cookies.get_dict(),
                     )
                     if not self.session.verify:
@@ -511,7 +517,13 @@ class SafeWebBaseLoader(WebBaseLoader):
                     ) as response:
                         if self.raise_for_status:
                             response.raise_for_status()
-                        return await response.text()
+                        if response.status == 304:
+                            return response.status, "", dict(response.headers)
+                        return (
+                            response.status,
+                            await response.text(),
+                            dict(response.headers),
+                        )
                 except aiohttp.ClientConnectionError as e:
                     if i == retries - 1:
                         raise
@@ -523,6 +535,14 @@ class SafeWebBaseLoader(WebBaseLoader):
                         await asyncio.sleep(cooldown * backoff**i)
         raise ValueError("retry count exceeded")
 
+    async def _fetch(
+        self, url: str, retries: int = 3, cooldown: int = 2, backoff: float = 1.5
+    ) -> str:
+        return await WEB_PAGE_CACHE.fetch(
+            url,
+            lambda headers: self._fetch_page(url, headers, retries, cooldown, backoff),
+        )
+
     def _unpack_fetch_results(
         self, results: Any, urls: List[str], parser: Union[str, None] = None
     ) -> List[Any]:
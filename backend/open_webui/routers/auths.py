@@ -43,6 +43,7 @@ from open_webui.utils.auth import (
     get_password_hash,
 )
 from open_webui.utils.webhook import post_webhook
+from open_webui.utils.principal_cache import PRINCIPAL_CACHE
 from open_webui.utils.access_control import get_permissions
 
 from typing import Optional, List
@@ -524,6 +525,9 @@ async def signup(request: Request, response: Response, form_data: SignupForm):
 
 @router.get("/signout")
 async def signout(request: Request, response: Response):
+    token = request.cookies.get("token")
+    if token:
+        PRINCIPAL_CACHE.invalidate_token(token)
     response.delete_cookie("token")
 
     if ENABLE_OAUTH_SIGNUP.value:
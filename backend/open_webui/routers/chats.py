@@ -342,7 +342,7 @@ async def get_user_chat_list_by_tag_name(
 
 @router.get("/{id}", response_model=Optional[ChatResponse])
 async def get_chat_by_id(id: str, user=Depends(get_verified_user)):
-    chat = Chats.get_chat_by_id_and_user_id(id, user.id)
+    chat = await Chats.get_chat_by_id_and_user_id_async(id, user.id)
 
     if chat:
         return ChatResponse(**chat.model_dump())
@@ -362,10 +362,10 @@ async def get_chat_by_id(id: str, user=Depends(get_verified_user)):
 async def update_chat_by_id(
     id: str, form_data: ChatForm, user=Depends(get_verified_user)
 ):
-    chat = Chats.get_chat_by_id_and_user_id(id, user.id)
+    chat = await Chats.get_chat_by_id_and_user_id_async(id, user.id)
     if chat:
         updated_chat = {**chat.chat, **form_data.chat}
-        chat = Chats.update_chat_by_id(id, updated_chat)
+        chat = await Chats.update_chat_by_id_async(id, updated_chat)
         return ChatResponse(**chat.model_dump())
     else:
         raise HTTPException(
@@ -385,7 +385,7 @@ class MessageForm(BaseModel):
 async def update_chat_message_by_id(
     id: str, message_id: str, form_data: MessageForm, user=Depends(get_verified_user)
 ):
-    chat = Chats.get_chat_by_id(id)
+    chat = await Chats.get_chat_by_id_async(id)
 
     if not chat:
         raise HTTPException(
@@ -399,7 +399,7 @@ async def update_chat_message_by_id(
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
 
-    chat = Chats.upsert_message_to_chat_by_id_and_message_id(
+    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
         id,
         message_id,
         {
@@ -428,6 +428,7 @@ async def update_chat_message_by_id(
             }
         )
 
+    chat = await Chats.get_chat_by_id_async(id)
     return ChatResponse(**chat.model_dump())
 
 
@@ -443,7 +444,7 @@ class EventForm(BaseModel):
 async def send_chat_message_event_by_id(
     id: str, message_id: str, form_data: EventForm, user=Depends(get_verified_user)
 ):
-    chat = Chats.get_chat_by_id(id)
+    chat = await Chats.get_chat_by_id_async(id)
 
     if not chat:
         raise HTTPException(
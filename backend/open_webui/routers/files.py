@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os
 import uuid
@@ -15,22 +16,35 @@ from fastapi import (
     status,
     Query,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from open_webui.config import (
+    STORAGE_DELIVERY_MODE,
+    STORAGE_PRESIGNED_URL_EXPIRES,
+    STORAGE_PROVIDER,
+)
 from open_webui.constants import ERROR_MESSAGES
-from open_webui.env import SRC_LOG_LEVELS
+from open_webui.env import ENABLE_BACKGROUND_FILE_PROCESSING, SRC_LOG_LEVELS
 from open_webui.models.files import (
+    FileBlobs,
     FileForm,
     FileModel,
     FileModelResponse,
     Files,
 )
+from open_webui.models.ingestion import (
+    IngestionJobModel,
+    IngestionJobResponse,
+    IngestionJobs,
+)
 from open_webui.models.knowledge import Knowledges
+from open_webui.models.users import Users
 
 from open_webui.routers.knowledge import get_knowledge, get_knowledge_list
 from open_webui.routers.retrieval import ProcessFileForm, process_file
 from open_webui.routers.audio import transcribe
 from open_webui.storage.provider import Storage
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import INGESTION_QUEUE
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
@@ -72,6 +86,54 @@ def has_access_to_file(
     return has_access
 
 
+############################
+# Process Uploaded File
+############################
+
+
+def process_uploaded_file(request: Request, file: FileModel, user):
+    """Extract or transcribe the content of an uploaded file and embed it."""
+    content_type = file.meta.get("content_type")
+    source_file = FileBlobs.get_source_file(file)
+
+    if source_file:
+        # Reuse the extracted content and vectors of the same content
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
+    elif content_type in [
+        "audio/mpeg",
+        "audio/wav",
+        "audio/ogg",
+        "audio/x-m4a",
+    ]:
+        file_path = Storage.get_file(file.path)
+        result = transcribe(request, file_path)
+        process_file(
+            request,
+            ProcessFileForm(file_id=file.id, content=result.get("text", "")),
+            user=user,
+        )
+    elif content_type not in ["image/png", "image/jpeg", "image/gif"]:
+        process_file(request, ProcessFileForm(file_id=file.id), user=user)
+
+    if file.meta.get("sha256") and not source_file:
+        # Later uploads of the same content reuse this file
+        FileBlobs.update_blob_file_id_by_hash(
+            file.meta["sha256"], file.id, path=file.path
+        )
+
+
+def process_file_job(request: Request, job: IngestionJobModel):
+    file = Files.get_file_by_id(job.file_id)
+    if not file:
+        raise Exception(ERROR_MESSAGES.NOT_FOUND)
+
+    user = Users.get_user_by_id(job.user_id)
+    process_uploaded_file(request, file, user)
+
+
+INGESTION_QUEUE.register("file", process_file_job)
+
+
 ############################
 # Upload File
 ############################
@@ -84,17 +146,40 @@ def upload_file(
     user=Depends(get_verified_user),
     file_metadata: dict = {},
     process: bool = Query(True),
+    process_in_background: Optional[bool] = Query(None),
 ):
     log.info(f"file.content_type: {file.content_type}")
     try:
         unsanitized_filename = file.filename
         filename = os.path.basename(unsanitized_filename)
 
+        max_size = request.app.state.config.FILE_MAX_SIZE
+        if max_size:
+            max_size = max_size * 1024 * 1024
+            # Refuse files known to be too large before copying them to the storage
+            if file.size is not None and file.size > max_size:
+                raise ValueError(
+                    ERROR_MESSAGES.FILE_TOO_LARGE(
+                        size=f"{request.app.state.config.FILE_MAX_SIZE}MB"
+                    )
+                )
+
         # replace filename with uuid
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(file.file, filename)
+        size, sha256, file_path = Storage.upload_file(
+            file.file, filename, max_size=max_size or None
+        )
+
+        blob = FileBlobs.acquire_blob(sha256, file_path, size, id)
+        if blob and blob.path != file_path:
+            # The same content is already stored, keep a single copy of it
+            try:
+                Storage.delete_file(file_path)
+            except Exception as e:
+                log.warning(f"Error deleting duplicate file {file_path}: {e}")
+            file_path = blob.path
 
         file_item = Files.insert_new_file(
             user.id,
@@ -106,30 +191,33 @@ def upload_file(
                     "meta": {
                         "name": name,
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
+                        "sha256": sha256,
                         "data": file_metadata,
                     },
                 }
             ),
         )
-        if process:
+        if process_in_background is None:
+            process_in_background = ENABLE_BACKGROUND_FILE_PROCESSING
+
+        job = None
+        if process and file_item and process_in_background:
+            # Answer right away, the status is pushed as `file:status` events
+            job = INGESTION_QUEUE.enqueue("file", id, user.id)
+            if job:
+                file_item = FileModelResponse(
+                    **{
+                        **file_item.model_dump(),
+                        "job_id": job.id,
+                        "status": job.status,
+                    }
+                )
+
+        if process and file_item and not job:
             try:
-                if file.content_type in [
-                    "audio/mpeg",
-                    "audio/wav",
-                    "audio/ogg",
-                    "audio/x-m4a",
-                ]:
-                    file_path = Storage.get_file(file_path)
-                    result = transcribe(request, file_path)
-                    process_file(
-                        request,
-                        ProcessFileForm(file_id=id, content=result.get("text", "")),
-                        user=user,
-                    )
-                elif file.content_type not in ["image/png", "image/jpeg", "image/gif"]:
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
-                    file_item = Files.get_file_by_id(id=id)
+                process_uploaded_file(request, file_item, user)
+                file_item = Files.get_file_by_id(id=id)
             except Exception as e:
                 log.exception(e)
                 log.error(f"Error processing file: {file_item.id}")
@@ -143,6 +231,8 @@ def upload_file(
         if file_item:
             return file_item
         else:
+            if FileBlobs.release_blob(sha256, file_path, id):
+                Storage.delete_file(file_path)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=ERROR_MESSAGES.DEFAULT("Error uploading file"),
@@ -170,6 +260,17 @@ async def list_files(user=Depends(get_verified_user)):
     return files
 
 
+############################
+# GetStorageCacheStats
+############################
+
+
+@router.get("/cache/stats", response_model=Optional[dict])
+async def get_storage_cache_stats(user=Depends(get_admin_user)):
+    cache = getattr(Storage, "cache", None)
+    return cache.get_stats() if cache else None
+
+
 ############################
 # Delete All Files
 ############################
@@ -180,6 +281,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
     result = Files.delete_all_files()
     if result:
         try:
+            FileBlobs.delete_all_blobs()
             Storage.delete_all_files()
         except Exception as e:
             log.exception(e)
@@ -196,6 +298,35 @@ async def delete_all_files(user=Depends(get_admin_user)):
         )
 
 
+############################
+# Get File Process Status By Id
+############################
+
+
+@router.get("/{id}/process/status", response_model=Optional[IngestionJobResponse])
+async def get_file_process_status_by_id(id: str, user=Depends(get_verified_user)):
+    file = Files.get_file_by_id(id)
+
+    if not file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+    if (
+        file.user_id == user.id
+        or user.role == "admin"
+        or has_access_to_file(id, "read", user)
+    ):
+        job = IngestionJobs.get_latest_job_by_file_id(id)
+        return IngestionJobResponse(**job.model_dump()) if job else None
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Get File By Id
 ############################
@@ -279,6 +410,8 @@ async def update_file_data_content_by_id(
         or has_access_to_file(id, "write", user)
     ):
         try:
+            # Uploads of the same content no longer match the edited content
+            FileBlobs.reset_blob_file_id(id)
             process_file(
                 request,
                 ProcessFileForm(file_id=id, content=form_data.content),
@@ -297,6 +430,106 @@ async def update_file_data_content_by_id(
         )
 
 
+############################
+# File Delivery
+############################
+
+
+def get_byte_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a `Range: bytes=` header into the first and last byte to send. Invalid
+    headers are ignored and multiple ranges are not supported, in both cases the whole
+    file is sent instead.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+
+    byte_range = range_header.removeprefix("bytes=").strip()
+    if "," in byte_range:
+        return None
+
+    start, _, end = byte_range.partition("-")
+    try:
+        if start:
+            start = int(start)
+            if end and int(end) < start:
+                return None
+            end = min(int(end), size - 1) if end else size - 1
+        else:
+            # Suffix range, the last `end` bytes
+            start = max(size - int(end), 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+async def get_file_response(
+    request: Request,
+    file_path: str,
+    headers: dict,
+    media_type: Optional[str] = None,
+):
+    """
+    Serve a stored file, once access to it has been checked.
+
+    Files in object storage are served from a local copy by default. With
+    STORAGE_DELIVERY_MODE set to "redirect" the client is sent to a presigned URL, and
+    with "stream", or when the provider can't sign URLs, the object is streamed from
+    the storage with support for Range requests.
+    """
+    if STORAGE_PROVIDER != "local" and STORAGE_DELIVERY_MODE in ["redirect", "stream"]:
+        if STORAGE_DELIVERY_MODE == "redirect":
+            url = await asyncio.to_thread(
+                Storage.get_presigned_url,
+                file_path,
+                STORAGE_PRESIGNED_URL_EXPIRES,
+                media_type,
+                headers.get("Content-Disposition"),
+            )
+            if url:
+                return RedirectResponse(
+                    url, status_code=status.HTTP_307_TEMPORARY_REDIRECT
+                )
+
+        size = await asyncio.to_thread(Storage.get_file_size, file_path)
+        byte_range = get_byte_range(request.headers.get("Range"), size)
+        headers = {**headers, "Accept-Ranges": "bytes"}
+
+        if byte_range:
+            start, end = byte_range
+            status_code = status.HTTP_206_PARTIAL_CONTENT
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        else:
+            start, end = 0, size - 1
+            status_code = status.HTTP_200_OK
+        headers["Content-Length"] = str(end - start + 1)
+
+        return StreamingResponse(
+            Storage.iter_file(file_path, start, end) if size else iter([]),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    file_path = Path(await Storage.get_file_async(file_path))
+
+    # Check if the file already exists in the cache
+    if file_path.is_file():
+        return FileResponse(file_path, headers=headers, media_type=media_type)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ERROR_MESSAGES.NOT_FOUND,
+        )
+
+
 ############################
 # Get File Content By Id
 ############################
@@ -304,7 +537,10 @@ async def update_file_data_content_by_id(
 
 @router.get("/{id}/content")
 async def get_file_content_by_id(
-    id: str, user=Depends(get_verified_user), attachment: bool = Query(False)
+    request: Request,
+    id: str,
+    user=Depends(get_verified_user),
+    attachment: bool = Query(False),
 ):
     file = Files.get_file_by_id(id)
 
@@ -320,44 +556,34 @@ async def get_file_content_by_id(
         or has_access_to_file(id, "read", user)
     ):
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                # Handle Unicode filenames
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
-
-                content_type = file.meta.get("content_type")
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)
-                headers = {}
-
-                if attachment:
+            # Handle Unicode filenames
+            content_type = file.meta.get("content_type")
+            filename = file.meta.get("name", file.filename)
+            encoded_filename = quote(filename)  # RFC5987 encoding
+            headers = {}
+
+            if attachment:
+                headers["Content-Disposition"] = (
+                    f"attachment; filename*=UTF-8''{encoded_filename}"
+                )
+            else:
+                if content_type == "application/pdf" or filename.lower().endswith(
+                    ".pdf"
+                ):
+                    headers["Content-Disposition"] = (
+                        f"inline; filename*=UTF-8''{encoded_filename}"
+                    )
+                    content_type = "application/pdf"
+                elif content_type != "text/plain":
                     headers["Content-Disposition"] = (
                         f"attachment; filename*=UTF-8''{encoded_filename}"
                     )
-                else:
-                    if content_type == "application/pdf" or filename.lower().endswith(
-                        ".pdf"
-                    ):
-                        headers["Content-Disposition"] = (
-                            f"inline; filename*=UTF-8''{encoded_filename}"
-                        )
-                        content_type = "application/pdf"
-                    elif content_type != "text/plain":
-                        headers["Content-Disposition"] = (
-                            f"attachment; filename*=UTF-8''{encoded_filename}"
-                        )
-
-                return FileResponse(file_path, headers=headers, media_type=content_type)
 
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=ERROR_MESSAGES.NOT_FOUND,
-                )
+            return await get_file_response(
+                request, file.path, headers, media_type=content_type
+            )
+        except HTTPException as e:
+            raise e
         except Exception as e:
             log.exception(e)
             log.error("Error getting file content")
@@ -388,7 +614,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
         or has_access_to_file(id, "read", user)
     ):
         try:
-            file_path = Storage.get_file(file.path)
+            file_path = await Storage.get_file_async(file.path)
             file_path = Path(file_path)
 
             # Check if the file already exists in the cache
@@ -415,7 +641,9 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 
 @router.get("/{id}/content/{file_name}")
-async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
+async def get_file_content_by_id(
+    request: Request, id: str, user=Depends(get_verified_user)
+):
     file = Files.get_file_by_id(id)
 
     if not file:
@@ -439,17 +667,7 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
         }
 
         if file_path:
-            file_path = Storage.get_file(file_path)
-            file_path = Path(file_path)
-
-            # Check if the file already exists in the cache
-            if file_path.is_file():
-                return FileResponse(file_path, headers=headers)
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=ERROR_MESSAGES.NOT_FOUND,
-                )
+            return await get_file_response(request, file_path, headers)
         else:
             # File path doesn’t exist, return the content as .txt if possible
             file_content = file.content.get("content", "")
@@ -496,7 +714,11 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
         result = Files.delete_file_by_id(id)
         if result:
             try:
-                Storage.delete_file(file.path)
+                # Content shared with other uploads is kept until its last file is gone
+                if FileBlobs.release_blob(
+                    (file.meta or {}).get("sha256"), file.path, file.id
+                ):
+                    Storage.delete_file(file.path)
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
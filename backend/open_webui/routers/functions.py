@@ -9,7 +9,9 @@ from open_webui.models.functions import (
     FunctionResponse,
     Functions,
 )
-from open_webui.utils.plugin import load_function_module_by_id, replace_imports
+from open_webui.utils.plugin import replace_imports
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.function_executor import FUNCTION_EXECUTOR
 from open_webui.config import CACHE_DIR
 from open_webui.constants import ERROR_MESSAGES
 from fastapi import APIRouter, Depends, HTTPException, Request, status
@@ -42,6 +44,16 @@ async def get_functions(user=Depends(get_admin_user)):
     return Functions.get_functions()
 
 
+############################
+# GetFunctionStats
+############################
+
+
+@router.get("/stats", response_model=dict)
+async def get_function_stats(user=Depends(get_admin_user)):
+    return FUNCTION_EXECUTOR.get_stats()
+
+
 ############################
 # CreateNewFunction
 ############################
@@ -63,15 +75,12 @@ async def create_new_function(
     if function is None:
         try:
             form_data.content = replace_imports(form_data.content)
-            function_module, function_type, frontmatter = load_function_module_by_id(
+            function_module, function_type, frontmatter = FUNCTION_REGISTRY.load(
                 form_data.id,
                 content=form_data.content,
             )
             form_data.meta.manifest = frontmatter
 
-            FUNCTIONS = request.app.state.FUNCTIONS
-            FUNCTIONS[form_data.id] = function_module
-
             function = Functions.insert_new_function(user.id, function_type, form_data)
 
             function_cache_dir = CACHE_DIR / "functions" / form_data.id
@@ -180,20 +189,18 @@ async def update_function_by_id(
 ):
     try:
         form_data.content = replace_imports(form_data.content)
-        function_module, function_type, frontmatter = load_function_module_by_id(
+        function_module, function_type, frontmatter = FUNCTION_REGISTRY.load(
             id, content=form_data.content
         )
         form_data.meta.manifest = frontmatter
 
-        FUNCTIONS = request.app.state.FUNCTIONS
-        FUNCTIONS[id] = function_module
-
         updated = {**form_data.model_dump(exclude={"id"}), "type": function_type}
         log.debug(updated)
 
         function = Functions.update_function_by_id(id, updated)
 
         if function:
+            FUNCTION_REGISTRY.invalidate(id)
             return function
         else:
             raise HTTPException(
@@ -220,9 +227,7 @@ async def delete_function_by_id(
     result = Functions.delete_function_by_id(id)
 
     if result:
-        FUNCTIONS = request.app.state.FUNCTIONS
-        if id in FUNCTIONS:
-            del FUNCTIONS[id]
+        FUNCTION_REGISTRY.invalidate(id, remove=True)
 
     return result
 
@@ -262,11 +267,7 @@ async def get_function_valves_spec_by_id(
 ):
     function = Functions.get_function_by_id(id)
     if function:
-        if id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[id]
-        else:
-            function_module, function_type, frontmatter = load_function_module_by_id(id)
-            request.app.state.FUNCTIONS[id] = function_module
+        function_module = FUNCTION_REGISTRY.get(id)
 
         if hasattr(function_module, "Valves"):
             Valves = function_module.Valves
@@ -290,11 +291,7 @@ async def update_function_valves_by_id(
 ):
     function = Functions.get_function_by_id(id)
     if function:
-        if id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[id]
-        else:
-            function_module, function_type, frontmatter = load_function_module_by_id(id)
-            request.app.state.FUNCTIONS[id] = function_module
+        function_module = FUNCTION_REGISTRY.get(id)
 
         if hasattr(function_module, "Valves"):
             Valves = function_module.Valves
@@ -353,11 +350,7 @@ async def get_function_user_valves_spec_by_id(
 ):
     function = Functions.get_function_by_id(id)
     if function:
-        if id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[id]
-        else:
-            function_module, function_type, frontmatter = load_function_module_by_id(id)
-            request.app.state.FUNCTIONS[id] = function_module
+        function_module = FUNCTION_REGISTRY.get(id)
 
         if hasattr(function_module, "UserValves"):
             UserValves = function_module.UserValves
@@ -377,11 +370,7 @@ async def update_function_user_valves_by_id(
     function = Functions.get_function_by_id(id)
 
     if function:
-        if id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[id]
-        else:
-            function_module, function_type, frontmatter = load_function_module_by_id(id)
-            request.app.state.FUNCTIONS[id] = function_module
+        function_module = FUNCTION_REGISTRY.get(id)
 
         if hasattr(function_module, "UserValves"):
             UserValves = function_module.UserValves
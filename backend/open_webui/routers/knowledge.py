@@ -9,8 +9,9 @@ from open_webui.models.knowledge import (
     KnowledgeResponse,
     KnowledgeUserResponse,
 )
-from open_webui.models.files import Files, FileModel
+from open_webui.models.files import FileBlobs, Files, FileModel
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
 from open_webui.routers.retrieval import (
     process_file,
     ProcessFileForm,
@@ -370,6 +371,9 @@ def update_file_from_knowledge_by_id(
     VECTOR_DB_CLIENT.delete(
         collection_name=knowledge.id, filter={"file_id": form_data.file_id}
     )
+    BM25_INDEX.delete(
+        collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+    )
 
     # Add content to the vector database
     try:
@@ -441,6 +445,9 @@ def remove_file_from_knowledge_by_id(
         VECTOR_DB_CLIENT.delete(
             collection_name=knowledge.id, filter={"file_id": form_data.file_id}
         )
+        BM25_INDEX.delete(
+            collection_name=knowledge.id, filter={"file_id": form_data.file_id}
+        )
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
@@ -451,13 +458,22 @@ def remove_file_from_knowledge_by_id(
         file_collection = f"file-{form_data.file_id}"
         if VECTOR_DB_CLIENT.has_collection(collection_name=file_collection):
             VECTOR_DB_CLIENT.delete_collection(collection_name=file_collection)
+            BM25_INDEX.delete_collection(collection_name=file_collection)
     except Exception as e:
         log.debug("This was most likely caused by bypassing embedding processing")
         log.debug(e)
         pass
 
     # Delete file from database
-    Files.delete_file_by_id(form_data.file_id)
+    if Files.delete_file_by_id(form_data.file_id):
+        try:
+            # Content shared with other uploads is kept until its last file is gone
+            if file.path and FileBlobs.release_blob(
+                (file.meta or {}).get("sha256"), file.path, file.id
+            ):
+                Storage.delete_file(file.path)
+        except Exception as e:
+            log.exception(f"Error deleting file {file.id} from storage: {e}")
 
     if knowledge:
         data = knowledge.data or {}
@@ -549,6 +565,7 @@ async def delete_knowledge_by_id(id: str, user=Depends(get_verified_user)):
     # Clean up vector DB
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEX.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
@@ -582,6 +599,7 @@ async def reset_knowledge_by_id(id: str, user=Depends(get_verified_user)):
 
     try:
         VECTOR_DB_CLIENT.delete_collection(collection_name=id)
+        BM25_INDEX.delete_collection(collection_name=id)
     except Exception as e:
         log.debug(e)
         pass
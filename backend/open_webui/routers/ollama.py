@@ -1,18 +1,12 @@
-# TODO: Implement a more intelligent load balancing mechanism for distributing requests among multiple backend instances.
-# Current implementation uses a simple round-robin approach (random.choice). Consider incorporating algorithms like weighted round-robin,
-# least connections, or least response time for better resource utilization and performance optimization.
-
 import asyncio
 import json
 import logging
 import os
-import random
 import re
 import time
 from typing import Optional, Union
 from urllib.parse import urlparse
 import aiohttp
-from aiocache import cached
 import requests
 from open_webui.models.users import UserModel
 
@@ -32,9 +26,10 @@ from fastapi import (
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, validator
-from starlette.background import BackgroundTask
+from starlette.background import BackgroundTask, BackgroundTasks
 
 
+from open_webui.models.groups import Groups
 from open_webui.models.models import Models
 from open_webui.utils.misc import (
     calculate_sha256,
@@ -46,6 +41,9 @@ from open_webui.utils.payload import (
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
 from open_webui.utils.access_control import has_access
+from open_webui.utils.session_pool import get_session
+from open_webui.utils.load_balancer import OLLAMA_LOAD_BALANCER
+from open_webui.utils.model_cache import MODEL_LIST_CACHE
 
 
 from open_webui.config import (
@@ -74,37 +72,51 @@ log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
-            async with session.get(
-                url,
-                headers={
-                    "Content-Type": "application/json",
-                    **({"Authorization": f"Bearer {key}"} if key else {}),
-                    **(
-                        {
-                            "X-OpenWebUI-User-Name": user.name,
-                            "X-OpenWebUI-User-Id": user.id,
-                            "X-OpenWebUI-User-Email": user.email,
-                            "X-OpenWebUI-User-Role": user.role,
-                        }
-                        if ENABLE_FORWARD_USER_INFO_HEADERS and user
-                        else {}
-                    ),
-                },
-            ) as response:
-                return await response.json()
+        async with get_session(url).get(
+            url,
+            timeout=timeout,
+            headers={
+                "Content-Type": "application/json",
+                **({"Authorization": f"Bearer {key}"} if key else {}),
+                **(
+                    {
+                        "X-OpenWebUI-User-Name": user.name,
+                        "X-OpenWebUI-User-Id": user.id,
+                        "X-OpenWebUI-User-Email": user.email,
+                        "X-OpenWebUI-User-Role": user.role,
+                    }
+                    if ENABLE_FORWARD_USER_INFO_HEADERS and user
+                    else {}
+                ),
+            },
+        ) as response:
+            return await response.json()
     except Exception as e:
         # Handle connection error here
         log.error(f"Connection error: {e}")
         return None
 
 
+async def get_model_list(url, key=None, user: UserModel = None):
+    # Model lists only depend on the user when their info is forwarded upstream
+    cache_key = MODEL_LIST_CACHE.get_key(
+        "ollama",
+        url,
+        key,
+        user.id if ENABLE_FORWARD_USER_INFO_HEADERS and user else None,
+    )
+    return await MODEL_LIST_CACHE.get(
+        cache_key, lambda: send_get_request(f"{url}/api/tags", key, user=user)
+    )
+
+
 async def cleanup_response(
     response: Optional[aiohttp.ClientResponse],
-    session: Optional[aiohttp.ClientSession],
+    session: Optional[aiohttp.ClientSession] = None,
 ):
+    # Release the connection back to the pool of the shared session
     if response:
-        response.close()
+        response.release()
     if session:
         await session.close()
 
@@ -116,16 +128,19 @@ async def send_post_request(
     key: Optional[str] = None,
     content_type: Optional[str] = None,
     user: UserModel = None,
+    base_url: Optional[str] = None,
 ):
+    # base_url identifies the backend for load balancing, if the request is tracked
+    def release(error: Optional[str] = None):
+        if base_url:
+            OLLAMA_LOAD_BALANCER.release(base_url, error)
 
     r = None
+    started = OLLAMA_LOAD_BALANCER.acquire(base_url) if base_url else None
     try:
-        session = aiohttp.ClientSession(
-            trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
-        )
-
-        r = await session.post(
+        r = await get_session(url).post(
             url,
+            timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT),
             data=payload,
             headers={
                 "Content-Type": "application/json",
@@ -142,6 +157,8 @@ async def send_post_request(
                 ),
             },
         )
+        if base_url and r.status < 400:
+            OLLAMA_LOAD_BALANCER.record_latency(base_url, started)
         r.raise_for_status()
 
         if stream:
@@ -150,20 +167,25 @@ async def send_post_request(
             if content_type:
                 response_headers["Content-Type"] = content_type
 
+            async def cleanup():
+                await cleanup_response(r)
+                release()
+
             return StreamingResponse(
                 r.content,
                 status_code=r.status,
                 headers=response_headers,
-                background=BackgroundTask(
-                    cleanup_response, response=r, session=session
-                ),
+                background=BackgroundTask(cleanup),
             )
         else:
             res = await r.json()
-            await cleanup_response(r, session)
+            await cleanup_response(r)
+            release()
             return res
 
     except Exception as e:
+        # Client errors are not the backend's fault
+        release(str(e) if r is None or r.status >= 500 else None)
         detail = None
 
         if r is not None:
@@ -173,6 +195,7 @@ async def send_post_request(
                     detail = f"Ollama: {res.get('error', 'Unknown error')}"
             except Exception:
                 detail = f"Ollama: {e}"
+            r.release()
 
         raise HTTPException(
             status_code=r.status if r else 500,
@@ -180,6 +203,33 @@ async def send_post_request(
         )
 
 
+def select_url_idx(request: Request, url_idxs: list[int], key: Optional[str] = None):
+    urls = [request.app.state.config.OLLAMA_BASE_URLS[idx] for idx in url_idxs]
+    weights = [
+        float(
+            request.app.state.config.OLLAMA_API_CONFIGS.get(
+                str(idx),
+                request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),
+            ).get("weight", 1)
+        )
+        for idx, url in zip(url_idxs, urls)
+    ]
+
+    url = OLLAMA_LOAD_BALANCER.select(urls, weights=weights, key=key)
+    return url_idxs[urls.index(url)]
+
+
+def invalidate_model_lists_after(response: StreamingResponse) -> StreamingResponse:
+    # Pulled and created models are listed once the stream is done
+    response.background = BackgroundTasks(
+        [
+            *([response.background] if response.background else []),
+            BackgroundTask(MODEL_LIST_CACHE.invalidate),
+        ]
+    )
+    return response
+
+
 def get_api_key(idx, url, configs):
     parsed_url = urlparse(url)
     base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
@@ -256,6 +306,11 @@ async def verify_connection(
             raise HTTPException(status_code=500, detail=error_detail)
 
 
+@router.get("/backends")
+async def get_backend_stats(user=Depends(get_admin_user)):
+    return OLLAMA_LOAD_BALANCER.get_stats()
+
+
 @router.get("/config")
 async def get_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -288,6 +343,8 @@ async def update_config(
         if key in keys
     }
 
+    await MODEL_LIST_CACHE.invalidate()
+
     return {
         "ENABLE_OLLAMA_API": request.app.state.config.ENABLE_OLLAMA_API,
         "OLLAMA_BASE_URLS": request.app.state.config.OLLAMA_BASE_URLS,
@@ -295,7 +352,6 @@ async def update_config(
     }
 
 
-@cached(ttl=1)
 async def get_all_models(request: Request, user: UserModel = None):
     log.info("get_all_models()")
     if request.app.state.config.ENABLE_OLLAMA_API:
@@ -304,7 +360,7 @@ async def get_all_models(request: Request, user: UserModel = None):
             if (str(idx) not in request.app.state.config.OLLAMA_API_CONFIGS) and (
                 url not in request.app.state.config.OLLAMA_API_CONFIGS  # Legacy support
             ):
-                request_tasks.append(send_get_request(f"{url}/api/tags", user=user))
+                request_tasks.append(get_model_list(url, user=user))
             else:
                 api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
                     str(idx),
@@ -317,9 +373,7 @@ async def get_all_models(request: Request, user: UserModel = None):
                 key = api_config.get("key", None)
 
                 if enable:
-                    request_tasks.append(
-                        send_get_request(f"{url}/api/tags", key, user=user)
-                    )
+                    request_tasks.append(get_model_list(url, key, user=user))
                 else:
                     request_tasks.append(asyncio.ensure_future(asyncio.sleep(0, None)))
 
@@ -390,12 +444,23 @@ async def get_all_models(request: Request, user: UserModel = None):
 
 async def get_filtered_models(models, user):
     # Filter models based on user access control
+    model_infos = {
+        model_info.id: model_info
+        for model_info in Models.get_models_by_ids(
+            [model["model"] for model in models.get("models", [])]
+        )
+    }
+    user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+
     filtered_models = []
     for model in models.get("models", []):
-        model_info = Models.get_model_by_id(model["model"])
+        model_info = model_infos.get(model["model"])
         if model_info:
             if user.id == model_info.user_id or has_access(
-                user.id, type="read", access_control=model_info.access_control
+                user.id,
+                type="read",
+                access_control=model_info.access_control,
+                user_group_ids=user_group_ids,
             ):
                 filtered_models.append(model)
     return filtered_models
@@ -576,12 +641,13 @@ async def pull_model(
     # Admin should be able to pull models from any source
     payload = {**form_data.model_dump(exclude_none=True), "insecure": True}
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/pull",
         payload=json.dumps(payload),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_model_lists_after(response)
 
 
 class PushModelForm(BaseModel):
@@ -640,12 +706,13 @@ async def create_model(
     log.debug(f"form_data: {form_data}")
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
 
-    return await send_post_request(
+    response = await send_post_request(
         url=f"{url}/api/create",
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
     )
+    return invalidate_model_lists_after(response)
 
 
 class CopyModelForm(BaseModel):
@@ -699,6 +766,7 @@ async def copy_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await MODEL_LIST_CACHE.invalidate()
         return True
     except Exception as e:
         log.exception(e)
@@ -764,6 +832,7 @@ async def delete_model(
         r.raise_for_status()
 
         log.debug(f"r.text: {r.text}")
+        await MODEL_LIST_CACHE.invalidate()
         return True
     except Exception as e:
         log.exception(e)
@@ -796,7 +865,7 @@ async def show_model_info(
             detail=ERROR_MESSAGES.MODEL_NOT_FOUND(form_data.name),
         )
 
-    url_idx = random.choice(models[form_data.name]["urls"])
+    url_idx = select_url_idx(request, models[form_data.name]["urls"])
 
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     key = get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS)
@@ -870,7 +939,7 @@ async def embed(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -949,7 +1018,7 @@ async def embeddings(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1034,7 +1103,7 @@ async def generate_completion(
             model = f"{model}:latest"
 
         if model in models:
-            url_idx = random.choice(models[model]["urls"])
+            url_idx = select_url_idx(request, models[model]["urls"])
         else:
             raise HTTPException(
                 status_code=400,
@@ -1056,6 +1125,7 @@ async def generate_completion(
         payload=form_data.model_dump_json(exclude_none=True).encode(),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        base_url=url,
     )
 
 
@@ -1090,7 +1160,12 @@ class GenerateChatCompletionForm(BaseModel):
     tools: Optional[list[dict]] = None
 
 
-async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] = None):
+async def get_ollama_url(
+    request: Request,
+    model: str,
+    url_idx: Optional[int] = None,
+    key: Optional[str] = None,
+):
     if url_idx is None:
         models = request.app.state.OLLAMA_MODELS
         if model not in models:
@@ -1098,7 +1173,7 @@ async def get_ollama_url(request: Request, model: str, url_idx: Optional[int] =
                 status_code=400,
                 detail=ERROR_MESSAGES.MODEL_NOT_FOUND(model),
             )
-        url_idx = random.choice(models[model].get("urls", []))
+        url_idx = select_url_idx(request, models[model].get("urls", []), key=key)
     url = request.app.state.config.OLLAMA_BASE_URLS[url_idx]
     return url, url_idx
 
@@ -1169,7 +1244,12 @@ async def generate_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        key=metadata.get("chat_id") if metadata else None,
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1186,6 +1266,7 @@ async def generate_chat_completion(
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         content_type="application/x-ndjson",
         user=user,
+        base_url=url,
     )
 
 
@@ -1289,6 +1370,7 @@ async def generate_openai_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        base_url=url,
     )
 
 
@@ -1352,7 +1434,12 @@ async def generate_openai_chat_completion(
     if ":" not in payload["model"]:
         payload["model"] = f"{payload['model']}:latest"
 
-    url, url_idx = await get_ollama_url(request, payload["model"], url_idx)
+    url, url_idx = await get_ollama_url(
+        request,
+        payload["model"],
+        url_idx,
+        key=metadata.get("chat_id") if metadata else None,
+    )
     api_config = request.app.state.config.OLLAMA_API_CONFIGS.get(
         str(url_idx),
         request.app.state.config.OLLAMA_API_CONFIGS.get(url, {}),  # Legacy support
@@ -1368,6 +1455,7 @@ async def generate_openai_chat_completion(
         stream=payload.get("stream", False),
         key=get_api_key(url_idx, url, request.app.state.config.OLLAMA_API_CONFIGS),
         user=user,
+        base_url=url,
     )
 
 
@@ -1427,12 +1515,23 @@ async def get_openai_models(
 
     if user.role == "user" and not BYPASS_MODEL_ACCESS_CONTROL:
         # Filter models based on user access control
+        model_infos = {
+            model_info.id: model_info
+            for model_info in Models.get_models_by_ids(
+                [model["id"] for model in models]
+            )
+        }
+        user_group_ids = Groups.get_group_ids_by_member_id(user.id)
+
         filtered_models = []
         for model in models:
-            model_info = Models.get_model_by_id(model["id"])
+            model_info = model_infos.get(model["id"])
             if model_info:
                 if user.id == model_info.user_id or has_access(
-                    user.id, type="read", access_control=model_info.access_control
+                    user.id,
+                    type="read",
+                    access_control=model_info.access_control,
+                    user_group_ids=user_group_ids,
                 ):
                     filtered_models.append(model)
         models = filtered_models
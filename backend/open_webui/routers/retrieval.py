@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import mimetypes
@@ -29,19 +30,21 @@ import tiktoken
 from langchain.text_splitter import RecursiveCharacterTextSplitter, TokenTextSplitter
 from langchain_core.documents import Document
 
-from open_webui.models.files import FileModel, Files
+from open_webui.models.files import FileBlobs, FileModel, Files
 from open_webui.models.knowledge import Knowledges
 from open_webui.storage.provider import Storage
 
 
 from open_webui.retrieval.vector.connector import VECTOR_DB_CLIENT
+from open_webui.retrieval.bm25 import BM25_INDEX
+from open_webui.retrieval.embedding_cache import EMBEDDING_CACHE
 
 # Document loaders
 from open_webui.retrieval.loaders.main import Loader
 from open_webui.retrieval.loaders.youtube import YoutubeLoader
 
 # Web search engines
-from open_webui.retrieval.web.main import SearchResult
+from open_webui.retrieval.web.main import SearchResult, get_search_engine_semaphore
 from open_webui.retrieval.web.utils import get_web_loader
 from open_webui.retrieval.web.brave import search_brave
 from open_webui.retrieval.web.kagi import search_kagi
@@ -73,6 +76,7 @@ from open_webui.utils.misc import (
     calculate_sha256_string,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
+from open_webui.utils.ingestion import report_progress
 
 from open_webui.config import (
     ENV,
@@ -89,6 +93,7 @@ from open_webui.env import (
     SRC_LOG_LEVELS,
     DEVICE_TYPE,
     DOCKER,
+    AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH,
 )
 from open_webui.constants import ERROR_MESSAGES
 
@@ -175,7 +180,8 @@ class ProcessUrlForm(CollectionNameForm):
 
 
 class SearchForm(CollectionNameForm):
-    query: str
+    query: Optional[str] = None
+    queries: list[str] = []
 
 
 @router.get("/")
@@ -210,6 +216,11 @@ async def get_embedding_config(request: Request, user=Depends(get_admin_user)):
     }
 
 
+@router.get("/embedding/cache")
+async def get_embedding_cache_stats(user=Depends(get_admin_user)):
+    return {"status": True, **EMBEDDING_CACHE.get_stats()}
+
+
 @router.get("/reranking")
 async def get_reraanking_config(request: Request, user=Depends(get_admin_user)):
     return {
@@ -866,6 +877,7 @@ def save_docs_to_vector_db(
 
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
+                BM25_INDEX.delete_collection(collection_name=collection_name)
                 log.info(f"deleting existing collection {collection_name}")
             elif add is False:
                 log.info(
@@ -911,6 +923,7 @@ def save_docs_to_vector_db(
             collection_name=collection_name,
             items=items,
         )
+        BM25_INDEX.add(collection_name=collection_name, items=items)
 
         return True
     except Exception as e:
@@ -918,6 +931,67 @@ def save_docs_to_vector_db(
         raise e
 
 
+def copy_docs_to_vector_db(
+    request: Request,
+    source_collection_name: str,
+    collection_name: str,
+    metadata: dict,
+    source_file_id: Optional[str] = None,
+) -> bool:
+    """
+    Copy the chunks of an already processed file to another collection, reusing their
+    embeddings. Returns False if they cannot be reused and have to be embedded again.
+
+    With `source_file_id`, the chunks of that file are copied as chunks of the file in
+    `metadata`, e.g. for a file uploaded with the same content.
+    """
+    source_filter = {"file_id": source_file_id or metadata["file_id"]}
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=source_collection_name,
+        filter=source_filter,
+        limit=1,
+    )
+    if result is None or not result.ids[0]:
+        return False
+
+    # Only reuse chunks of the current content embedded with the current model
+    source_metadata = result.metadatas[0][0] or {}
+    embedding_config = json.dumps(
+        {
+            "engine": request.app.state.config.RAG_EMBEDDING_ENGINE,
+            "model": request.app.state.config.RAG_EMBEDDING_MODEL,
+        }
+    )
+    if (
+        source_metadata.get("hash") != metadata["hash"]
+        or source_metadata.get("embedding_config") != embedding_config
+    ):
+        return False
+
+    result = VECTOR_DB_CLIENT.query(
+        collection_name=collection_name,
+        filter={"hash": metadata["hash"]},
+    )
+    if result is not None and result.ids[0]:
+        log.info(f"Document with hash {metadata['hash']} already exists")
+        raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
+
+    items = VECTOR_DB_CLIENT.copy(
+        source_collection_name=source_collection_name,
+        collection_name=collection_name,
+        filter=source_filter,
+        metadata=metadata if source_file_id else None,
+    )
+    if not items:
+        return False
+
+    log.info(
+        f"copied {len(items)} chunks from {source_collection_name} to {collection_name}"
+    )
+    BM25_INDEX.add(collection_name=collection_name, items=items)
+    return True
+
+
 class ProcessFileForm(BaseModel):
     file_id: str
     content: Optional[str] = None
@@ -932,6 +1006,7 @@ def process_file(
 ):
     try:
         file = Files.get_file_by_id(form_data.file_id)
+        source_file = None
 
         collection_name = form_data.collection_name
 
@@ -945,6 +1020,7 @@ def process_file(
             try:
                 # /files/{file_id}/data/content/update
                 VECTOR_DB_CLIENT.delete_collection(collection_name=f"file-{file.id}")
+                BM25_INDEX.delete_collection(collection_name=f"file-{file.id}")
             except:
                 # Audio file upload pipeline
                 pass
@@ -997,8 +1073,23 @@ def process_file(
         else:
             # Process the file and save the content
             # Usage: /files/
+            source_file = FileBlobs.get_source_file(file)
             file_path = file.path
-            if file_path:
+            if source_file:
+                # The same content was uploaded and processed before, reuse its text
+                docs = [
+                    Document(
+                        page_content=source_file.data.get("content", ""),
+                        metadata={
+                            **file.meta,
+                            "name": file.filename,
+                            "created_by": file.user_id,
+                            "file_id": file.id,
+                            "source": file.filename,
+                        },
+                    )
+                ]
+            elif file_path:
                 file_path = Storage.get_file(file_path)
                 loader = Loader(
                     engine=request.app.state.config.CONTENT_EXTRACTION_ENGINE,
@@ -1050,20 +1141,50 @@ def process_file(
         Files.update_file_hash_by_id(file.id, hash)
 
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
+            report_progress("embedding", 0.5)
             try:
-                result = save_docs_to_vector_db(
-                    request,
-                    docs=docs,
-                    collection_name=collection_name,
-                    metadata={
-                        "file_id": file.id,
-                        "name": file.filename,
-                        "hash": hash,
-                    },
-                    add=(True if form_data.collection_name else False),
-                    user=user,
+                metadata = {
+                    "file_id": file.id,
+                    "name": file.filename,
+                    "hash": hash,
+                }
+
+                # Reuse the embeddings of the file collection when adding to a knowledge base
+                result = (
+                    form_data.collection_name
+                    and not form_data.content
+                    and copy_docs_to_vector_db(
+                        request,
+                        source_collection_name=f"file-{file.id}",
+                        collection_name=collection_name,
+                        metadata=metadata,
+                    )
+                ) or (
+                    # Reuse the embeddings of the file with the same content
+                    source_file
+                    and copy_docs_to_vector_db(
+                        request,
+                        source_collection_name=f"file-{source_file.id}",
+                        collection_name=collection_name,
+                        metadata={
+                            **metadata,
+                            "created_by": file.user_id,
+                            "source": file.filename,
+                        },
+                        source_file_id=source_file.id,
+                    )
                 )
 
+                if not result:
+                    result = save_docs_to_vector_db(
+                        request,
+                        docs=docs,
+                        collection_name=collection_name,
+                        metadata=metadata,
+                        add=(True if form_data.collection_name else False),
+                        user=user,
+                    )
+
                 if result:
                     Files.update_file_metadata_by_id(
                         file.id,
@@ -1233,7 +1354,7 @@ def process_web(
         )
 
 
-def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
+async def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
     """Search the web using a search engine and return the results as a list of SearchResult objects.
     Will look for a search engine API key in environment variables in the following order:
     - SEARXNG_QUERY_URL
@@ -1257,7 +1378,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
     # TODO: add playwright to search the web
     if engine == "searxng":
         if request.app.state.config.SEARXNG_QUERY_URL:
-            return search_searxng(
+            return await search_searxng(
                 request.app.state.config.SEARXNG_QUERY_URL,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1270,7 +1391,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             request.app.state.config.GOOGLE_PSE_API_KEY
             and request.app.state.config.GOOGLE_PSE_ENGINE_ID
         ):
-            return search_google_pse(
+            return await search_google_pse(
                 request.app.state.config.GOOGLE_PSE_API_KEY,
                 request.app.state.config.GOOGLE_PSE_ENGINE_ID,
                 query,
@@ -1283,7 +1404,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             )
     elif engine == "brave":
         if request.app.state.config.BRAVE_SEARCH_API_KEY:
-            return search_brave(
+            return await search_brave(
                 request.app.state.config.BRAVE_SEARCH_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1293,7 +1414,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No BRAVE_SEARCH_API_KEY found in environment variables")
     elif engine == "kagi":
         if request.app.state.config.KAGI_SEARCH_API_KEY:
-            return search_kagi(
+            return await search_kagi(
                 request.app.state.config.KAGI_SEARCH_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1303,7 +1424,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No KAGI_SEARCH_API_KEY found in environment variables")
     elif engine == "mojeek":
         if request.app.state.config.MOJEEK_SEARCH_API_KEY:
-            return search_mojeek(
+            return await search_mojeek(
                 request.app.state.config.MOJEEK_SEARCH_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1313,7 +1434,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No MOJEEK_SEARCH_API_KEY found in environment variables")
     elif engine == "bocha":
         if request.app.state.config.BOCHA_SEARCH_API_KEY:
-            return search_bocha(
+            return await search_bocha(
                 request.app.state.config.BOCHA_SEARCH_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1323,7 +1444,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No BOCHA_SEARCH_API_KEY found in environment variables")
     elif engine == "serpstack":
         if request.app.state.config.SERPSTACK_API_KEY:
-            return search_serpstack(
+            return await search_serpstack(
                 request.app.state.config.SERPSTACK_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1334,7 +1455,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SERPSTACK_API_KEY found in environment variables")
     elif engine == "serper":
         if request.app.state.config.SERPER_API_KEY:
-            return search_serper(
+            return await search_serper(
                 request.app.state.config.SERPER_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1344,7 +1465,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SERPER_API_KEY found in environment variables")
     elif engine == "serply":
         if request.app.state.config.SERPLY_API_KEY:
-            return search_serply(
+            return await search_serply(
                 request.app.state.config.SERPLY_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1353,14 +1474,15 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         else:
             raise Exception("No SERPLY_API_KEY found in environment variables")
     elif engine == "duckduckgo":
-        return search_duckduckgo(
+        return await run_in_threadpool(
+            search_duckduckgo,
             query,
             request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
             request.app.state.config.RAG_WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "tavily":
         if request.app.state.config.TAVILY_API_KEY:
-            return search_tavily(
+            return await search_tavily(
                 request.app.state.config.TAVILY_API_KEY,
                 query,
                 request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1370,7 +1492,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No TAVILY_API_KEY found in environment variables")
     elif engine == "searchapi":
         if request.app.state.config.SEARCHAPI_API_KEY:
-            return search_searchapi(
+            return await search_searchapi(
                 request.app.state.config.SEARCHAPI_API_KEY,
                 request.app.state.config.SEARCHAPI_ENGINE,
                 query,
@@ -1381,7 +1503,7 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             raise Exception("No SEARCHAPI_API_KEY found in environment variables")
     elif engine == "serpapi":
         if request.app.state.config.SERPAPI_API_KEY:
-            return search_serpapi(
+            return await search_serpapi(
                 request.app.state.config.SERPAPI_API_KEY,
                 request.app.state.config.SERPAPI_ENGINE,
                 query,
@@ -1391,13 +1513,13 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         else:
             raise Exception("No SERPAPI_API_KEY found in environment variables")
     elif engine == "jina":
-        return search_jina(
+        return await search_jina(
             request.app.state.config.JINA_API_KEY,
             query,
             request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
         )
     elif engine == "bing":
-        return search_bing(
+        return await search_bing(
             request.app.state.config.BING_SEARCH_V7_SUBSCRIPTION_KEY,
             request.app.state.config.BING_SEARCH_V7_ENDPOINT,
             str(DEFAULT_LOCALE),
@@ -1406,14 +1528,14 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
             request.app.state.config.RAG_WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "exa":
-        return search_exa(
+        return await search_exa(
             request.app.state.config.EXA_API_KEY,
             query,
             request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
             request.app.state.config.RAG_WEB_SEARCH_DOMAIN_FILTER_LIST,
         )
     elif engine == "perplexity":
-        return search_perplexity(
+        return await search_perplexity(
             request.app.state.config.PERPLEXITY_API_KEY,
             query,
             request.app.state.config.RAG_WEB_SEARCH_RESULT_COUNT,
@@ -1423,16 +1545,57 @@ def search_web(request: Request, engine: str, query: str) -> list[SearchResult]:
         raise Exception("No search engine API key found in environment variables")
 
 
+async def search_web_queries(
+    request: Request, engine: str, queries: list[str]
+) -> list[SearchResult]:
+    """Search all queries at once, within the concurrency limit and timeout of the
+    search engine, and return the results with duplicate links removed."""
+
+    async def search(query: str) -> list[SearchResult]:
+        async with get_search_engine_semaphore(engine):
+            try:
+                return await asyncio.wait_for(
+                    search_web(request, engine, query),
+                    AIOHTTP_CLIENT_TIMEOUT_WEB_SEARCH,
+                )
+            except asyncio.TimeoutError:
+                raise Exception(f"Search timed out: {query}")
+
+    responses = await asyncio.gather(
+        *[search(query) for query in queries], return_exceptions=True
+    )
+
+    errors = [response for response in responses if isinstance(response, Exception)]
+    for error in errors:
+        log.error(f"Error searching the web: {error}")
+    if len(errors) == len(responses):
+        raise errors[0]
+
+    results = {}
+    for response in responses:
+        if not isinstance(response, Exception):
+            for result in response:
+                results.setdefault(result.link, result)
+    return list(results.values())
+
+
 @router.post("/process/web/search")
 async def process_web_search(
     request: Request, form_data: SearchForm, user=Depends(get_verified_user)
 ):
+    queries = form_data.queries or ([form_data.query] if form_data.query else [])
+    if not queries:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ERROR_MESSAGES.WEB_SEARCH_ERROR("No search query provided"),
+        )
+
     try:
         logging.info(
-            f"trying to web search with {request.app.state.config.RAG_WEB_SEARCH_ENGINE, form_data.query}"
+            f"trying to web search with {request.app.state.config.RAG_WEB_SEARCH_ENGINE, queries}"
         )
-        web_results = search_web(
-            request, request.app.state.config.RAG_WEB_SEARCH_ENGINE, form_data.query
+        web_results = await search_web_queries(
+            request, request.app.state.config.RAG_WEB_SEARCH_ENGINE, queries
         )
     except Exception as e:
         log.exception(e)
@@ -1447,9 +1610,9 @@ async def process_web_search(
     try:
         collection_name = form_data.collection_name
         if collection_name == "" or collection_name is None:
-            collection_name = f"web-search-{calculate_sha256_string(form_data.query)}"[
-                :63
-            ]
+            collection_name = (
+                f"web-search-{calculate_sha256_string('-'.join(queries))}"[:63]
+            )
 
         urls = [result.link for result in web_results]
         loader = get_web_loader(
@@ -1530,7 +1693,6 @@ def query_doc_handler(
                     if form_data.r
                     else request.app.state.config.RELEVANCE_THRESHOLD
                 ),
-                user=user,
             )
         else:
             return query_doc(
@@ -1623,6 +1785,10 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
                 collection_name=form_data.collection_name,
                 metadata={"hash": hash},
             )
+            BM25_INDEX.delete(
+                collection_name=form_data.collection_name,
+                filter={"hash": hash},
+            )
             return {"status": True}
         else:
             return {"status": False}
@@ -1634,6 +1800,7 @@ def delete_entries_from_collection(form_data: DeleteForm, user=Depends(get_admin
 @router.post("/reset/db")
 def reset_vector_db(user=Depends(get_admin_user)):
     VECTOR_DB_CLIENT.reset()
+    BM25_INDEX.reset()
     Knowledges.delete_all_knowledge()
 
 
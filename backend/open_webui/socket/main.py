@@ -5,7 +5,8 @@ import sys
 import time
 from redis import asyncio as aioredis
 
-from open_webui.models.users import Users, UserNameResponse
+from open_webui.internal.db import run_in_db_executor
+from open_webui.models.users import UserNameResponse
 from open_webui.models.channels import Channels
 from open_webui.models.chats import Chats
 from open_webui.utils.redis import (
@@ -22,7 +23,7 @@ from open_webui.env import (
     WEBSOCKET_SENTINEL_PORT,
     WEBSOCKET_SENTINEL_HOSTS,
 )
-from open_webui.utils.auth import decode_token
+from open_webui.utils.auth import decode_token, get_user_by_token_async
 from open_webui.socket.utils import RedisDict, RedisLock
 
 from open_webui.env import (
@@ -186,7 +187,7 @@ async def connect(sid, environ, auth):
         data = decode_token(auth["token"])
 
         if data is not None and "id" in data:
-            user = Users.get_user_by_id(data["id"])
+            user = await get_user_by_token_async(auth["token"], data["id"])
 
         if user:
             SESSION_POOL[sid] = user.model_dump()
@@ -211,7 +212,7 @@ async def user_join(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await get_user_by_token_async(auth["token"], data["id"])
     if not user:
         return
 
@@ -222,7 +223,7 @@ async def user_join(sid, data):
         USER_POOL[user.id] = [sid]
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
+    channels = await run_in_db_executor(Channels.get_channels_by_user_id, user.id)
     log.debug(f"{channels=}")
     for channel in channels:
         await sio.enter_room(sid, f"channel:{channel.id}")
@@ -243,12 +244,12 @@ async def join_channel(sid, data):
     if data is None or "id" not in data:
         return
 
-    user = Users.get_user_by_id(data["id"])
+    user = await get_user_by_token_async(auth["token"], data["id"])
     if not user:
         return
 
     # Join all the channels
-    channels = Channels.get_channels_by_user_id(user.id)
+    channels = await run_in_db_executor(Channels.get_channels_by_user_id, user.id)
     log.debug(f"{channels=}")
     for channel in channels:
         await sio.enter_room(sid, f"channel:{channel.id}")
@@ -333,14 +334,14 @@ def get_event_emitter(request_info, update_db=True):
 
         if update_db:
             if "type" in event_data and event_data["type"] == "status":
-                Chats.add_message_status_to_chat_by_id_and_message_id(
+                await Chats.add_message_status_to_chat_by_id_and_message_id_async(
                     request_info["chat_id"],
                     request_info["message_id"],
                     event_data.get("data", {}),
                 )
 
             if "type" in event_data and event_data["type"] == "message":
-                message = Chats.get_message_by_id_and_message_id(
+                message = await Chats.get_message_by_id_and_message_id_async(
                     request_info["chat_id"],
                     request_info["message_id"],
                 )
@@ -348,7 +349,7 @@ def get_event_emitter(request_info, update_db=True):
                 content = message.get("content", "")
                 content += event_data.get("data", {}).get("content", "")
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     request_info["chat_id"],
                     request_info["message_id"],
                     {
@@ -359,7 +360,7 @@ def get_event_emitter(request_info, update_db=True):
             if "type" in event_data and event_data["type"] == "replace":
                 content = event_data.get("data", {}).get("content", "")
 
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     request_info["chat_id"],
                     request_info["message_id"],
                     {
@@ -410,6 +411,10 @@ def get_user_ids_from_room(room):
     return active_user_ids
 
 
+def get_session_ids_by_user_id(user_id):
+    return USER_POOL.get(user_id, [])
+
+
 def get_active_status_by_user_id(user_id):
     if user_id in USER_POOL:
         return True
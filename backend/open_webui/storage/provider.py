@@ -1,9 +1,16 @@
+import asyncio
+import hashlib
 import os
 import shutil
 import json
 import logging
+import threading
+import uuid
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
 
 import boto3
 from botocore.config import Config
@@ -22,6 +29,7 @@ from open_webui.config import (
     AZURE_STORAGE_ENDPOINT,
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
+    STORAGE_CACHE_MAX_SIZE,
     STORAGE_PROVIDER,
     UPLOAD_DIR,
 )
@@ -29,7 +37,7 @@ from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
 from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
 from azure.core.exceptions import ResourceNotFoundError
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -37,14 +45,251 @@ from open_webui.env import SRC_LOG_LEVELS
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+STORAGE_CHUNK_SIZE = 1024 * 1024
+
+
+def write_file(
+    file: BinaryIO, file_path: str, max_size: Optional[int] = None
+) -> Tuple[int, str]:
+    """
+    Copy `file` to `file_path` in chunks, so that uploads are never held in memory.
+    Returns the size and sha256 of the content, and raises as soon as it grows past
+    `max_size` bytes.
+    """
+    size = 0
+    sha256 = hashlib.sha256()
+    try:
+        with open(file_path, "wb") as f:
+            while chunk := file.read(STORAGE_CHUNK_SIZE):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise ValueError(
+                        ERROR_MESSAGES.FILE_TOO_LARGE(
+                            size=f"{max_size / (1024 * 1024):g}MB"
+                        )
+                    )
+                sha256.update(chunk)
+                f.write(chunk)
+
+        if not size:
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+
+    return size, sha256.hexdigest()
+
+
+class StorageCache:
+    """
+    Local copies of the objects of a remote storage provider, kept in UPLOAD_DIR.
+
+    A copy is only served while the version of the object (ETag or generation) is
+    unchanged, otherwise the object is downloaded again. Copies are evicted least
+    recently used first above `max_size` MB, and concurrent requests for the same
+    object share one download.
+
+    The size is accounted per worker: each one counts the copies found in `directory`
+    when it starts and those it downloads, so workers sharing the directory may keep
+    up to `max_size` MB each.
+    """
+
+    def __init__(
+        self, max_size: int = STORAGE_CACHE_MAX_SIZE, directory: Optional[str] = None
+    ):
+        self.max_size = max_size * 1024 * 1024
+        self.size = 0
+        self.entries: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self.downloads: dict[str, Future] = {}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if directory:
+            self._load(directory)
+
+    def _load(self, directory: str):
+        """
+        Count the copies already in `directory`, oldest first. Their version is
+        unknown, so each one is downloaded again on first use.
+        """
+        try:
+            files = [
+                (entry.path, entry.stat())
+                for entry in os.scandir(directory)
+                if entry.is_file() and not entry.name.endswith(".tmp")
+            ]
+        except FileNotFoundError:
+            return
+
+        for path, stat in sorted(files, key=lambda file: file[1].st_mtime):
+            self.entries[path] = ("", stat.st_size)
+            self.size += stat.st_size
+
+    def put(self, local_file_path: str, version: str):
+        """Record the local copy of an object at `version`."""
+        size = os.path.getsize(local_file_path)
+        evicted = []
+
+        with self.lock:
+            self._remove(local_file_path)
+            if size > self.max_size:
+                return
+
+            self.entries[local_file_path] = (version, size)
+            self.size += size
+            while self.size > self.max_size:
+                path = next(iter(self.entries))
+                self._remove(path)
+                self.evictions += 1
+                evicted.append(path)
+
+        for path in evicted:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _remove(self, local_file_path: str):
+        entry = self.entries.pop(local_file_path, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def remove(self, local_file_path: str):
+        with self.lock:
+            self._remove(local_file_path)
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.size = 0
+
+    def _get(
+        self,
+        local_file_path: str,
+        get_version: Callable[[], str],
+        download: Callable[[str], None],
+    ) -> str:
+        version = get_version()
+        with self.lock:
+            entry = self.entries.get(local_file_path)
+            if (
+                entry is not None
+                and entry[0] == version
+                and os.path.isfile(local_file_path)
+            ):
+                self.entries.move_to_end(local_file_path)
+                self.hits += 1
+                return local_file_path
+            self.misses += 1
+
+        # Download next to the copy so that readers never see a partial file
+        temp_file_path = f"{local_file_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            download(temp_file_path)
+            os.replace(temp_file_path, local_file_path)
+        finally:
+            if os.path.exists(temp_file_path):
+                os.remove(temp_file_path)
+
+        self.put(local_file_path, version)
+        return local_file_path
+
+    def get(
+        self,
+        local_file_path: str,
+        get_version: Callable[[], str],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return `local_file_path` once it holds the current version of the object,
+        calling `download` with a path to write to if it doesn't.
+        """
+        with self.lock:
+            future = self.downloads.get(local_file_path)
+            if future is not None:
+                waiting = True
+            else:
+                waiting = False
+                future = Future()
+                self.downloads[local_file_path] = future
+
+        if waiting:
+            return future.result()
+
+        try:
+            result = self._get(local_file_path, get_version, download)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.downloads.pop(local_file_path, None)
+
+    def get_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "files": len(self.entries),
+            "size": self.size,
+        }
+
 
 class StorageProvider(ABC):
     @abstractmethod
     def get_file(self, file_path: str) -> str:
         pass
 
+    async def get_file_async(self, file_path: str) -> str:
+        """Same as `get_file`, with the download running off the event loop."""
+        return await asyncio.to_thread(self.get_file, file_path)
+
+    def get_file_size(self, file_path: str) -> int:
+        return os.path.getsize(self.get_file(file_path))
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Yield the bytes of the file from `start` to `end` included, in chunks."""
+        with open(self.get_file(file_path), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(
+                    STORAGE_CHUNK_SIZE
+                    if remaining is None
+                    else min(STORAGE_CHUNK_SIZE, remaining)
+                )
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Return a URL to download the file straight from the storage for `expires_in`
+        seconds, or None if the provider can't sign one.
+        """
+        return None
+
     @abstractmethod
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[int, str, str]:
+        """Store `file`, returning its size, sha256 and path in the storage."""
         pass
 
     @abstractmethod
@@ -58,20 +303,22 @@ class StorageProvider(ABC):
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
-    def upload_file(file: BinaryIO, filename: str) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    def upload_file(
+        file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[int, str, str]:
         file_path = f"{UPLOAD_DIR}/{filename}"
-        with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+        size, sha256 = write_file(file, file_path, max_size)
+        return size, sha256, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
         """Handles downloading of the file from local storage."""
         return file_path
 
+    @staticmethod
+    async def get_file_async(file_path: str) -> str:
+        return file_path
+
     @staticmethod
     def delete_file(file_path: str) -> None:
         """Handles deletion of the file from local storage."""
@@ -130,27 +377,71 @@ class S3StorageProvider(StorageProvider):
 
         self.bucket_name = S3_BUCKET_NAME
         self.key_prefix = S3_KEY_PREFIX if S3_KEY_PREFIX else ""
+        self.cache = StorageCache(directory=UPLOAD_DIR)
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename)
+        size, sha256, file_path = LocalStorageProvider.upload_file(
+            file, filename, max_size
+        )
         try:
             s3_key = os.path.join(self.key_prefix, filename)
+            # Large files are sent as a multipart upload, read from disk in parts
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
-            return (
-                open(file_path, "rb").read(),
-                "s3://" + self.bucket_name + "/" + s3_key,
-            )
+            self.cache.put(file_path, self._get_etag(s3_key))
+            return size, sha256, "s3://" + self.bucket_name + "/" + s3_key
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
+    def get_file_size(self, file_path: str) -> int:
+        s3_key = self._extract_s3_key(file_path)
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        return response["ContentLength"]
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        s3_key = self._extract_s3_key(file_path)
+        response = self.s3_client.get_object(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            Range=f"bytes={start}-{'' if end is None else end}",
+        )
+        yield from response["Body"].iter_chunks(STORAGE_CHUNK_SIZE)
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        params = {
+            "Bucket": self.bucket_name,
+            "Key": self._extract_s3_key(file_path),
+        }
+        if content_type:
+            params["ResponseContentType"] = content_type
+        if content_disposition:
+            params["ResponseContentDisposition"] = content_disposition
+
+        return self.s3_client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in
+        )
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from S3 storage."""
         try:
             s3_key = self._extract_s3_key(file_path)
-            local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            return self.cache.get(
+                self._get_local_file_path(s3_key),
+                lambda: self._get_etag(s3_key),
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -163,6 +454,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
+        self.cache.remove(self._get_local_file_path(s3_key))
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -182,6 +474,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -191,6 +484,10 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _get_etag(self, s3_key: str) -> str:
+        response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+        return response["ETag"]
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -206,26 +503,81 @@ class GCSStorageProvider(StorageProvider):
             # if running on a Compute Engine instance, credentials would be from Google Metadata server
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
+        self.cache = StorageCache(directory=UPLOAD_DIR)
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        size, sha256, file_path = LocalStorageProvider.upload_file(
+            file, filename, max_size
+        )
         try:
             blob = self.bucket.blob(filename)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            self.cache.put(file_path, str(blob.generation))
+            return size, sha256, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
+    def _get_blob(self, file_path: str):
+        filename = file_path.removeprefix("gs://").split("/")[1]
+        blob = self.bucket.get_blob(filename)
+        if blob is None:
+            raise NotFound(f"File {filename} not found in GCS")
+        return blob
+
+    def get_file_size(self, file_path: str) -> int:
+        return self._get_blob(file_path).size
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        blob = self._get_blob(file_path)
+        end = blob.size - 1 if end is None else end
+        while start <= end:
+            chunk_end = min(start + STORAGE_CHUNK_SIZE - 1, end)
+            yield blob.download_as_bytes(start=start, end=chunk_end)
+            start = chunk_end + 1
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        try:
+            return self._get_blob(file_path).generate_signed_url(
+                version="v4",
+                expiration=timedelta(seconds=expires_in),
+                response_type=content_type,
+                response_disposition=content_disposition,
+            )
+        except AttributeError as e:
+            # Signing requires service account credentials
+            log.warning(f"Unable to sign GCS URL: {e}")
+            return None
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from GCS storage."""
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
-            blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
-
-            return local_file_path
+            blob = None
+
+            # The blob metadata holds the generation the copy is checked against
+            def get_version():
+                nonlocal blob
+                blob = self.bucket.get_blob(filename)
+                if blob is None:
+                    raise NotFound(f"File {filename} not found in GCS")
+                return str(blob.generation)
+
+            return self.cache.get(
+                f"{UPLOAD_DIR}/{filename}",
+                get_version,
+                lambda path: blob.download_to_filename(path),
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -239,6 +591,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.remove(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -253,6 +606,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -260,7 +614,7 @@ class AzureStorageProvider(StorageProvider):
     def __init__(self):
         self.endpoint = AZURE_STORAGE_ENDPOINT
         self.container_name = AZURE_STORAGE_CONTAINER_NAME
-        storage_key = AZURE_STORAGE_KEY
+        self.storage_key = storage_key = AZURE_STORAGE_KEY
 
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
@@ -276,26 +630,81 @@ class AzureStorageProvider(StorageProvider):
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
         )
+        self.cache = StorageCache(directory=UPLOAD_DIR)
 
-    def upload_file(self, file: BinaryIO, filename: str) -> Tuple[bytes, str]:
+    def upload_file(
+        self, file: BinaryIO, filename: str, max_size: Optional[int] = None
+    ) -> Tuple[int, str, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename)
+        size, sha256, file_path = LocalStorageProvider.upload_file(
+            file, filename, max_size
+        )
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Uploaded from disk in blocks rather than from memory
+            with open(file_path, "rb") as f:
+                response = blob_client.upload_blob(f, length=size, overwrite=True)
+            self.cache.put(file_path, response["etag"])
+            return (
+                size,
+                sha256,
+                f"{self.endpoint}/{self.container_name}/{filename}",
+            )
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
+    def get_file_size(self, file_path: str) -> int:
+        blob_client = self.container_client.get_blob_client(file_path.split("/")[-1])
+        return blob_client.get_blob_properties().size
+
+    def iter_file(
+        self, file_path: str, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        blob_client = self.container_client.get_blob_client(file_path.split("/")[-1])
+        downloader = blob_client.download_blob(
+            offset=start, length=None if end is None else end - start + 1
+        )
+        yield from downloader.chunks()
+
+    def get_presigned_url(
+        self,
+        file_path: str,
+        expires_in: int,
+        content_type: Optional[str] = None,
+        content_disposition: Optional[str] = None,
+    ) -> Optional[str]:
+        # SAS tokens are signed with the account key
+        if not self.storage_key:
+            return None
+
+        blob_client = self.container_client.get_blob_client(file_path.split("/")[-1])
+        sas_token = generate_blob_sas(
+            account_name=blob_client.account_name,
+            container_name=self.container_name,
+            blob_name=blob_client.blob_name,
+            account_key=self.storage_key,
+            permission=BlobSasPermissions(read=True),
+            expiry=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+            content_type=content_type,
+            content_disposition=content_disposition,
+        )
+        return f"{blob_client.url}?{sas_token}"
+
     def get_file(self, file_path: str) -> str:
         """Handles downloading of the file from Azure Blob Storage."""
         try:
             filename = file_path.split("/")[-1]
-            local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def download(path: str):
+                with open(path, "wb") as download_file:
+                    blob_client.download_blob().readinto(download_file)
+
+            return self.cache.get(
+                f"{UPLOAD_DIR}/{filename}",
+                lambda: blob_client.get_blob_properties().etag,
+                download,
+            )
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -309,6 +718,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.remove(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -321,6 +731,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        self.cache.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -0,0 +1,136 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.internal import db as internal_db
+from open_webui.internal.db import Base
+from open_webui.models import chats
+from open_webui.models.chats import ChatForm, Chats
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/webui.db")
+    Base.metadata.create_all(engine, tables=[chats.Chat.__table__])
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(chats, "get_db", get_db)
+    monkeypatch.setattr(internal_db, "AsyncSessionLocal", None)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def async_db(monkeypatch, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/webui.db")
+    monkeypatch.setattr(
+        internal_db,
+        "AsyncSessionLocal",
+        async_sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+        ),
+    )
+    yield
+    asyncio.run(engine.dispose())
+
+
+def insert_chat():
+    return Chats.insert_new_chat(
+        "1",
+        ChatForm(
+            chat={
+                "title": "Chat",
+                "history": {
+                    "currentId": "m1",
+                    "messages": {
+                        "m1": {"id": "m1", "role": "user", "content": "Hi"},
+                        "m2": {"id": "m2", "role": "assistant", "content": ""},
+                    },
+                },
+            }
+        ),
+    )
+
+
+class TestUpsertMessage:
+    def test_patch_existing_message(self, monkeypatch):
+        chat = insert_chat()
+
+        async def get_chat_by_id_async(id):
+            raise AssertionError("The chat is not read back")
+
+        monkeypatch.setattr(Chats, "get_chat_by_id_async", get_chat_by_id_async)
+        assert asyncio.run(
+            Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                chat.id, "m2", {"content": "Hello", "done": True}
+            )
+        )
+
+        history = Chats.get_chat_by_id(chat.id).chat["history"]
+        assert history["currentId"] == "m2"
+        assert history["messages"]["m1"]["content"] == "Hi"
+        assert history["messages"]["m2"] == {
+            "id": "m2",
+            "role": "assistant",
+            "content": "Hello",
+            "done": True,
+        }
+
+    def test_new_message_is_inserted(self):
+        chat = insert_chat()
+        assert asyncio.run(
+            Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                chat.id, "m3", {"id": "m3", "content": "Hi again"}
+            )
+        )
+
+        history = Chats.get_chat_by_id(chat.id).chat["history"]
+        assert history["currentId"] == "m3"
+        assert history["messages"]["m3"] == {"id": "m3", "content": "Hi again"}
+        assert len(history["messages"]) == 3
+
+    def test_unknown_chat(self):
+        assert not asyncio.run(
+            Chats.upsert_message_to_chat_by_id_and_message_id_async(
+                "unknown", "m1", {"content": "Hi"}
+            )
+        )
+
+
+class TestAsyncDatabase:
+    def test_disabled_uses_executor(self):
+        chat = insert_chat()
+        assert not internal_db.is_async_db_enabled()
+        assert asyncio.run(Chats.get_chat_by_id_async(chat.id)) == chat
+
+    def test_enabled_uses_async_session(self, async_db, monkeypatch):
+        chat = insert_chat()
+        assert internal_db.is_async_db_enabled()
+
+        monkeypatch.setattr(chats, "get_db", None)
+        assert asyncio.run(Chats.get_chat_by_id_async(chat.id)) == chat
+        assert asyncio.run(Chats.get_chat_by_id_async("unknown")) is None
+
+    def test_async_error_falls_back_to_executor(self, monkeypatch):
+        chat = insert_chat()
+
+        def AsyncSessionLocal():
+            raise ConnectionError("Connection refused")
+
+        monkeypatch.setattr(internal_db, "AsyncSessionLocal", AsyncSessionLocal)
+        assert internal_db.is_async_db_enabled()
+        assert asyncio.run(Chats.get_chat_by_id_async(chat.id)) == chat
@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.internal.db import Base
+from open_webui.models import files
+from open_webui.models.files import FileBlobs, FileForm, Files
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/webui.db")
+    Base.metadata.create_all(
+        engine, tables=[files.File.__table__, files.FileBlob.__table__]
+    )
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(files, "get_db", get_db)
+    yield
+    engine.dispose()
+
+
+def get_blob(hash):
+    with files.get_db() as db:
+        blob = db.get(files.FileBlob, hash)
+        return files.FileBlobModel.model_validate(blob) if blob else None
+
+
+def insert_file(id, path, hash="sha256", content=None):
+    return Files.insert_new_file(
+        "1",
+        FileForm(
+            id=id,
+            hash=hash if content else None,
+            filename=f"{id}.txt",
+            path=path,
+            data={"content": content} if content else {},
+            meta={"sha256": hash},
+        ),
+    )
+
+
+class TestFileBlobs:
+    def test_acquire_release(self):
+        blob = FileBlobs.acquire_blob("sha256", "/uploads/1_a.txt", 3, "1")
+        assert blob.path == "/uploads/1_a.txt"
+        assert blob.ref_count == 1
+        assert blob.file_id == "1"
+
+        # The same content uploaded again points at the first copy
+        blob = FileBlobs.acquire_blob("sha256", "/uploads/2_a.txt", 3, "2")
+        assert blob.path == "/uploads/1_a.txt"
+        assert blob.ref_count == 2
+        assert blob.file_id == "1"
+
+        # The content is kept while a file uses it
+        assert not FileBlobs.release_blob("sha256", "/uploads/1_a.txt", "1")
+        blob = get_blob("sha256")
+        assert blob.ref_count == 1
+        assert blob.file_id is None
+
+        assert FileBlobs.release_blob("sha256", "/uploads/1_a.txt", "2")
+        assert get_blob("sha256") is None
+
+    def test_release_content_stored_before_deduplication(self):
+        assert FileBlobs.release_blob(None, "/uploads/1_a.txt", "1")
+        assert FileBlobs.release_blob("sha256", "/uploads/1_a.txt", "1")
+
+        # A file with its own copy of the content doesn't release the shared one
+        FileBlobs.acquire_blob("sha256", "/uploads/2_a.txt", 3, "2")
+        assert FileBlobs.release_blob("sha256", "/uploads/1_a.txt", "1")
+        assert get_blob("sha256").ref_count == 1
+
+    def test_get_source_file(self):
+        FileBlobs.acquire_blob("sha256", "/uploads/1_a.txt", 3, "1")
+        FileBlobs.acquire_blob("sha256", "/uploads/1_a.txt", 3, "2")
+        insert_file("1", "/uploads/1_a.txt", content="hello")
+        file = insert_file("2", "/uploads/1_a.txt")
+
+        assert FileBlobs.get_source_file(file).id == "1"
+        # A file is not its own source
+        assert FileBlobs.get_source_file(Files.get_file_by_id("1")) is None
+
+        # Nor is an edited file the source of the others
+        FileBlobs.reset_blob_file_id("1")
+        assert FileBlobs.get_source_file(file) is None
+
+        FileBlobs.update_blob_file_id_by_hash("sha256", "1", path="/uploads/1_a.txt")
+        assert FileBlobs.get_source_file(file).id == "1"
+
+        # The blob of another copy of the content is left untouched
+        FileBlobs.update_blob_file_id_by_hash("sha256", "2", path="/uploads/2_a.txt")
+        assert get_blob("sha256").file_id == "1"
+
+    def test_unprocessed_source_file(self):
+        FileBlobs.acquire_blob("sha256", "/uploads/1_a.txt", 3, "1")
+        insert_file("1", "/uploads/1_a.txt")
+        file = insert_file("2", "/uploads/1_a.txt")
+
+        assert FileBlobs.get_source_file(file) is None
@@ -0,0 +1,93 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.internal.db import Base
+from open_webui.models import ingestion
+from open_webui.models.ingestion import IngestionJob, IngestionJobs
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/webui.db")
+    Base.metadata.create_all(engine, tables=[IngestionJob.__table__])
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(ingestion, "get_db", get_db)
+    yield
+    engine.dispose()
+
+
+def set_job(id, **values):
+    # Bypasses update_job_by_id, which always refreshes updated_at
+    with ingestion.get_db() as db:
+        db.query(IngestionJob).filter_by(id=id).update(values)
+        db.commit()
+
+
+class TestIngestionJobs:
+    def test_claim_job(self):
+        job = IngestionJobs.insert_new_job("file", "1", "1")
+        assert job.status == "pending"
+
+        job = IngestionJobs.claim_job(job.id)
+        assert job.status == "extracting"
+        assert job.attempts == 1
+
+        # A job queued twice only runs once
+        assert IngestionJobs.claim_job(job.id) is None
+        assert IngestionJobs.get_job_by_id(job.id).attempts == 1
+
+    def test_claim_job_before_next_attempt(self):
+        job = IngestionJobs.insert_new_job("file", "1", "1")
+        set_job(job.id, next_attempt_at=int(time.time()) + 60)
+
+        assert IngestionJobs.claim_job(job.id) is None
+        assert IngestionJobs.get_job_by_id(job.id).status == "pending"
+
+    def test_reset_stale_jobs(self):
+        now = int(time.time())
+        stale = IngestionJobs.insert_new_job("file", "1", "1")
+        exhausted = IngestionJobs.insert_new_job("file", "2", "1")
+        running = IngestionJobs.insert_new_job("file", "3", "1")
+        for job in [stale, exhausted, running]:
+            IngestionJobs.claim_job(job.id)
+        set_job(stale.id, updated_at=now - 60)
+        set_job(exhausted.id, updated_at=now - 60, attempts=3)
+
+        assert IngestionJobs.reset_stale_jobs(now - 30, max_attempts=3) == 2
+
+        job = IngestionJobs.get_job_by_id(stale.id)
+        assert job.status == "pending"
+        assert job.queued_at is None
+        assert job.attempts == 1
+
+        job = IngestionJobs.get_job_by_id(exhausted.id)
+        assert job.status == "failed"
+        assert job.error
+
+        assert IngestionJobs.get_job_by_id(running.id).status == "extracting"
+
+    def test_queue_job(self):
+        job = IngestionJobs.insert_new_job("file", "1", "1")
+        set_job(job.id, queued_at=None)
+
+        assert [job.id for job in IngestionJobs.get_jobs_to_queue(0)] == [job.id]
+        assert IngestionJobs.queue_job(job.id, None)
+
+        # Another instance read the job before it was queued
+        assert not IngestionJobs.queue_job(job.id, None)
+        assert IngestionJobs.get_jobs_to_queue(0) == []
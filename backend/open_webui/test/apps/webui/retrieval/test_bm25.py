@@ -0,0 +1,180 @@
+from open_webui.retrieval import bm25
+from open_webui.retrieval.bm25 import BM25Index
+from open_webui.retrieval.vector.main import GetResult
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collections = {}
+        self.gets = 0
+
+    def get(self, collection_name):
+        self.gets += 1
+        items = self.collections.get(collection_name)
+        if not items:
+            return None
+        return GetResult(
+            ids=[[item["id"] for item in items]],
+            documents=[[item["text"] for item in items]],
+            metadatas=[[item["metadata"] for item in items]],
+        )
+
+    def insert(self, collection_name, items):
+        self.collections.setdefault(collection_name, []).extend(items)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def get(self, key):
+        self.commands.append(lambda: self.redis.get(key))
+
+    def incr(self, key):
+        self.commands.append(lambda: self.redis.incr(key))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+def item(id, text, **metadata):
+    return {"id": id, "text": text, "vector": [0.0], "metadata": metadata}
+
+
+def mock_index(monkeypatch, tmp_path):
+    vector_db = FakeVectorDB()
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", vector_db)
+    index = BM25Index(index_dir=str(tmp_path / "bm25"), redis_url="")
+    return index, vector_db
+
+
+def search_ids(index, collection_name, query, k=10):
+    return [doc.id for doc in index.search(collection_name, query, k)]
+
+
+def test_search_builds_index_from_vector_db(monkeypatch, tmp_path):
+    index, vector_db = mock_index(monkeypatch, tmp_path)
+    vector_db.insert(
+        "docs",
+        [
+            item("1", "the quick brown fox"),
+            item("2", "a lazy dog sleeps"),
+            item("3", "the fox and the dog"),
+        ],
+    )
+
+    assert not index.has_index("docs")
+    assert search_ids(index, "docs", "fox") in (["1", "3"], ["3", "1"])
+    assert index.has_index("docs")
+    assert search_ids(index, "docs", "cat") == []
+    assert search_ids(index, "empty", "fox") == []
+
+
+def test_add_and_delete(monkeypatch, tmp_path):
+    index, vector_db = mock_index(monkeypatch, tmp_path)
+    items = [item("1", "alpha beta", file_id="a"), item("2", "beta", file_id="b")]
+    vector_db.insert("docs", items)
+    index.add("docs", items)
+
+    new_items = [item("3", "gamma beta", file_id="b")]
+    vector_db.insert("docs", new_items)
+    index.add("docs", new_items)
+    assert sorted(search_ids(index, "docs", "beta")) == ["1", "2", "3"]
+
+    index.delete("docs", ids=["1"])
+    assert sorted(search_ids(index, "docs", "beta")) == ["2", "3"]
+
+    index.delete("docs", filter={"file_id": "b"})
+    assert search_ids(index, "docs", "beta") == []
+
+    index.delete_collection("docs")
+    assert not index.has_index("docs")
+
+
+def mock_instances(monkeypatch, tmp_path, *index_dirs):
+    vector_db = FakeVectorDB()
+    monkeypatch.setattr(bm25, "VECTOR_DB_CLIENT", vector_db)
+    redis = FakeRedis()
+    monkeypatch.setattr(bm25, "get_redis_connection", lambda *args: redis)
+    indexes = [
+        BM25Index(index_dir=str(tmp_path / index_dir), redis_url="redis://")
+        for index_dir in index_dirs
+    ]
+    return indexes, vector_db
+
+
+def test_changes_on_other_disks_make_the_index_stale(monkeypatch, tmp_path):
+    (first, second), vector_db = mock_instances(monkeypatch, tmp_path, "a", "b")
+    vector_db.insert("docs", [item("1", "alpha")])
+    vector_db.insert("other", [item("2", "alpha")])
+    assert search_ids(first, "docs", "alpha") == ["1"]
+    assert search_ids(second, "docs", "alpha") == ["1"]
+    assert search_ids(second, "other", "alpha") == ["2"]
+
+    # Own changes are applied to the index in place
+    vector_db.insert("docs", [item("3", "alpha")])
+    first.add("docs", [item("3", "alpha")])
+    gets = vector_db.gets
+    assert sorted(search_ids(first, "docs", "alpha")) == ["1", "3"]
+    assert vector_db.gets == gets
+
+    # The index of the other disk is built again, other collections are kept
+    assert sorted(search_ids(second, "docs", "alpha")) == ["1", "3"]
+    assert search_ids(second, "other", "alpha") == ["2"]
+    assert vector_db.gets == gets + 1
+
+    # A change missed by the index is not applied on top of it
+    vector_db.insert("docs", [item("4", "alpha")])
+    second.add("docs", [item("4", "alpha")])
+    vector_db.insert("docs", [item("5", "alpha")])
+    first.add("docs", [item("5", "alpha")])
+    assert sorted(search_ids(first, "docs", "alpha")) == ["1", "3", "4", "5"]
+    assert sorted(search_ids(second, "docs", "alpha")) == ["1", "3", "4", "5"]
+
+    vector_db.collections["docs"].pop(0)
+    second.delete("docs", ids=["1"])
+    assert sorted(search_ids(first, "docs", "alpha")) == ["3", "4", "5"]
+    second.delete_collection("docs")
+    vector_db.collections.pop("docs")
+    assert search_ids(first, "docs", "alpha") == []
+    assert not first.has_index("docs")
+
+
+def test_workers_sharing_the_disk_keep_the_index(monkeypatch, tmp_path):
+    (first, second), vector_db = mock_instances(monkeypatch, tmp_path, "a", "a")
+    vector_db.insert("docs", [item("1", "alpha")])
+    assert search_ids(first, "docs", "alpha") == ["1"]
+
+    vector_db.insert("docs", [item("2", "alpha")])
+    first.add("docs", [item("2", "alpha")])
+    first.delete("docs", ids=["1"])
+    gets = vector_db.gets
+    assert search_ids(second, "docs", "alpha") == ["2"]
+    assert vector_db.gets == gets
+
+
+def test_reset_makes_all_indexes_stale(monkeypatch, tmp_path):
+    (first, second), vector_db = mock_instances(monkeypatch, tmp_path, "a", "b")
+    vector_db.insert("docs", [item("1", "alpha")])
+    assert search_ids(second, "docs", "alpha") == ["1"]
+
+    vector_db.collections = {}
+    first.reset()
+    assert search_ids(second, "docs", "alpha") == []
+    assert not second.has_index("docs")
@@ -0,0 +1,106 @@
+import itertools
+
+from open_webui.retrieval import embedding_cache
+from open_webui.retrieval.embedding_cache import EmbeddingCache
+
+
+class FakeEmbeddingFunction:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 2.0, 3.0] for text in texts]
+
+
+def mock_cache(monkeypatch, tmp_path, **kwargs):
+    # Make each access strictly more recent than the previous one
+    clock = itertools.count(1)
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: next(clock))
+    return EmbeddingCache(
+        enabled=True,
+        cache_dir=str(tmp_path / "embeddings"),
+        redis_url="",
+        **kwargs,
+    )
+
+
+def test_embed_misses_then_hits(monkeypatch, tmp_path):
+    cache = mock_cache(monkeypatch, tmp_path)
+    func = FakeEmbeddingFunction()
+
+    assert cache.embed("openai", "model", None, "hello", func) == [5.0, 1.0, 2.0, 3.0]
+    assert cache.embed("openai", "model", None, "hello", func) == [5.0, 1.0, 2.0, 3.0]
+    assert func.calls == [["hello"]]
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_embed_batch_only_embeds_missing_texts_once(monkeypatch, tmp_path):
+    cache = mock_cache(monkeypatch, tmp_path)
+    func = FakeEmbeddingFunction()
+
+    cache.embed("openai", "model", None, ["a", "bb"], func)
+    embeddings = cache.embed("openai", "model", None, ["bb", "ccc", "ccc", "a"], func)
+
+    assert func.calls == [["a", "bb"], ["ccc"]]
+    assert [embedding[0] for embedding in embeddings] == [2.0, 3.0, 3.0, 1.0]
+
+
+def test_key_depends_on_engine_model_and_prefix(monkeypatch, tmp_path):
+    cache = mock_cache(monkeypatch, tmp_path)
+    func = FakeEmbeddingFunction()
+
+    cache.embed("openai", "model", None, "hello", func)
+    cache.embed("ollama", "model", None, "hello", func)
+    cache.embed("openai", "other", None, "hello", func)
+    cache.embed("openai", "model", "query: ", "hello", func)
+
+    assert len(func.calls) == 4
+
+
+def test_failed_embeddings_are_not_cached(monkeypatch, tmp_path):
+    cache = mock_cache(monkeypatch, tmp_path)
+
+    assert cache.embed("openai", "model", None, "hello", lambda texts: None) is None
+    assert cache.get_many([cache.get_key("openai", "model", None, "hello")]) == {}
+
+
+def test_cache_is_persisted(monkeypatch, tmp_path):
+    cache = mock_cache(monkeypatch, tmp_path)
+    cache.embed("openai", "model", None, "hello", FakeEmbeddingFunction())
+
+    func = FakeEmbeddingFunction()
+    cache = mock_cache(monkeypatch, tmp_path)
+    assert cache.size == 16
+    assert cache.embed("openai", "model", None, "hello", func) == [5.0, 1.0, 2.0, 3.0]
+    assert func.calls == []
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch, tmp_path):
+    # Each float32 embedding of 4 values takes 16 bytes
+    cache = mock_cache(monkeypatch, tmp_path, max_size=1)
+    cache.max_size = 48
+    func = FakeEmbeddingFunction()
+
+    cache.embed("openai", "model", None, "a", func)
+    cache.embed("openai", "model", None, "b", func)
+    cache.embed("openai", "model", None, "c", func)
+    cache.embed("openai", "model", None, "a", func)
+    assert cache.size == 48
+
+    # Over the limit, entries are evicted down to 90% of it, least recently used first
+    cache.embed("openai", "model", None, "d", func)
+    assert cache.size == 32
+
+    keys = {t: cache.get_key("openai", "model", None, t) for t in "abcd"}
+    assert set(cache.get_many(list(keys.values()))) == {keys["a"], keys["d"]}
+
+
+def test_disabled_cache_always_embeds(tmp_path):
+    cache = EmbeddingCache(enabled=False, cache_dir=str(tmp_path), redis_url="")
+    func = FakeEmbeddingFunction()
+
+    cache.embed("openai", "model", None, "hello", func)
+    cache.embed("openai", "model", None, "hello", func)
+    assert func.calls == [["hello"], ["hello"]]
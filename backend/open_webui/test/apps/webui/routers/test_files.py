@@ -0,0 +1,260 @@
+import asyncio
+import io
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException, Request, UploadFile
+from langchain_core.documents import Document
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers
+
+from open_webui.internal.db import Base
+from open_webui.models import files as files_model
+from open_webui.models.files import FileBlobs, Files
+from open_webui.routers import files, retrieval
+from open_webui.storage import provider
+
+
+class FakeConfig:
+    def __getattr__(self, name):
+        return None
+
+
+class FakeStorage(provider.LocalStorageProvider):
+    presigned_url = None
+
+    def get_presigned_url(self, file_path, expires_in, content_type, disposition):
+        return self.presigned_url
+
+
+class FakeLoader:
+    loads = 0
+
+    def __init__(self, **kwargs):
+        pass
+
+    def load(self, filename, content_type, file_path):
+        FakeLoader.loads += 1
+        with open(file_path) as f:
+            return [Document(page_content=f.read(), metadata={})]
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/webui.db")
+    Base.metadata.create_all(
+        engine, tables=[files_model.File.__table__, files_model.FileBlob.__table__]
+    )
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(files_model, "get_db", get_db)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(monkeypatch, tmp_path):
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    monkeypatch.setattr(provider, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(files, "Storage", provider.LocalStorageProvider())
+    return upload_dir
+
+
+class TestFileDeduplication:
+    request = SimpleNamespace(
+        app=SimpleNamespace(state=SimpleNamespace(config=FakeConfig()))
+    )
+    user = SimpleNamespace(id="1", role="user")
+
+    def upload(self, content, process=False):
+        file = UploadFile(
+            file=io.BytesIO(content),
+            filename="test.txt",
+            headers=Headers({"content-type": "text/plain"}),
+        )
+        return files.upload_file(
+            self.request,
+            file,
+            user=self.user,
+            file_metadata={},
+            process=process,
+            process_in_background=False,
+        )
+
+    def test_upload_duplicate(self, upload_dir):
+        first = self.upload(b"test content")
+        second = self.upload(b"test content")
+        other = self.upload(b"other content")
+
+        assert second.path == first.path
+        assert other.path != first.path
+        assert len(os.listdir(upload_dir)) == 2
+
+        # The shared content is deleted with the last file using it
+        asyncio.run(files.delete_file_by_id(first.id, user=self.user))
+        assert os.path.exists(first.path)
+        asyncio.run(files.delete_file_by_id(second.id, user=self.user))
+        assert not os.path.exists(first.path)
+
+    def test_process_duplicate(self, monkeypatch):
+        saved, copied = [], []
+        FakeLoader.loads = 0
+        monkeypatch.setattr(retrieval, "Loader", FakeLoader)
+        monkeypatch.setattr(
+            retrieval,
+            "save_docs_to_vector_db",
+            lambda request, docs, collection_name, **kwargs: saved.append(
+                collection_name
+            )
+            or True,
+        )
+        monkeypatch.setattr(
+            retrieval,
+            "copy_docs_to_vector_db",
+            lambda request, **kwargs: copied.append(kwargs) or True,
+        )
+
+        first = self.upload(b"test content", process=True)
+        assert FakeLoader.loads == 1
+        assert saved == [f"file-{first.id}"]
+
+        # The content and vectors of the first file are reused
+        second = self.upload(b"test content", process=True)
+        assert FakeLoader.loads == 1
+        assert second.data["content"] == "test content"
+        assert copied[0]["source_collection_name"] == f"file-{first.id}"
+        assert copied[0]["collection_name"] == f"file-{second.id}"
+        assert copied[0]["metadata"]["file_id"] == second.id
+        assert copied[0]["source_file_id"] == first.id
+
+        # Unless the first file is gone
+        asyncio.run(files.delete_file_by_id(first.id, user=self.user))
+        third = self.upload(b"test content", process=True)
+        assert FakeLoader.loads == 2
+        assert saved[-1] == f"file-{third.id}"
+        assert FileBlobs.get_source_file(Files.get_file_by_id(second.id)).id == (
+            third.id
+        )
+
+
+@pytest.mark.parametrize(
+    "range_header, byte_range",
+    [
+        (None, None),
+        ("bytes=2-5", (2, 5)),
+        ("bytes=5-", (5, 9)),
+        ("bytes=3-100", (3, 9)),
+        # Suffix ranges, the last bytes of the file
+        ("bytes=-3", (7, 9)),
+        ("bytes=-20", (0, 9)),
+        # Invalid or unsupported ranges are ignored
+        ("bytes=5-3", None),
+        ("bytes=0-1,4-5", None),
+        ("bytes=a-b", None),
+        ("items=0-1", None),
+    ],
+)
+def test_get_byte_range(range_header, byte_range):
+    assert files.get_byte_range(range_header, 10) == byte_range
+
+
+@pytest.mark.parametrize("range_header", ["bytes=10-", "bytes=20-30", "bytes=-0"])
+def test_get_byte_range_not_satisfiable(range_header):
+    with pytest.raises(HTTPException) as e:
+        files.get_byte_range(range_header, 10)
+    assert e.value.status_code == 416
+    assert e.value.headers == {"Content-Range": "bytes */10"}
+
+
+class TestGetFileResponse:
+    content = b"0123456789"
+
+    @pytest.fixture(autouse=True)
+    def storage(self, monkeypatch, upload_dir):
+        (upload_dir / "test.txt").write_bytes(self.content)
+        self.file_path = str(upload_dir / "test.txt")
+
+        storage = FakeStorage()
+        monkeypatch.setattr(files, "Storage", storage)
+        monkeypatch.setattr(files, "STORAGE_PROVIDER", "s3")
+        return storage
+
+    def get(self, range_header=None):
+        headers = [(b"range", range_header.encode())] if range_header else []
+        request = Request({"type": "http", "headers": headers})
+
+        async def main():
+            response = await files.get_file_response(
+                request, self.file_path, {}, media_type="text/plain"
+            )
+            if not hasattr(response, "body_iterator"):
+                return response, None
+            return response, b"".join([chunk async for chunk in response.body_iterator])
+
+        return asyncio.run(main())
+
+    def test_stream(self, monkeypatch):
+        monkeypatch.setattr(files, "STORAGE_DELIVERY_MODE", "stream")
+        response, body = self.get()
+        assert response.status_code == 200
+        assert response.headers["Accept-Ranges"] == "bytes"
+        assert response.headers["Content-Length"] == "10"
+        assert "Content-Range" not in response.headers
+        assert body == self.content
+
+    def test_stream_range(self, monkeypatch):
+        monkeypatch.setattr(files, "STORAGE_DELIVERY_MODE", "stream")
+        response, body = self.get("bytes=2-5")
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == "bytes 2-5/10"
+        assert response.headers["Content-Length"] == "4"
+        assert body == b"2345"
+
+        response, body = self.get("bytes=-3")
+        assert response.headers["Content-Range"] == "bytes 7-9/10"
+        assert body == b"789"
+
+        # An invalid range is ignored
+        response, body = self.get("bytes=5-3")
+        assert response.status_code == 200
+        assert body == self.content
+
+    def test_redirect(self, monkeypatch, storage):
+        monkeypatch.setattr(files, "STORAGE_DELIVERY_MODE", "redirect")
+        storage.presigned_url = "https://bucket.s3.amazonaws.com/test.txt?X-Amz=1"
+        response, _ = self.get()
+        assert response.status_code == 307
+        assert response.headers["Location"] == storage.presigned_url
+
+    def test_redirect_without_presigned_url(self, monkeypatch):
+        # Providers that can't sign URLs stream the file instead
+        monkeypatch.setattr(files, "STORAGE_DELIVERY_MODE", "redirect")
+        response, body = self.get("bytes=2-5")
+        assert response.status_code == 206
+        assert body == b"2345"
+
+    def test_local_copy(self, monkeypatch):
+        monkeypatch.setattr(files, "STORAGE_DELIVERY_MODE", "local")
+        response, _ = self.get()
+        assert response.status_code == 200
+        assert response.path == Path(self.file_path)
+
+        os.remove(self.file_path)
+        with pytest.raises(HTTPException) as e:
+            self.get()
+        assert e.value.status_code == 404
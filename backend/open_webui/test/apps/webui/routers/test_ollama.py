@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from open_webui.routers import ollama
+from open_webui.utils.load_balancer import LoadBalancer
+
+URLS = ["http://a:11434", "http://b:11434", "http://c:11434"]
+
+
+def mock_request(configs):
+    config = SimpleNamespace(OLLAMA_BASE_URLS=URLS, OLLAMA_API_CONFIGS=configs)
+    return SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(config=config)))
+
+
+def test_select_url_idx(monkeypatch):
+    balancer = LoadBalancer(strategy="least_in_flight")
+    monkeypatch.setattr(ollama, "OLLAMA_LOAD_BALANCER", balancer)
+    request = mock_request({})
+
+    balancer.acquire(URLS[0])
+    assert ollama.select_url_idx(request, [0, 2]) == 2
+    balancer.acquire(URLS[2])
+    balancer.acquire(URLS[2])
+    assert ollama.select_url_idx(request, [0, 2]) == 0
+    assert ollama.select_url_idx(request, [1]) == 1
+
+
+def test_select_url_idx_weights(monkeypatch):
+    monkeypatch.setattr(
+        ollama, "OLLAMA_LOAD_BALANCER", LoadBalancer(strategy="weighted")
+    )
+
+    # Weights are configured by connection index, or by URL for legacy configs
+    request = mock_request({"0": {"weight": 0}, URLS[2]: {"weight": 0}})
+    assert {ollama.select_url_idx(request, [0, 1]) for _ in range(20)} == {1}
+    assert {ollama.select_url_idx(request, [1, 2]) for _ in range(20)} == {1}
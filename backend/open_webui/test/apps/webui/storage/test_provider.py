@@ -1,3 +1,4 @@
+import hashlib
 import io
 import os
 import boto3
@@ -66,14 +67,25 @@ class TestLocalStorageProvider:
 
     def test_upload_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
+        size, sha256, file_path = self.Storage.upload_file(
+            self.file_bytesio, self.filename
+        )
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
+        assert sha256 == hashlib.sha256(self.file_content).hexdigest()
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
 
+    def test_upload_file_max_size(self, monkeypatch, tmp_path):
+        upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+        with pytest.raises(ValueError):
+            self.Storage.upload_file(
+                io.BytesIO(self.file_content), self.filename, max_size=4
+            )
+        assert not (upload_dir / self.filename).exists()
+
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         file_path = str(upload_dir / self.filename)
@@ -116,7 +128,7 @@ class TestS3StorageProvider:
         with pytest.raises(Exception):
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, sha256, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
@@ -124,7 +136,7 @@ class TestS3StorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
             self.Storage.upload_file(self.file_bytesio_empty, self.filename)
@@ -132,7 +144,7 @@ class TestS3StorageProvider:
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, sha256, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(s3_file_path)
@@ -142,7 +154,7 @@ class TestS3StorageProvider:
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
+        size, sha256, s3_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         assert (upload_dir / self.filename).exists()
@@ -229,7 +241,7 @@ class TestGCSStorageProvider:
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
             self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, sha256, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         object = self.Storage.bucket.get_blob(self.filename)
@@ -237,7 +249,7 @@ class TestGCSStorageProvider:
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
@@ -245,7 +257,7 @@ class TestGCSStorageProvider:
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, sha256, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         file_path = self.Storage.get_file(gcs_file_path)
@@ -254,7 +266,7 @@ class TestGCSStorageProvider:
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
+        size, sha256, gcs_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
         # ensure that local directory has the uploaded file as well
@@ -348,16 +360,14 @@ class TestAzureStorageProvider:
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
+        size, sha256, azure_file_path = self.Storage.upload_file(
             io.BytesIO(self.file_content), self.filename
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
-        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
-        )
-        assert contents == self.file_content
+        self.Storage.container_client.get_blob_client().upload_blob.assert_called_once()
+        assert size == len(self.file_content)
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -375,7 +385,7 @@ class TestAzureStorageProvider:
         # Mock upload behavior
         self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
         # Mock blob download behavior
-        self.Storage.container_client.get_blob_client().download_blob().readall.return_value = (
+        self.Storage.container_client.get_blob_client().download_blob().readinto.side_effect = lambda f: f.write(
             self.file_content
         )
 
@@ -433,3 +443,79 @@ class TestAzureStorageProvider:
         )
         with pytest.raises(Exception, match="Blob not found"):
             self.Storage.get_file(file_url)
+
+
+class TestStorageCache:
+    file_content = b"test content"
+
+    def download(self, path):
+        self.downloads += 1
+        with open(path, "wb") as f:
+            f.write(self.file_content)
+
+    def test_get(self, tmp_path):
+        self.downloads = 0
+        cache = provider.StorageCache()
+        file_path = str(tmp_path / "test.txt")
+
+        assert cache.get(file_path, lambda: "v1", self.download) == file_path
+        assert cache.get(file_path, lambda: "v1", self.download) == file_path
+        assert self.downloads == 1
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+        # A new version of the object is downloaded again
+        cache.get(file_path, lambda: "v2", self.download)
+        assert self.downloads == 2
+
+        # So is a copy removed from disk
+        os.remove(file_path)
+        cache.get(file_path, lambda: "v2", self.download)
+        assert self.downloads == 3
+        assert (tmp_path / "test.txt").read_bytes() == self.file_content
+
+    def test_eviction(self, tmp_path):
+        self.downloads = 0
+        cache = provider.StorageCache()
+        cache.max_size = len(self.file_content) * 2
+
+        for filename in ["a.txt", "b.txt", "c.txt"]:
+            cache.get(str(tmp_path / filename), lambda: "v1", self.download)
+
+        assert not (tmp_path / "a.txt").exists()
+        assert (tmp_path / "b.txt").exists()
+        assert (tmp_path / "c.txt").exists()
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["size"] == len(self.file_content) * 2
+
+    def test_existing_copies_are_counted(self, tmp_path):
+        self.downloads = 0
+        for filename in ["a.txt", "b.txt"]:
+            (tmp_path / filename).write_bytes(self.file_content)
+        os.utime(tmp_path / "a.txt", (0, 0))
+        (tmp_path / "partial.tmp").write_bytes(self.file_content)
+
+        cache = provider.StorageCache(directory=str(tmp_path))
+        assert cache.get_stats()["files"] == 2
+        assert cache.get_stats()["size"] == len(self.file_content) * 2
+
+        # The version of existing copies is unknown, so they are downloaded again
+        cache.get(str(tmp_path / "b.txt"), lambda: "v1", self.download)
+        assert self.downloads == 1
+
+        # And the oldest ones are evicted first
+        cache.max_size = len(self.file_content) * 2
+        cache.get(str(tmp_path / "c.txt"), lambda: "v1", self.download)
+        assert not (tmp_path / "a.txt").exists()
+        assert (tmp_path / "b.txt").exists()
+        assert cache.get_stats()["size"] == len(self.file_content) * 2
+
+    def test_download_error(self, tmp_path):
+        cache = provider.StorageCache()
+
+        def download(path):
+            raise RuntimeError("Download failed")
+
+        with pytest.raises(RuntimeError):
+            cache.get(str(tmp_path / "test.txt"), lambda: "v1", download)
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui import config
+from open_webui.config import AppConfig, PersistentConfig
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        if self.redis.closed:
+            # Parks the listener thread once the test is over
+            threading.Event().wait()
+        if self.redis.down:
+            raise ConnectionError("Redis is down")
+        self.redis.subscribers.append(self)
+
+    def listen(self):
+        while True:
+            message = self.messages.get()
+            if message is None:
+                raise ConnectionError("Connection closed")
+            yield message
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.subscribers = []
+        self.down = False
+        self.closed = False
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def publish(self, channel, message):
+        for subscriber in self.subscribers:
+            subscriber.messages.put(
+                {"type": "message", "channel": channel, "data": message}
+            )
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+    def disconnect(self):
+        subscribers, self.subscribers = self.subscribers, []
+        for subscriber in subscribers:
+            subscriber.messages.put(None)
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(config, "get_redis_connection", lambda *args, **kwargs: redis)
+    monkeypatch.setattr(config, "save_to_db", lambda data: None)
+    monkeypatch.setattr(config, "CONFIG_DATA", {})
+    monkeypatch.setattr(config, "PERSISTENT_CONFIG_REGISTRY", [])
+    # Reconnect right away
+    monkeypatch.setattr(config, "time", SimpleNamespace(sleep=lambda s: None))
+    yield redis
+    redis.closed = True
+    redis.disconnect()
+
+
+def mock_app_config(redis, value=1):
+    app_config = AppConfig(redis_url="redis://")
+    app_config.TEST_VALUE = PersistentConfig("TEST_VALUE", "test.value", value)
+    wait_until(lambda: any(s for s in redis.subscribers))
+    return app_config
+
+
+def test_set_is_published(redis):
+    app_config = mock_app_config(redis)
+    app_config.TEST_VALUE = 2
+
+    assert app_config.TEST_VALUE == 2
+    assert redis.values == {"open-webui:config:TEST_VALUE": "2"}
+    assert config.CONFIG_DATA == {"test": {"value": 2}}
+
+
+def test_change_is_pushed_to_other_instances(redis):
+    first = mock_app_config(redis)
+    second = mock_app_config(redis)
+    wait_until(lambda: len(redis.subscribers) == 2)
+    assert second.TEST_VALUE == 1
+
+    first.TEST_VALUE = 2
+    # Refreshed by the listener, not on read
+    wait_until(lambda: second._state["TEST_VALUE"].value == 2)
+    assert second.TEST_VALUE == 2
+
+
+def test_first_read_is_loaded_from_redis(redis):
+    redis.values["open-webui:config:TEST_VALUE"] = "3"
+    redis.down = True
+    app_config = AppConfig(redis_url="redis://")
+    app_config.TEST_VALUE = PersistentConfig("TEST_VALUE", "test.value", 1)
+
+    assert app_config.TEST_VALUE == 3
+
+
+def test_changes_are_caught_up_after_resubscribe(redis):
+    first = mock_app_config(redis)
+    second = mock_app_config(redis)
+    wait_until(lambda: len(redis.subscribers) == 2)
+    assert second.TEST_VALUE == 1
+
+    # Changes published while disconnected are missed
+    redis.down = True
+    redis.disconnect()
+    first.TEST_VALUE = 2
+    assert second._state["TEST_VALUE"].value == 1
+
+    redis.down = False
+    wait_until(lambda: second._state["TEST_VALUE"].value == 2)
@@ -0,0 +1,109 @@
+from open_webui.utils import activity
+from open_webui.utils.activity import ActivityTracker
+
+
+class FakeUsers:
+    def __init__(self):
+        self.writes = []
+        self.fail = False
+
+    def update_users_last_active(self, timestamps):
+        if self.fail:
+            return False
+        self.writes.append(dict(timestamps))
+        return True
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def hgetall(self, name):
+        self.commands.append(lambda: dict(self.redis.hashes.get(name, {})))
+
+    def delete(self, name):
+        self.commands.append(lambda: int(self.redis.hashes.pop(name, None) is not None))
+
+    def execute(self):
+        return [command() for command in self.commands]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+
+    def hset(self, name, key, value):
+        self.hashes.setdefault(name, {})[key] = str(value)
+
+    def pipeline(self, transaction=True):
+        assert transaction
+        return FakePipeline(self)
+
+
+def mock_tracker(monkeypatch, now, redis=None):
+    users = FakeUsers()
+    monkeypatch.setattr(activity, "Users", users)
+    monkeypatch.setattr(activity.time, "time", lambda: now[0])
+
+    tracker = ActivityTracker(precision=60, redis_url="")
+    tracker.redis = redis
+    return tracker, users
+
+
+def test_touch_is_recorded_once_per_window(monkeypatch):
+    now = [1200]
+    tracker, users = mock_tracker(monkeypatch, now)
+
+    tracker.touch("user-1")
+    now[0] += 30
+    tracker.touch("user-1")
+    tracker.touch("user-2")
+    tracker.flush()
+    assert users.writes == [{"user-1": 1200, "user-2": 1230}]
+
+    # Nothing new to write within the same window
+    tracker.touch("user-1")
+    tracker.flush()
+    assert len(users.writes) == 1
+
+    now[0] += 30
+    tracker.touch("user-1")
+    tracker.flush()
+    assert users.writes[-1] == {"user-1": 1260}
+
+
+def test_failed_writes_are_retried(monkeypatch):
+    now = [1200]
+    tracker, users = mock_tracker(monkeypatch, now)
+
+    tracker.touch("user-1")
+    users.fail = True
+    tracker.flush()
+    assert users.writes == []
+
+    users.fail = False
+    tracker.flush()
+    assert users.writes == [{"user-1": 1200}]
+
+
+def test_activity_is_shared_through_redis(monkeypatch):
+    now = [1200]
+    redis = FakeRedis()
+    tracker, users = mock_tracker(monkeypatch, now, redis)
+    other_tracker = ActivityTracker(precision=60, redis_url="")
+    other_tracker.redis = redis
+
+    tracker.touch("user-1")
+    now[0] += 10
+    other_tracker.touch("user-1")
+    other_tracker.touch("user-2")
+    assert tracker.pending == {}
+
+    tracker.flush()
+    assert users.writes == [{"user-1": 1210, "user-2": 1210}]
+    assert redis.hashes == {}
+
+    # Entries are taken by a single instance
+    other_tracker.flush()
+    assert len(users.writes) == 1
@@ -0,0 +1,89 @@
+import asyncio
+
+from open_webui.utils import chat_buffer
+from open_webui.utils.chat_buffer import MessageWriteBuffer
+
+
+class FakeChats:
+    def __init__(self):
+        self.patches = []
+
+    def patch_message_by_id_and_message_id(self, id, message_id, message):
+        self.patches.append((id, message_id, dict(message)))
+        return True
+
+
+def mock_chats(monkeypatch):
+    chats = FakeChats()
+    monkeypatch.setattr(chat_buffer, "Chats", chats)
+    return chats
+
+
+def test_write_is_buffered_within_interval(monkeypatch):
+    chats = mock_chats(monkeypatch)
+    buffer = MessageWriteBuffer("chat", "message", interval=60, max_bytes=1000)
+
+    async def run():
+        await buffer.write({"content": "Hello"})
+        await buffer.write({"content": "Hello world"})
+
+    asyncio.run(run())
+    assert chats.patches == []
+    assert buffer.pending == {"content": "Hello world"}
+
+
+def test_write_flushes_after_interval(monkeypatch):
+    chats = mock_chats(monkeypatch)
+    now = [100.0]
+    monkeypatch.setattr(chat_buffer.time, "monotonic", lambda: now[0])
+    buffer = MessageWriteBuffer("chat", "message", interval=1, max_bytes=1000)
+
+    async def run():
+        await buffer.write({"content": "Hello"})
+        now[0] += 1
+        await buffer.write({"content": "Hello world"})
+
+    asyncio.run(run())
+    assert chats.patches == [("chat", "message", {"content": "Hello world"})]
+    assert buffer.pending == {}
+
+
+def test_write_flushes_after_max_bytes(monkeypatch):
+    chats = mock_chats(monkeypatch)
+    buffer = MessageWriteBuffer("chat", "message", interval=60, max_bytes=10)
+
+    async def run():
+        await buffer.write({"content": "Hello"})
+        await buffer.write({"content": "Hello world"})
+        # Only the bytes written since the last save count towards the window
+        await buffer.write({"content": "Hello world!"})
+
+    asyncio.run(run())
+    assert chats.patches == [("chat", "message", {"content": "Hello world"})]
+    assert buffer.pending == {"content": "Hello world!"}
+
+
+def test_flush_writes_pending_and_final_message(monkeypatch):
+    chats = mock_chats(monkeypatch)
+    buffer = MessageWriteBuffer("chat", "message", interval=60, max_bytes=1000)
+
+    async def run():
+        await buffer.write({"content": "Hello"})
+        await buffer.flush({"done": True})
+        await buffer.flush()
+
+    asyncio.run(run())
+    assert chats.patches == [("chat", "message", {"content": "Hello", "done": True})]
+
+
+def test_flush_keeps_pending_on_error(monkeypatch):
+    chats = mock_chats(monkeypatch)
+
+    def fail(id, message_id, message):
+        raise Exception("database is locked")
+
+    monkeypatch.setattr(chats, "patch_message_by_id_and_message_id", fail)
+    buffer = MessageWriteBuffer("chat", "message", interval=60, max_bytes=1000)
+
+    asyncio.run(buffer.flush({"content": "Hello"}))
+    assert buffer.pending == {"content": "Hello"}
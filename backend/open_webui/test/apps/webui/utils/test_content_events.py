@@ -0,0 +1,122 @@
+from types import SimpleNamespace
+
+from open_webui.utils import middleware
+from open_webui.utils.middleware import ContentEventBuilder
+
+
+def serialize(content_blocks):
+    # Shaped like the serialization of text and reasoning blocks in the middleware
+    content = ""
+    for block in content_blocks:
+        if block["type"] == "text":
+            content = f"{content}{block['content'].strip()}\n"
+        else:
+            content = f'{content}\n<details type="{block["type"]}">\n{block["content"]}\n</details>\n'
+    return content
+
+
+class Client:
+    """Applies chat:completion payloads the way the frontend does."""
+
+    def __init__(self):
+        self.content = ""
+
+    def apply(self, data):
+        if "content" in data:
+            self.content = data["content"]
+        else:
+            delta = data["delta"]
+            self.content = self.content[: delta["offset"]] + delta["content"]
+
+
+def mock_builder(monkeypatch, sessions=None):
+    sessions = sessions if sessions is not None else [["sid-1"]]
+    clock = [1000.0]
+    monkeypatch.setattr(middleware, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    builder = ContentEventBuilder(serialize, lambda: sessions[-1])
+    return builder, clock
+
+
+def test_growing_block_is_sent_as_deltas(monkeypatch):
+    builder, _ = mock_builder(monkeypatch)
+    client = Client()
+    reasoning = {"type": "reasoning", "content": "Let me think"}
+    text = {"type": "text", "content": ""}
+    blocks = [reasoning, text]
+
+    data = builder.get_data(blocks)
+    assert "content" in data
+    client.apply(data)
+
+    for token in ["Hello", " world", "!"]:
+        text["content"] += token
+        data = builder.get_data(blocks)
+        assert data["delta"]["index"] == 1
+        client.apply(data)
+        assert client.content == serialize(blocks)
+
+    assert data["delta"]["content"] == "!\n"
+
+
+def test_rewritten_tail_is_replaced(monkeypatch):
+    builder, _ = mock_builder(monkeypatch)
+    client = Client()
+    text = {"type": "text", "content": "Hello"}
+    client.apply(builder.get_data([text]))
+
+    # Trailing whitespace is stripped, so the serialized block doesn't only grow
+    text["content"] = "Hello "
+    client.apply(builder.get_data([text]))
+    text["content"] = "Hello world"
+    data = builder.get_data([text])
+    assert data["delta"] == {"index": 0, "offset": 5, "content": " world\n"}
+    client.apply(data)
+    assert client.content == serialize([text])
+
+
+def test_changed_blocks_send_full_content(monkeypatch):
+    builder, _ = mock_builder(monkeypatch)
+    reasoning = {"type": "reasoning", "content": "Let me think"}
+    blocks = [reasoning]
+    builder.get_data(blocks)
+
+    # A new block
+    text = {"type": "text", "content": "Hello"}
+    blocks.append(text)
+    assert builder.get_data(blocks) == {"content": serialize(blocks)}
+    text["content"] += " world"
+    assert "delta" in builder.get_data(blocks)
+
+    # An earlier block modified in place
+    reasoning["duration"] = 3
+    reasoning["content"] += "."
+    assert builder.get_data(blocks) == {"content": serialize(blocks)}
+
+    # An earlier block removed
+    assert builder.get_data([text]) == {"content": serialize([text])}
+
+    # The same position with another block type
+    code = {"type": "code_interpreter", "content": "print(1)"}
+    assert builder.get_data([code]) == {"content": serialize([code])}
+
+
+def test_new_session_gets_full_content(monkeypatch):
+    sessions = [["sid-1"]]
+    builder, clock = mock_builder(monkeypatch, sessions)
+    text = {"type": "text", "content": "Hello"}
+    builder.get_data([text])
+
+    # Sessions are only checked once a second
+    sessions.append(["sid-1", "sid-2"])
+    text["content"] += " world"
+    assert "delta" in builder.get_data([text])
+
+    clock[0] += 1
+    text["content"] += "!"
+    assert builder.get_data([text]) == {"content": serialize([text])}
+
+    # Not when a session goes away
+    sessions.append(["sid-2"])
+    clock[0] += 1
+    text["content"] += "!"
+    assert "delta" in builder.get_data([text])
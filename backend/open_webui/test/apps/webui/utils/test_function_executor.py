@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from open_webui.utils.function_executor import FunctionExecutor, FunctionTimeoutError
+
+
+def test_run_sync_and_async_handlers():
+    executor = FunctionExecutor(max_workers=2, max_concurrency=2, timeout=5)
+
+    def sync_handler(value):
+        return threading.current_thread().name, value
+
+    async def async_handler(value):
+        return value * 2
+
+    async def run():
+        thread_name, value = await executor.run("sync", sync_handler, 1)
+        assert thread_name.startswith("function")
+        assert value == 1
+        assert await executor.run("async", async_handler, value=2) == 4
+
+    asyncio.run(run())
+    assert executor.get_stats()["sync"]["calls"] == 1
+    assert executor.get_stats()["async"]["calls"] == 1
+
+
+def test_errors_are_counted():
+    executor = FunctionExecutor(max_workers=1, max_concurrency=1, timeout=5)
+
+    def handler():
+        raise ValueError("invalid")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run("function", handler))
+    assert executor.get_stats()["function"]["errors"] == 1
+
+
+def test_sync_handler_times_out_and_keeps_its_slot():
+    executor = FunctionExecutor(max_workers=2, max_concurrency=1, timeout=0.1)
+    finished = threading.Event()
+
+    def slow_handler():
+        time.sleep(0.3)
+        finished.set()
+
+    async def run():
+        with pytest.raises(FunctionTimeoutError):
+            await executor.run("function", slow_handler)
+
+        # The thread still runs, so the next call waits for its slot and times out
+        with pytest.raises(FunctionTimeoutError):
+            await executor.run("function", lambda: None)
+
+        # Once the thread returned, the slot is released
+        await asyncio.sleep(0.3)
+        assert finished.is_set()
+        assert await executor.run("function", lambda: "done") == "done"
+
+    asyncio.run(run())
+    stats = executor.get_stats()["function"]
+    assert stats["timeouts"] == 2
+    assert stats["errors"] == 0
+
+
+def test_async_handler_is_not_bounded_by_the_timeout():
+    executor = FunctionExecutor(max_workers=1, max_concurrency=1, timeout=0.05)
+
+    async def slow_handler():
+        await asyncio.sleep(0.2)
+        return "done"
+
+    assert asyncio.run(executor.run("function", slow_handler)) == "done"
+
+
+def test_concurrency_is_limited_per_function():
+    executor = FunctionExecutor(max_workers=4, max_concurrency=2, timeout=5)
+    lock = threading.Lock()
+    running = {"function": 0, "other": 0}
+    max_running = {"function": 0, "other": 0}
+
+    def handler(function_id):
+        with lock:
+            running[function_id] += 1
+            max_running[function_id] = max(
+                max_running[function_id], running[function_id]
+            )
+        time.sleep(0.05)
+        with lock:
+            running[function_id] -= 1
+
+    async def run():
+        await asyncio.gather(
+            *[executor.run("function", handler, "function") for _ in range(6)],
+            *[executor.run("other", handler, "other") for _ in range(2)],
+        )
+
+    asyncio.run(run())
+    assert max_running == {"function": 2, "other": 2}
+
+
+def test_cancelled_async_handler_releases_its_slot():
+    executor = FunctionExecutor(max_workers=1, max_concurrency=1, timeout=5)
+
+    async def run():
+        task = asyncio.create_task(executor.run("function", asyncio.sleep, 10))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert (
+            await asyncio.wait_for(executor.run("function", asyncio.sleep, 0), 1)
+            is None
+        )
+
+    asyncio.run(run())
+
+
+def test_iterate_consumes_sync_iterators():
+    executor = FunctionExecutor(max_workers=1, max_concurrency=1, timeout=5)
+
+    def stream():
+        yield "a"
+        yield threading.current_thread().name
+
+    async def run():
+        return [item async for item in executor.iterate("function", stream())]
+
+    items = asyncio.run(run())
+    assert items[0] == "a"
+    assert items[1].startswith("function")
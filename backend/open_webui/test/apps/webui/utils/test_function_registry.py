@@ -0,0 +1,101 @@
+import pytest
+
+from open_webui.utils import function_registry
+from open_webui.utils.function_registry import FunctionRegistry
+
+
+class FakeFunction:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeFunctions:
+    def __init__(self):
+        self.functions = {}
+        self.reads = 0
+
+    def get_function_by_id(self, id):
+        self.reads += 1
+        return self.functions.get(id)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, message))
+
+
+def mock_registry(monkeypatch):
+    functions = FakeFunctions()
+    loads = []
+
+    def load_function_module_by_id(function_id, content=None):
+        if content is None:
+            content = functions.functions[function_id].content
+        loads.append((function_id, content))
+        return object(), "filter", {"content": content}
+
+    monkeypatch.setattr(function_registry, "Functions", functions)
+    monkeypatch.setattr(
+        function_registry, "load_function_module_by_id", load_function_module_by_id
+    )
+    return FunctionRegistry(redis_url=""), functions, loads
+
+
+def test_load_reuses_module_with_same_content(monkeypatch):
+    registry, _, loads = mock_registry(monkeypatch)
+
+    module, type, frontmatter = registry.load("filter", "a = 1")
+    assert type == "filter"
+    assert frontmatter == {"content": "a = 1"}
+    assert registry.load("filter", "a = 1")[0] is module
+    assert registry.load("filter", "a = 2")[0] is not module
+    assert loads == [("filter", "a = 1"), ("filter", "a = 2")]
+
+
+def test_get_loads_once(monkeypatch):
+    registry, functions, loads = mock_registry(monkeypatch)
+    functions.functions["filter"] = FakeFunction("a = 1")
+
+    module = registry.get("filter")
+    assert registry.get("filter") is module
+    assert functions.reads == 1
+    assert len(loads) == 1
+
+
+def test_stale_module_is_reloaded_only_if_content_changed(monkeypatch):
+    registry, functions, loads = mock_registry(monkeypatch)
+    functions.functions["filter"] = FakeFunction("a = 1")
+    module = registry.get("filter")
+
+    registry.invalidate("filter")
+    assert registry.get("filter") is module
+    assert functions.reads == 2
+    assert len(loads) == 1
+
+    functions.functions["filter"] = FakeFunction("a = 2")
+    registry.invalidate("filter")
+    assert registry.get("filter") is not module
+    assert loads[-1] == ("filter", "a = 2")
+
+
+def test_removed_function_is_dropped(monkeypatch):
+    registry, functions, _ = mock_registry(monkeypatch)
+    functions.functions["filter"] = FakeFunction("a = 1")
+    registry.get("filter")
+
+    del functions.functions["filter"]
+    registry.invalidate("filter", remove=True)
+    assert "filter" not in registry.entries
+    with pytest.raises(Exception, match="Function not found"):
+        registry.get("filter")
+
+
+def test_invalidate_is_published(monkeypatch):
+    registry, _, _ = mock_registry(monkeypatch)
+    registry.redis = FakeRedis()
+
+    registry.invalidate("filter")
+    assert registry.redis.messages == [("open-webui:functions", "filter")]
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from contextlib import contextmanager
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from open_webui.internal.db import Base
+from open_webui.models import ingestion as ingestion_model
+from open_webui.models.ingestion import IngestionJob, IngestionJobs
+from open_webui.utils import ingestion
+from open_webui.utils.ingestion import IngestionQueue, report_progress
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/webui.db", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine, tables=[IngestionJob.__table__])
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(ingestion_model, "get_db", get_db)
+    monkeypatch.setattr(ingestion, "get_session_ids_by_user_id", lambda user_id: [])
+    yield
+    engine.dispose()
+
+
+async def wait_for_job(job_id, statuses=("done", "failed"), timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = IngestionJobs.get_job_by_id(job_id)
+        if job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise TimeoutError(f"Ingestion job {job_id} is still {job.status}")
+
+
+def run_jobs(queue, *jobs):
+    """Enqueue jobs on a started queue, returning them once they are over."""
+
+    async def main():
+        queue.start(FastAPI())
+        try:
+            ids = [queue.enqueue(*job).id for job in jobs]
+            return [await wait_for_job(id) for id in ids]
+        finally:
+            queue.stop()
+
+    return asyncio.run(main())
+
+
+class TestIngestionQueue:
+    def test_run(self):
+        calls = []
+
+        def handler(request, job):
+            calls.append(job.file_id)
+            report_progress("embedding", 0.5)
+
+        queue = IngestionQueue(redis_url=None, poll_interval=0.01)
+        queue.register("file", handler)
+        [job] = run_jobs(queue, ("file", "1", "1"))
+
+        assert calls == ["1"]
+        assert job.status == "done"
+        assert job.progress == 1.0
+        assert job.attempts == 1
+
+    def test_job_queued_twice_runs_once(self):
+        calls = []
+        queue = IngestionQueue(redis_url=None, poll_interval=0.01)
+        queue.register("file", lambda request, job: calls.append(job.id))
+
+        async def main():
+            queue.start(FastAPI())
+            try:
+                job = queue.enqueue("file", "1", "1")
+                queue._push(job.id)
+                await wait_for_job(job.id)
+                await asyncio.sleep(0.05)
+            finally:
+                queue.stop()
+
+        asyncio.run(main())
+        assert len(calls) == 1
+
+    def test_retry(self):
+        calls = []
+
+        def handler(request, job):
+            calls.append(job.attempts)
+            if job.attempts < 2:
+                raise Exception("Temporary error")
+
+        queue = IngestionQueue(
+            redis_url=None, poll_interval=0.01, retry_backoff=0, max_attempts=3
+        )
+        queue.register("file", handler)
+        [job] = run_jobs(queue, ("file", "1", "1"))
+
+        assert calls == [1, 2]
+        assert job.status == "done"
+        assert job.error is None
+
+    def test_max_attempts(self):
+        def handler(request, job):
+            raise Exception("Error")
+
+        queue = IngestionQueue(
+            redis_url=None, poll_interval=0.01, retry_backoff=0, max_attempts=2
+        )
+        queue.register("file", handler)
+        [job] = run_jobs(queue, ("file", "1", "1"))
+
+        assert job.status == "failed"
+        assert job.error == "Error"
+        assert job.attempts == 2
+
+    def test_requeue_stale_job(self):
+        queue = IngestionQueue(redis_url=None, lease=30, max_attempts=3)
+        queue.redis = FakeRedis()
+
+        job = queue.enqueue("file", "1", "1")
+        IngestionJobs.claim_job(job.id)
+        queued = queue.redis.lists["open-webui:ingestion"]
+        assert queued == [job.id]
+
+        # A job still reporting within its lease is left running
+        queued_before = int(time.time())
+        queue.requeue(queued_before)
+        assert queued == [job.id]
+
+        # One whose instance went away is queued again, once
+        with ingestion_model.get_db() as db:
+            db.query(IngestionJob).filter_by(id=job.id).update(
+                {IngestionJob.updated_at: int(time.time()) - 60}
+            )
+            db.commit()
+        queue.requeue(queued_before)
+        queue.requeue(queued_before)
+        assert queued == [job.id, job.id]
+
+        job = IngestionJobs.get_job_by_id(job.id)
+        assert job.status == "pending"
+        assert job.attempts == 1
@@ -0,0 +1,144 @@
+import random
+from collections import Counter
+
+import pytest
+
+from open_webui.utils import load_balancer
+from open_webui.utils.load_balancer import LoadBalancer
+
+URLS = ["http://a:11434", "http://b:11434", "http://c:11434"]
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(load_balancer, "time", clock)
+    return clock
+
+
+def select_many(balancer, urls, n=300, **kwargs):
+    random.seed(0)
+    return Counter(balancer.select(urls, **kwargs) for _ in range(n))
+
+
+def test_single_url():
+    balancer = LoadBalancer(strategy="least_in_flight")
+    assert balancer.select(URLS[:1]) == URLS[0]
+
+
+def test_unknown_strategy():
+    assert LoadBalancer(strategy="unknown").strategy == "least_in_flight"
+
+
+def test_random():
+    counts = select_many(LoadBalancer(strategy="random"), URLS)
+    assert set(counts) == set(URLS)
+
+
+def test_least_in_flight(clock):
+    balancer = LoadBalancer(strategy="least_in_flight")
+    balancer.acquire(URLS[0])
+    balancer.acquire(URLS[0])
+    balancer.acquire(URLS[1])
+    assert balancer.select(URLS) == URLS[2]
+
+    # In-flight requests are weighted
+    balancer.acquire(URLS[2])
+    assert balancer.select(URLS, weights=[1, 1, 4]) == URLS[2]
+
+    balancer.release(URLS[0])
+    balancer.release(URLS[0])
+    assert balancer.select(URLS) == URLS[0]
+
+
+def test_ewma(clock):
+    balancer = LoadBalancer(strategy="ewma", alpha=0.5)
+    for url, latency in [(URLS[0], 2.0), (URLS[1], 1.0)]:
+        started = balancer.acquire(url)
+        clock.now += latency
+        balancer.record_latency(url, started)
+        balancer.release(url)
+
+    # Backends without samples are tried first
+    assert balancer.select(URLS) == URLS[2]
+    assert balancer.select(URLS[:2]) == URLS[1]
+
+    # The average moves towards the recent latencies
+    started = balancer.acquire(URLS[1])
+    clock.now += 5.0
+    balancer.record_latency(URLS[1], started)
+    balancer.release(URLS[1])
+    assert balancer.backends[URLS[1]].ewma_latency == 3.0
+    assert balancer.select(URLS[:2]) == URLS[0]
+
+    # And so does the load
+    balancer.acquire(URLS[0])
+    balancer.acquire(URLS[0])
+    assert balancer.select(URLS[:2]) == URLS[1]
+
+
+def test_weighted():
+    balancer = LoadBalancer(strategy="weighted")
+    counts = select_many(balancer, URLS, n=1000, weights=[1, 3, 0])
+    assert URLS[2] not in counts
+    assert 0.65 < counts[URLS[1]] / 1000 < 0.85
+
+
+def test_consistent_hash(clock):
+    balancer = LoadBalancer(strategy="consistent_hash", max_failures=1, cooldown=30)
+    url = balancer.select(URLS, key="chat")
+    assert all(balancer.select(URLS, key="chat") == url for _ in range(10))
+
+    # Keys are spread over the backends
+    assert len({balancer.select(URLS, key=f"chat-{i}") for i in range(30)}) == 3
+
+    # A key only moves when its backend goes away
+    other = next(other for other in URLS if other != url)
+    assert balancer.select([u for u in URLS if u != other], key="chat") == url
+
+    balancer.release(url, error="Connection refused")
+    moved = balancer.select(URLS, key="chat")
+    assert moved != url
+
+    clock.now += 31
+    assert balancer.select(URLS, key="chat") == url
+
+
+def test_unhealthy_backend_is_skipped_until_cooldown(clock):
+    balancer = LoadBalancer(strategy="least_in_flight", max_failures=2, cooldown=30)
+    balancer.acquire(URLS[1])
+
+    balancer.release(URLS[0], error="Connection refused")
+    assert balancer.backends[URLS[0]].is_healthy(clock.now)
+    # A success resets the consecutive failures
+    balancer.release(URLS[0])
+    balancer.release(URLS[0], error="Connection refused")
+    assert balancer.backends[URLS[0]].is_healthy(clock.now)
+
+    balancer.release(URLS[0], error="Connection refused")
+    assert not balancer.backends[URLS[0]].is_healthy(clock.now)
+    assert balancer.select(URLS[:2]) == URLS[1]
+    assert balancer.get_stats()["backends"][URLS[0]]["last_error"] == (
+        "Connection refused"
+    )
+
+    clock.now += 31
+    assert balancer.backends[URLS[0]].is_healthy(clock.now)
+    assert balancer.select(URLS[:2]) == URLS[0]
+
+
+def test_all_unhealthy_backends_are_still_used(clock):
+    balancer = LoadBalancer(strategy="least_in_flight", max_failures=1, cooldown=30)
+    for url in URLS[:2]:
+        balancer.release(url, error="Connection refused")
+    balancer.acquire(URLS[0])
+
+    assert balancer.select(URLS[:2]) == URLS[1]
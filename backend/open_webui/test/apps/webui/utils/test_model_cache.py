@@ -0,0 +1,174 @@
+import asyncio
+import fnmatch
+
+from open_webui.utils import model_cache
+from open_webui.utils.model_cache import ModelListCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("Redis is down")
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("Redis is down")
+        self.values[key] = value
+
+    def scan_iter(self, pattern):
+        return [key for key in self.values if fnmatch.fnmatch(key, pattern)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class Upstream:
+    """Model list fetcher returning each of `results` in turn, once released."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.released = asyncio.Event()
+        self.released.set()
+
+    async def fetch(self):
+        self.calls += 1
+        result = self.results[min(self.calls, len(self.results)) - 1]
+        await self.released.wait()
+        return result
+
+
+def mock_clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(model_cache.time, "time", lambda: clock[0])
+    return clock
+
+
+def test_fresh_list_is_served_from_cache(monkeypatch):
+    mock_clock(monkeypatch)
+    cache = ModelListCache(ttl=10, max_stale=60, redis_url="")
+    upstream = Upstream({"data": ["a"]})
+
+    async def main():
+        assert await cache.get("key", upstream.fetch) == {"data": ["a"]}
+        result = await cache.get("key", upstream.fetch)
+        # Callers get a copy of the cached list
+        result["data"].append("b")
+        assert await cache.get("key", upstream.fetch) == {"data": ["a"]}
+
+    asyncio.run(main())
+    assert upstream.calls == 1
+
+
+def test_stale_list_is_served_while_refreshing(monkeypatch):
+    clock = mock_clock(monkeypatch)
+    cache = ModelListCache(ttl=10, max_stale=60, redis_url="")
+    upstream = Upstream({"data": ["a"]}, {"data": ["b"]})
+
+    async def main():
+        await cache.get("key", upstream.fetch)
+        clock[0] += 20
+        upstream.released.clear()
+
+        # Stale lists are served right away, with a single refresh for all callers
+        assert await cache.get("key", upstream.fetch) == {"data": ["a"]}
+        assert await cache.get("key", upstream.fetch) == {"data": ["a"]}
+        await asyncio.sleep(0)
+        assert upstream.calls == 2
+
+        upstream.released.set()
+        await cache.tasks["key"]
+        assert await cache.get("key", upstream.fetch) == {"data": ["b"]}
+
+    asyncio.run(main())
+    assert upstream.calls == 2
+
+
+def test_expired_list_is_fetched_again(monkeypatch):
+    clock = mock_clock(monkeypatch)
+    cache = ModelListCache(ttl=10, max_stale=60, redis_url="")
+    upstream = Upstream({"data": ["a"]}, {"data": ["b"]})
+
+    async def main():
+        await cache.get("key", upstream.fetch)
+        clock[0] += 100
+        return await cache.get("key", upstream.fetch)
+
+    assert asyncio.run(main()) == {"data": ["b"]}
+
+
+def test_failed_refresh_keeps_last_good_list(monkeypatch):
+    clock = mock_clock(monkeypatch)
+    cache = ModelListCache(ttl=10, max_stale=60, redis_url="")
+    upstream = Upstream({"data": ["a"]}, None, {"error": "Connection refused"})
+
+    async def main():
+        await cache.get("key", upstream.fetch)
+        for _ in range(2):
+            clock[0] += 100
+            assert await cache.get("key", upstream.fetch) == {"data": ["a"]}
+
+        # Without a good list, the error is returned and not cached
+        assert await cache.get("other", upstream.fetch) == {
+            "error": "Connection refused"
+        }
+        assert "other" not in cache.entries
+
+    asyncio.run(main())
+
+
+def test_invalidate_drops_refresh_in_flight(monkeypatch):
+    clock = mock_clock(monkeypatch)
+    cache = ModelListCache(ttl=10, max_stale=60, redis_url="")
+    upstream = Upstream({"data": ["a"]}, {"data": ["a"]}, {"data": ["b"]})
+
+    async def main():
+        await cache.get("key", upstream.fetch)
+        clock[0] += 20
+        upstream.released.clear()
+        await cache.get("key", upstream.fetch)
+        refresh = cache.tasks["key"]
+
+        # e.g. a model was pulled while the list was being refreshed
+        await cache.invalidate()
+        upstream.released.set()
+        assert await cache.get("key", upstream.fetch) == {"data": ["b"]}
+
+        # The refresh started before the change doesn't overwrite the new list
+        await refresh
+        assert await cache.get("key", upstream.fetch) == {"data": ["b"]}
+        assert cache.tasks == {}
+
+    asyncio.run(main())
+    assert upstream.calls == 3
+
+
+def test_redis_is_shared(monkeypatch):
+    mock_clock(monkeypatch)
+    redis = FakeRedis()
+    monkeypatch.setattr(model_cache, "get_redis_connection", lambda *args: redis)
+    first = ModelListCache(ttl=10, max_stale=60, redis_url="redis://")
+    second = ModelListCache(ttl=10, max_stale=60, redis_url="redis://")
+    upstream = Upstream({"data": ["a"]}, {"data": ["b"]})
+
+    async def main():
+        assert await first.get("key", upstream.fetch) == {"data": ["a"]}
+        assert await second.get("key", upstream.fetch) == {"data": ["a"]}
+        assert upstream.calls == 1
+
+        await second.invalidate()
+        assert redis.values == {}
+        assert await first.get("key", upstream.fetch) == {"data": ["b"]}
+
+        # The local copy is used while Redis is unavailable
+        redis.fail = True
+        assert await first.get("key", upstream.fetch) == {"data": ["b"]}
+        assert upstream.calls == 2
+
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+from open_webui.utils import plugin
+from open_webui.utils.plugin import compile_module_content, exec_module_content
+
+
+def mock_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(plugin, "CACHE_DIR", tmp_path)
+    compile_module_content.cache_clear()
+    return tmp_path / "modules" / "function_test"
+
+
+def test_compile_stores_source_and_bytecode(monkeypatch, tmp_path):
+    module_dir = mock_cache_dir(monkeypatch, tmp_path)
+    content = "value = 42\n"
+
+    code = compile_module_content("function_test", content)
+
+    content_hash = plugin.get_content_hash(content)
+    assert code.co_filename == str(module_dir / f"{content_hash}.py")
+    assert (module_dir / f"{content_hash}.py").read_text() == content
+    assert {path.name for path in module_dir.iterdir()} == {
+        f"{content_hash}.py",
+        f"{content_hash}.{sys.implementation.cache_tag}.pyc",
+    }
+
+
+def test_bytecode_is_reused(monkeypatch, tmp_path):
+    mock_cache_dir(monkeypatch, tmp_path)
+    compile_module_content("function_test", "value = 42\n")
+    compile_module_content.cache_clear()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The content was compiled again")
+
+    monkeypatch.setattr(plugin, "compile", fail, raising=False)
+    module = exec_module_content("function_test", "value = 42\n")
+    assert module.value == 42
+    assert module.__file__.endswith(".py")
+    del sys.modules["function_test"]
+
+
+def test_invalid_bytecode_is_ignored(monkeypatch, tmp_path):
+    module_dir = mock_cache_dir(monkeypatch, tmp_path)
+    content = "value = 42\n"
+    compile_module_content("function_test", content)
+    compile_module_content.cache_clear()
+
+    content_hash = plugin.get_content_hash(content)
+    bytecode_path = module_dir / f"{content_hash}.{sys.implementation.cache_tag}.pyc"
+    bytecode_path.write_bytes(b"invalid")
+
+    code = compile_module_content("function_test", content)
+    namespace = {}
+    exec(code, namespace)
+    assert namespace["value"] == 42
+
+
+def test_only_expired_files_of_other_versions_are_removed(monkeypatch, tmp_path):
+    module_dir = mock_cache_dir(monkeypatch, tmp_path)
+    compile_module_content("function_test", "value = 1\n")
+    compile_module_content("function_test", "value = 2\n")
+
+    # Both versions may be in use by different workers
+    old_hash = plugin.get_content_hash("value = 1\n")
+    new_hash = plugin.get_content_hash("value = 2\n")
+    assert (module_dir / f"{old_hash}.py").exists()
+
+    expired_at = time.time() - plugin.MODULE_CACHE_MAX_AGE - 60
+    for path in module_dir.iterdir():
+        if path.name.startswith(old_hash):
+            os.utime(path, (expired_at, expired_at))
+
+    compile_module_content("function_test", "value = 3\n")
+    names = [path.name for path in module_dir.iterdir()]
+    assert not any(name.startswith(old_hash) for name in names)
+    assert any(name.startswith(new_hash) for name in names)
@@ -0,0 +1,201 @@
+import asyncio
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from starlette.responses import Response
+
+from open_webui.internal.db import Base
+from open_webui.models import users
+from open_webui.models.users import Users
+from open_webui.routers import auths
+from open_webui.utils import auth, principal_cache
+from open_webui.utils.principal_cache import PrincipalCache
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    def execute(self):
+        for name, args, kwargs in self.commands:
+            getattr(self.redis, name)(*args, **kwargs)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def sadd(self, key, *members):
+        self.values.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        return self.values.get(key, set())
+
+    def expire(self, key, ttl):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+@pytest.fixture(autouse=True)
+def db(monkeypatch, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/webui.db")
+    Base.metadata.create_all(engine, tables=[users.User.__table__])
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine, expire_on_commit=False
+    )
+
+    @contextmanager
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(users, "get_db", get_db)
+    monkeypatch.setattr(users, "is_async_db_enabled", lambda: False)
+    # The groups and chats of a deleted user are out of scope here
+    monkeypatch.setattr(
+        users, "Groups", SimpleNamespace(remove_user_from_all_groups=lambda id: True)
+    )
+    monkeypatch.setattr(
+        users, "Chats", SimpleNamespace(delete_chats_by_user_id=lambda id: True)
+    )
+    monkeypatch.setattr(
+        auth, "ACTIVITY_TRACKER", SimpleNamespace(touch=lambda user_id: None)
+    )
+    yield
+    engine.dispose()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(
+        principal_cache, "get_redis_connection", lambda *args, **kwargs: redis
+    )
+    cache = PrincipalCache(
+        ttl=60,
+        max_size=100,
+        redis_url="redis://" if request.param == "redis" else "",
+    )
+    assert (cache.redis is redis) == (request.param == "redis")
+
+    for module in [users, auth, auths]:
+        monkeypatch.setattr(module, "PRINCIPAL_CACHE", cache)
+    return cache
+
+
+def insert_user(id="1"):
+    Users.insert_new_user(id, "User", f"{id}@example.com", role="user")
+    Users.update_user_api_key_by_id(id, f"sk-{id}")
+    Users.update_user_oauth_sub_by_id(id, f"oidc@{id}")
+
+
+def test_cached_principal_has_no_secrets(cache):
+    insert_user()
+
+    user = auth.get_user_by_token("token", "1")
+    assert user.api_key == "sk-1"
+    cached = cache.get("token")
+    assert cached["id"] == "1"
+    assert "api_key" not in cached and "oauth_sub" not in cached
+
+    auth.get_current_user_by_api_key("sk-1")
+    assert "api_key" not in cache.get("sk-1")
+    if cache.redis is not None:
+        assert not any(
+            "sk-1" in value or "oidc@1" in value
+            for value in cache.redis.values.values()
+            if isinstance(value, str)
+        )
+
+
+def test_role_change_drops_cached_principal(cache):
+    insert_user()
+    assert auth.get_user_by_token("token", "1").role == "user"
+    assert auth.get_current_user_by_api_key("sk-1").role == "user"
+
+    Users.update_user_role_by_id("1", "admin")
+    assert cache.get("token") is None
+    assert cache.get("sk-1") is None
+    assert auth.get_user_by_token("token", "1").role == "admin"
+
+
+def test_deletion_drops_cached_principal(cache):
+    insert_user()
+    insert_user("2")
+    auth.get_user_by_token("token", "1")
+    auth.get_user_by_token("other", "2")
+
+    assert Users.delete_user_by_id("1")
+    assert cache.get("token") is None
+    assert auth.get_user_by_token("token", "1") is None
+    # Other users are kept
+    assert cache.get("other")["id"] == "2"
+
+
+def test_api_key_rotation_drops_cached_principal(cache):
+    insert_user()
+    assert auth.get_current_user_by_api_key("sk-1").id == "1"
+
+    Users.update_user_api_key_by_id("1", "sk-new")
+    with pytest.raises(HTTPException) as e:
+        auth.get_current_user_by_api_key("sk-1")
+    assert e.value.status_code == 401
+    assert auth.get_current_user_by_api_key("sk-new").id == "1"
+
+
+def test_signout_drops_cached_token(cache, monkeypatch):
+    monkeypatch.setattr(auths, "ENABLE_OAUTH_SIGNUP", SimpleNamespace(value=False))
+    insert_user()
+    auth.get_user_by_token("token", "1")
+    auth.get_user_by_token("other", "1")
+
+    request = Request(
+        {"type": "http", "headers": [(b"cookie", b"token=token")], "query_string": b""}
+    )
+    assert asyncio.run(auths.signout(request, Response())) == {"status": True}
+    assert cache.get("token") is None
+    # Other sessions of the user stay signed in
+    assert cache.get("other")["id"] == "1"
+
+
+def test_async_lookup_uses_cache(cache, monkeypatch):
+    insert_user()
+
+    async def main():
+        assert (await auth.get_user_by_token_async("token", "1")).role == "user"
+        assert (await cache.get_async("token"))["id"] == "1"
+
+        Users.update_user_role_by_id("1", "admin")
+        assert await cache.get_async("token") is None
+        return await auth.get_user_by_token_async("token", "1")
+
+    assert asyncio.run(main()).role == "admin"
+
+    # Served from the cache, not the database
+    monkeypatch.setattr(users, "get_db", None)
+    user = asyncio.run(auth.get_user_by_token_async("token", "1"))
+    assert user.role == "admin" and user.api_key is None
@@ -0,0 +1,33 @@
+import asyncio
+
+import aiohttp
+
+from open_webui.utils.session_pool import ClientSessionPool
+
+
+def test_sessions_are_shared_per_upstream():
+    pool = ClientSessionPool()
+
+    async def run():
+        session = pool.get_session("https://api.example.com/v1/models")
+        assert pool.get_session("https://api.example.com/v1/chat") is session
+        assert pool.get_session("https://other.example.com/v1") is not session
+        assert pool.get_session("http://api.example.com/v1") is not session
+
+        await pool.close()
+        assert session.closed
+        assert pool.get_session("https://api.example.com/v1") is not session
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_sessions_do_not_keep_cookies():
+    pool = ClientSessionPool()
+
+    async def run():
+        session = pool.get_session("https://api.example.com")
+        assert isinstance(session.cookie_jar, aiohttp.DummyCookieJar)
+        await pool.close()
+
+    asyncio.run(run())
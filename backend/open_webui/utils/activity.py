@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from open_webui.internal.db import run_in_db_executor
+from open_webui.models.users import Users
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+    USER_LAST_ACTIVE_PRECISION,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ActivityTracker:
+    """
+    Write-behind tracker of the users' last active timestamps.
+
+    Activity is recorded at most once per user and `precision` seconds, kept in memory,
+    or in a Redis hash shared by all instances, and written every `precision` seconds
+    with a single bulk UPDATE.
+    """
+
+    def __init__(
+        self,
+        precision: int = USER_LAST_ACTIVE_PRECISION,
+        redis_url: str = REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.precision = precision
+        self.pending: dict[str, int] = {}
+        self.recorded: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+            except Exception as e:
+                log.exception(f"Error connecting to activity tracker Redis: {e}")
+
+    def touch(self, user_id: str):
+        now = int(time.time())
+        window = now - now % self.precision
+
+        with self.lock:
+            if self.recorded.get(user_id, -1) >= window:
+                return
+            self.recorded[user_id] = window
+
+            if self.redis is None:
+                self.pending[user_id] = now
+                return
+
+        try:
+            self.redis.hset("open-webui:last_active", user_id, now)
+        except Exception as e:
+            log.error(f"Error recording activity in Redis: {e}")
+            with self.lock:
+                self.pending[user_id] = now
+
+    def _take_pending(self) -> dict[str, int]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+            # Forget the users that were not active in the current window
+            window = int(time.time()) - self.precision
+            self.recorded = {
+                user_id: recorded
+                for user_id, recorded in self.recorded.items()
+                if recorded >= window
+            }
+
+        if self.redis is not None:
+            # Read and clear the hash in one transaction, so each entry is written by
+            # one instance only
+            try:
+                pipeline = self.redis.pipeline(transaction=True)
+                pipeline.hgetall("open-webui:last_active")
+                pipeline.delete("open-webui:last_active")
+                entries, _ = pipeline.execute()
+
+                for user_id, timestamp in entries.items():
+                    pending[user_id] = max(int(timestamp), pending.get(user_id, 0))
+            except Exception as e:
+                log.error(f"Error reading activity from Redis: {e}")
+
+        return pending
+
+    def flush(self):
+        pending = self._take_pending()
+        if pending and not Users.update_users_last_active(pending):
+            log.error(f"Error writing last active timestamps of {len(pending)} users")
+            with self.lock:
+                for user_id, timestamp in pending.items():
+                    self.pending[user_id] = max(timestamp, self.pending.get(user_id, 0))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.precision)
+            try:
+                await run_in_db_executor(self.flush)
+            except Exception as e:
+                log.exception(f"Error flushing user activity: {e}")
+
+
+ACTIVITY_TRACKER = ActivityTracker(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
@@ -11,7 +11,9 @@ import os
 from datetime import UTC, datetime, timedelta
 from typing import Optional, Union, List, Dict
 
-from open_webui.models.users import Users
+from open_webui.models.users import Users, UserModel
+from open_webui.utils.activity import ACTIVITY_TRACKER
+from open_webui.utils.principal_cache import PRINCIPAL_CACHE
 
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import (
@@ -149,6 +151,29 @@ def get_http_authorization_cred(auth_header: str):
         raise ValueError(ERROR_MESSAGES.INVALID_TOKEN)
 
 
+def get_user_by_token(token: str, user_id: str) -> Optional[UserModel]:
+    """Resolve the user of a verified JWT, from the principal cache when possible."""
+    user = PRINCIPAL_CACHE.get(token)
+    if user is not None and user["id"] == user_id:
+        return UserModel.model_validate(user)
+
+    user = Users.get_user_by_id(user_id)
+    if user is not None:
+        PRINCIPAL_CACHE.set(token, user.model_dump())
+    return user
+
+
+async def get_user_by_token_async(token: str, user_id: str) -> Optional[UserModel]:
+    user = await PRINCIPAL_CACHE.get_async(token)
+    if user is not None and user["id"] == user_id:
+        return UserModel.model_validate(user)
+
+    user = await Users.get_user_by_id_async(user_id)
+    if user is not None:
+        await PRINCIPAL_CACHE.set_async(token, user.model_dump())
+    return user
+
+
 def get_current_user(
     request: Request,
     background_tasks: BackgroundTasks,
@@ -197,17 +222,15 @@ def get_current_user(
         )
 
     if data is not None and "id" in data:
-        user = Users.get_user_by_id(data["id"])
+        user = get_user_by_token(token, data["id"])
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=ERROR_MESSAGES.INVALID_TOKEN,
             )
         else:
-            # Refresh the user's last active timestamp asynchronously
-            # to prevent blocking the request
-            if background_tasks:
-                background_tasks.add_task(Users.update_user_last_active_by_id, user.id)
+            # Refresh the user's last active timestamp with the next batched write
+            ACTIVITY_TRACKER.touch(user.id)
         return user
     else:
         raise HTTPException(
@@ -217,7 +240,13 @@ def get_current_user(
 
 
 def get_current_user_by_api_key(api_key: str):
-    user = Users.get_user_by_api_key(api_key)
+    user = PRINCIPAL_CACHE.get(api_key)
+    if user is not None:
+        user = UserModel.model_validate(user)
+    else:
+        user = Users.get_user_by_api_key(api_key)
+        if user is not None:
+            PRINCIPAL_CACHE.set(api_key, user.model_dump())
 
     if user is None:
         raise HTTPException(
@@ -225,7 +254,7 @@ def get_current_user_by_api_key(api_key: str):
             detail=ERROR_MESSAGES.INVALID_TOKEN,
         )
     else:
-        Users.update_user_last_active_by_id(user.id)
+        ACTIVITY_TRACKER.touch(user.id)
 
     return user
 
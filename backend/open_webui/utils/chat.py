@@ -40,7 +40,8 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.function_executor import FUNCTION_EXECUTOR
 from open_webui.utils.models import get_all_models, check_model_access
 from open_webui.utils.payload import convert_payload_openai_to_ollama
 from open_webui.utils.response import (
@@ -389,11 +390,7 @@ async def chat_action(request: Request, action_id: str, form_data: dict, user: A
         }
     )
 
-    if action_id in request.app.state.FUNCTIONS:
-        function_module = request.app.state.FUNCTIONS[action_id]
-    else:
-        function_module, _, _ = load_function_module_by_id(action_id)
-        request.app.state.FUNCTIONS[action_id] = function_module
+    function_module = FUNCTION_REGISTRY.get(action_id)
 
     if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
         valves = Functions.get_function_valves_by_id(action_id)
@@ -441,10 +438,7 @@ async def chat_action(request: Request, action_id: str, form_data: dict, user: A
 
                 params = {**params, "__user__": __user__}
 
-            if inspect.iscoroutinefunction(action):
-                data = await action(**params)
-            else:
-                data = action(**params)
+            data = await FUNCTION_EXECUTOR.run(action_id, action, **params)
 
         except Exception as e:
             return Exception(f"Error: {e}")
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from open_webui.internal.db import run_in_db_executor
+from open_webui.models.chats import Chats
+from open_webui.env import (
+    SRC_LOG_LEVELS,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_MAX_BYTES,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class MessageWriteBuffer:
+    """
+    Coalesces realtime saves of a single streamed message.
+
+    Updates are merged in memory and written with a per-message patch once the time
+    window or the byte window is exceeded, and on `flush()` at the end of the stream.
+    """
+
+    def __init__(
+        self,
+        chat_id: str,
+        message_id: str,
+        interval: float = REALTIME_CHAT_SAVE_INTERVAL,
+        max_bytes: int = REALTIME_CHAT_SAVE_MAX_BYTES,
+    ):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.interval = interval
+        self.max_bytes = max_bytes
+
+        self.pending: dict = {}
+        self.saved_sizes: dict[str, int] = {}
+        self.last_flush_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _pending_bytes(self) -> int:
+        return sum(
+            abs(len(value) - self.saved_sizes.get(key, 0))
+            for key, value in self.pending.items()
+            if isinstance(value, str)
+        )
+
+    async def write(self, message: dict):
+        self.pending.update(message)
+
+        if (
+            time.monotonic() - self.last_flush_at >= self.interval
+            or self._pending_bytes() >= self.max_bytes
+        ):
+            await self.flush()
+
+    async def flush(self, message: Optional[dict] = None):
+        if message:
+            self.pending.update(message)
+
+        async with self.lock:
+            if not self.pending:
+                return
+
+            pending, self.pending = self.pending, {}
+            self.last_flush_at = time.monotonic()
+
+            try:
+                await run_in_db_executor(
+                    Chats.patch_message_by_id_and_message_id,
+                    self.chat_id,
+                    self.message_id,
+                    pending,
+                )
+            except Exception as e:
+                log.exception(f"Error saving message {self.message_id}: {e}")
+                # Keep the newer values if more were written while saving
+                self.pending = {**pending, **self.pending}
+                return
+
+            for key, value in pending.items():
+                if isinstance(value, str):
+                    self.saved_sizes[key] = len(value)
@@ -1,7 +1,10 @@
 import inspect
 import logging
+from typing import Callable
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.internal.db import run_in_db_executor
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
+from open_webui.utils.function_executor import FUNCTION_EXECUTOR
 from open_webui.models.functions import Functions
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -32,22 +35,51 @@ def get_sorted_filter_ids(model: dict):
     return filter_ids
 
 
-async def process_filter_functions(
-    request, filter_functions, filter_type, form_data, extra_params
-):
-    skip_files = None
+class FilterPipeline:
+    """
+    Filter chain of a request resolved once: handlers are bound, valves applied and the
+    handler arguments derived from their signatures up front, so running the pipeline
+    (e.g. once per streamed chunk) does not touch the database again.
+    """
+
+    def __init__(self, filter_type: str):
+        self.filter_type = filter_type
+        self.steps: list[tuple[str, Callable, dict]] = []
+        self.skip_files = None
+
+    async def run(self, form_data):
+        for filter_id, handler, params in self.steps:
+            if self.filter_type == "stream":
+                params = {"event": form_data, **params}
+            else:
+                params = {"body": form_data, **params}
+
+            try:
+                form_data = await FUNCTION_EXECUTOR.run(filter_id, handler, **params)
+            except Exception as e:
+                log.debug(f"Error in {self.filter_type} handler {filter_id}: {e}")
+                raise e
+
+        # Handle file cleanup for inlet
+        if self.skip_files and "files" in form_data.get("metadata", {}):
+            del form_data["files"]
+            del form_data["metadata"]["files"]
+
+        return form_data
+
+
+async def get_filter_pipeline(
+    request, filter_functions, filter_type, extra_params
+) -> FilterPipeline:
+    pipeline = FilterPipeline(filter_type)
 
     for function in filter_functions:
         filter = function
-        filter_id = function.id
         if not filter:
             continue
+        filter_id = function.id
 
-        if filter_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[filter_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(filter_id)
-            request.app.state.FUNCTIONS[filter_id] = function_module
+        function_module = FUNCTION_REGISTRY.get(filter_id)
 
         # Prepare handler function
         handler = getattr(function_module, filter_type, None)
@@ -56,57 +88,53 @@ async def process_filter_functions(
 
         # Check if the function has a file_handler variable
         if filter_type == "inlet" and hasattr(function_module, "file_handler"):
-            skip_files = function_module.file_handler
+            pipeline.skip_files = function_module.file_handler
 
         # Apply valves to the function
         if hasattr(function_module, "valves") and hasattr(function_module, "Valves"):
-            valves = Functions.get_function_valves_by_id(filter_id)
+            valves = await Functions.get_function_valves_by_id_async(filter_id)
             function_module.valves = function_module.Valves(
                 **(valves if valves else {})
             )
 
-        try:
-            # Prepare parameters
-            sig = inspect.signature(handler)
-
-            params = {"body": form_data}
-            if filter_type == "stream":
-                params = {"event": form_data}
-
-            params = params | {
-                k: v
-                for k, v in {
-                    **extra_params,
-                    "__id__": filter_id,
-                }.items()
-                if k in sig.parameters
-            }
-
-            # Handle user parameters
-            if "__user__" in sig.parameters:
-                if hasattr(function_module, "UserValves"):
-                    try:
-                        params["__user__"]["valves"] = function_module.UserValves(
-                            **Functions.get_user_valves_by_id_and_user_id(
-                                filter_id, params["__user__"]["id"]
+        # Prepare parameters
+        sig = inspect.signature(handler)
+
+        params = {
+            k: v
+            for k, v in {
+                **extra_params,
+                "__id__": filter_id,
+            }.items()
+            if k in sig.parameters
+        }
+
+        # Handle user parameters
+        if "__user__" in sig.parameters:
+            if hasattr(function_module, "UserValves"):
+                try:
+                    params["__user__"] = {
+                        **params["__user__"],
+                        "valves": function_module.UserValves(
+                            **await run_in_db_executor(
+                                Functions.get_user_valves_by_id_and_user_id,
+                                filter_id,
+                                params["__user__"]["id"],
                             )
-                        )
-                    except Exception as e:
-                        log.exception(f"Failed to get user values: {e}")
+                        ),
+                    }
+                except Exception as e:
+                    log.exception(f"Failed to get user values: {e}")
 
-            # Execute handler
-            if inspect.iscoroutinefunction(handler):
-                form_data = await handler(**params)
-            else:
-                form_data = handler(**params)
+        pipeline.steps.append((filter_id, handler, params))
 
-        except Exception as e:
-            log.debug(f"Error in {filter_type} handler {filter_id}: {e}")
-            raise e
+    return pipeline
 
-    # Handle file cleanup for inlet
-    if skip_files and "files" in form_data.get("metadata", {}):
-        del form_data["files"]
-        del form_data["metadata"]["files"]
 
-    return form_data, {}
+async def process_filter_functions(
+    request, filter_functions, filter_type, form_data, extra_params
+):
+    pipeline = await get_filter_pipeline(
+        request, filter_functions, filter_type, extra_params
+    )
+    return await pipeline.run(form_data), {}
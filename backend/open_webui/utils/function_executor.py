@@ -0,0 +1,170 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from open_webui.env import (
+    FUNCTION_EXECUTOR_MAX_WORKERS,
+    FUNCTION_MAX_CONCURRENCY,
+    FUNCTION_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class FunctionTimeoutError(Exception):
+    pass
+
+
+class FunctionStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def model_dump(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "avg_time": self.total_time / self.calls if self.calls else 0.0,
+            "max_time": self.max_time,
+        }
+
+
+class FunctionExecutor:
+    """
+    Runs the handlers of user-supplied functions and tools: pipes, filters, actions and
+    tool methods.
+
+    Synchronous handlers run in a bounded thread pool instead of on the event loop.
+    Every function gets at most `max_concurrency` calls at once and each synchronous
+    call at most `timeout` seconds, so a slow or stuck function only delays its own
+    requests. A thread that outlives its timeout keeps its slot until it returns.
+    Async handlers run on the event loop without a timeout, as they did before.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = FUNCTION_EXECUTOR_MAX_WORKERS,
+        max_concurrency: int = FUNCTION_MAX_CONCURRENCY,
+        timeout: Optional[float] = FUNCTION_TIMEOUT,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="function"
+        )
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+        self.stats: dict[str, FunctionStats] = {}
+
+    def _get_semaphore(self, function_id: str) -> asyncio.Semaphore:
+        if function_id not in self.semaphores:
+            self.semaphores[function_id] = asyncio.Semaphore(self.max_concurrency)
+        return self.semaphores[function_id]
+
+    def _get_stats(self, function_id: str) -> FunctionStats:
+        if function_id not in self.stats:
+            self.stats[function_id] = FunctionStats()
+        return self.stats[function_id]
+
+    async def _call(self, function_id: str, handler: Callable, args, kwargs) -> Any:
+        semaphore = self._get_semaphore(function_id)
+
+        if inspect.iscoroutinefunction(handler):
+            async with semaphore:
+                return await handler(*args, **kwargs)
+
+        try:
+            result = await asyncio.wait_for(
+                self._call_in_thread(semaphore, handler, args, kwargs), self.timeout
+            )
+        except asyncio.TimeoutError:
+            self._get_stats(function_id).timeouts += 1
+            log.warning(f"Function {function_id} timed out after {self.timeout}s")
+            raise FunctionTimeoutError(f"Function {function_id} timed out")
+
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _call_in_thread(
+        self, semaphore: asyncio.Semaphore, handler: Callable, args, kwargs
+    ) -> Any:
+        await semaphore.acquire()
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.executor.submit(
+                contextvars.copy_context().run,
+                functools.partial(handler, *args, **kwargs),
+            )
+        except Exception:
+            semaphore.release()
+            raise
+
+        def release(_):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # The event loop was closed while the thread was running
+
+        future.add_done_callback(release)
+
+        return await asyncio.wrap_future(future)
+
+    async def run(self, function_id: str, handler: Callable, *args, **kwargs) -> Any:
+        """Call `handler` of the function `function_id` under its limits."""
+        stats = self._get_stats(function_id)
+        stats.calls += 1
+        stats.in_flight += 1
+        started = time.monotonic()
+
+        try:
+            return await self._call(function_id, handler, args, kwargs)
+        except FunctionTimeoutError:
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            stats.in_flight -= 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+
+    async def iterate(self, function_id: str, iterator: Iterator) -> AsyncIterator:
+        """Consume a synchronous iterator returned by a function, e.g. a streamed pipe."""
+        stats = self._get_stats(function_id)
+        done = object()
+
+        while True:
+            try:
+                item = await self._call(function_id, next, (iterator, done), {})
+            except FunctionTimeoutError:
+                raise
+            except Exception:
+                stats.errors += 1
+                raise
+
+            if item is done:
+                return
+            yield item
+
+    def get_stats(self) -> dict:
+        return {
+            function_id: stats.model_dump() for function_id, stats in self.stats.items()
+        }
+
+
+FUNCTION_EXECUTOR = FunctionExecutor()
@@ -0,0 +1,153 @@
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from open_webui.models.functions import Functions
+from open_webui.env import (
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.plugin import (
+    get_content_hash,
+    load_function_module_by_id,
+    replace_imports,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class FunctionModuleEntry:
+    def __init__(self, content_hash: str, module: Any, type: str, frontmatter: dict):
+        self.content_hash = content_hash
+        self.module = module
+        self.type = type
+        self.frontmatter = frontmatter
+        self.stale = False
+
+
+class FunctionRegistry:
+    """
+    Loaded function modules, keyed by function id and the hash of their content.
+
+    Modules are loaded on first use, or at startup with `warm_up`. Changing a function
+    marks its module stale; the next use re-reads the function and only executes the
+    content again if its hash changed. With Redis, changes are announced on the
+    `open-webui:functions` channel so that all workers mark their copy stale.
+    """
+
+    def __init__(
+        self, redis_url: str = REDIS_URL, redis_sentinels: Optional[list] = None
+    ):
+        self.entries: dict[str, FunctionModuleEntry] = {}
+        self.locks: dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+                threading.Thread(target=self._listen, daemon=True).start()
+            except Exception as e:
+                log.exception(f"Error connecting to function registry Redis: {e}")
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe("open-webui:functions")
+
+                # Changes published while not subscribed were missed
+                for entry in list(self.entries.values()):
+                    entry.stale = True
+
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        entry = self.entries.get(message["data"])
+                        if entry is not None:
+                            entry.stale = True
+            except Exception as e:
+                log.error(f"Function registry listener disconnected from Redis: {e}")
+                time.sleep(1)
+
+    def _get_lock(self, function_id: str) -> threading.Lock:
+        with self.lock:
+            if function_id not in self.locks:
+                self.locks[function_id] = threading.Lock()
+            return self.locks[function_id]
+
+    def load(self, function_id: str, content: str) -> tuple[Any, str, dict]:
+        """
+        Load `content` as the module of the function, installing its requirements.
+        Returns the function object, its type and frontmatter.
+        """
+        content_hash = get_content_hash(content)
+        with self._get_lock(function_id):
+            entry = self.entries.get(function_id)
+            if entry is None or entry.content_hash != content_hash:
+                module, type, frontmatter = load_function_module_by_id(
+                    function_id, content=content
+                )
+                entry = FunctionModuleEntry(content_hash, module, type, frontmatter)
+                self.entries[function_id] = entry
+
+            return entry.module, entry.type, entry.frontmatter
+
+    def get(self, function_id: str) -> Any:
+        """Return the function object of `function_id`, loading it if needed."""
+        entry = self.entries.get(function_id)
+        if entry is not None and not entry.stale:
+            return entry.module
+
+        with self._get_lock(function_id):
+            entry = self.entries.get(function_id)
+            if entry is not None and not entry.stale:
+                return entry.module
+
+            function = Functions.get_function_by_id(function_id)
+            if not function:
+                self.entries.pop(function_id, None)
+                raise Exception(f"Function not found: {function_id}")
+
+            content = replace_imports(function.content)
+            content_hash = get_content_hash(content)
+
+            if entry is not None and entry.content_hash == content_hash:
+                entry.stale = False
+                return entry.module
+
+            module, type, frontmatter = load_function_module_by_id(function_id)
+            self.entries[function_id] = FunctionModuleEntry(
+                content_hash, module, type, frontmatter
+            )
+            return module
+
+    def invalidate(self, function_id: str, remove: bool = False):
+        """Mark the module of `function_id` stale on all workers."""
+        if remove:
+            self.entries.pop(function_id, None)
+        elif function_id in self.entries:
+            self.entries[function_id].stale = True
+
+        if self.redis is not None:
+            try:
+                self.redis.publish("open-webui:functions", function_id)
+            except Exception as e:
+                log.error(f"Error publishing function change: {e}")
+
+    def warm_up(self):
+        """Load the modules of all active functions."""
+        for function in Functions.get_functions(active_only=True):
+            try:
+                self.get(function.id)
+            except Exception as e:
+                log.error(f"Error loading function {function.id}: {e}")
+
+
+FUNCTION_REGISTRY = FunctionRegistry(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
@@ -0,0 +1,246 @@
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Callable, Optional
+
+from fastapi import FastAPI, Request
+
+from open_webui.internal.db import run_in_db_executor
+from open_webui.models.ingestion import IngestionJobModel, IngestionJobs
+from open_webui.socket.main import get_session_ids_by_user_id, sio
+from open_webui.env import (
+    INGESTION_JOB_LEASE,
+    INGESTION_JOB_MAX_ATTEMPTS,
+    INGESTION_JOB_RETRY_BACKOFF,
+    INGESTION_QUEUE_POLL_INTERVAL,
+    INGESTION_WORKER_CONCURRENCY,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["RAG"])
+
+INGESTION_PROGRESS: contextvars.ContextVar[Optional[Callable]] = contextvars.ContextVar(
+    "ingestion_progress", default=None
+)
+
+
+def report_progress(status: str, progress: Optional[float] = None):
+    """Report the stage of the ingestion job running in this context, if any."""
+    callback = INGESTION_PROGRESS.get()
+    if callback is not None:
+        try:
+            callback(status, progress)
+        except Exception as e:
+            log.error(f"Error reporting ingestion progress: {e}")
+
+
+class IngestionQueue:
+    """
+    Persistent queue of background ingestion jobs, e.g. processing uploaded files.
+
+    Jobs are stored in the database so that they survive restarts. Their ids are handed
+    out through a Redis list shared by all instances, or an in-process queue without
+    Redis, and every instance runs at most `concurrency` jobs at once. A job is claimed
+    in the database before it runs, so a job queued twice still runs once.
+
+    Failed jobs are retried with exponential backoff, up to `max_attempts` times.
+    Running jobs that stop reporting for `lease` seconds, e.g. because their instance
+    was restarted, are queued again. Status changes are pushed to the sessions of the
+    job's user as `file:status` events.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = INGESTION_WORKER_CONCURRENCY,
+        max_attempts: int = INGESTION_JOB_MAX_ATTEMPTS,
+        retry_backoff: int = INGESTION_JOB_RETRY_BACKOFF,
+        lease: int = INGESTION_JOB_LEASE,
+        poll_interval: int = INGESTION_QUEUE_POLL_INTERVAL,
+        redis_url: str = REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease = lease
+        self.poll_interval = poll_interval
+
+        self.handlers: dict[str, Callable[[Request, IngestionJobModel], None]] = {}
+        self.request: Optional[Request] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.local_queue: Optional[asyncio.Queue] = None
+        self.tasks: list[asyncio.Task] = []
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+            except Exception as e:
+                log.exception(f"Error connecting to ingestion queue Redis: {e}")
+
+    def register(
+        self, type: str, handler: Callable[[Request, IngestionJobModel], None]
+    ):
+        """Run the jobs of `type` with `handler`, called in a worker thread."""
+        self.handlers[type] = handler
+
+    def enqueue(
+        self, type: str, file_id: str, user_id: str, data: Optional[dict] = None
+    ) -> Optional[IngestionJobModel]:
+        job = IngestionJobs.insert_new_job(type, file_id, user_id, data)
+        if job:
+            self._push(job.id)
+        return job
+
+    def _push(self, job_id: str):
+        if self.redis is not None:
+            try:
+                self.redis.lpush("open-webui:ingestion", job_id)
+            except Exception as e:
+                # Queued again by the poller once its lease is over
+                log.error(f"Error queuing ingestion job {job_id}: {e}")
+        elif self.loop is not None:
+            self.loop.call_soon_threadsafe(self.local_queue.put_nowait, job_id)
+
+    async def _pop(self) -> Optional[str]:
+        if self.redis is not None:
+            try:
+                result = await asyncio.to_thread(
+                    self.redis.brpop, "open-webui:ingestion", self.poll_interval
+                )
+                return result[1] if result else None
+            except Exception as e:
+                log.error(f"Error reading the ingestion queue from Redis: {e}")
+                await asyncio.sleep(self.poll_interval)
+                return None
+
+        try:
+            return await asyncio.wait_for(self.local_queue.get(), self.poll_interval)
+        except asyncio.TimeoutError:
+            return None
+
+    def requeue(self, queued_before: int):
+        """Queue the jobs due for a retry, and those whose instance went away."""
+        IngestionJobs.reset_stale_jobs(int(time.time()) - self.lease, self.max_attempts)
+        for job in IngestionJobs.get_jobs_to_queue(queued_before):
+            if IngestionJobs.queue_job(job.id, job.queued_at):
+                self._push(job.id)
+
+    async def _emit(self, job: IngestionJobModel):
+        try:
+            for session_id in get_session_ids_by_user_id(job.user_id):
+                await sio.emit(
+                    "file:status",
+                    {
+                        "job_id": job.id,
+                        "file_id": job.file_id,
+                        "status": job.status,
+                        "progress": job.progress,
+                        "error": job.error,
+                    },
+                    to=session_id,
+                )
+        except Exception as e:
+            log.error(f"Error emitting the status of ingestion job {job.id}: {e}")
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            await run_in_db_executor(IngestionJobs.update_job_by_id, job_id, {})
+
+    async def _run(self, job: IngestionJobModel):
+        loop = asyncio.get_running_loop()
+        await self._emit(job)
+
+        def report(status: str, progress: Optional[float] = None):
+            updated = {"status": status}
+            if progress is not None:
+                updated["progress"] = progress
+
+            updated_job = IngestionJobs.update_job_by_id(job.id, updated)
+            if updated_job:
+                asyncio.run_coroutine_threadsafe(self._emit(updated_job), loop)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        token = INGESTION_PROGRESS.set(report)
+        try:
+            # The thread inherits the context, and with it the progress callback
+            await asyncio.to_thread(self.handlers[job.type], self.request, job)
+            updated = {"status": "done", "progress": 1.0, "error": None}
+        except Exception as e:
+            log.exception(f"Error running ingestion job {job.id}: {e}")
+            if job.attempts < self.max_attempts:
+                backoff = self.retry_backoff * 2 ** (job.attempts - 1)
+                updated = {
+                    "status": "pending",
+                    "error": str(e),
+                    "next_attempt_at": int(time.time()) + backoff,
+                    "queued_at": None,
+                }
+            else:
+                updated = {"status": "failed", "error": str(e)}
+        finally:
+            INGESTION_PROGRESS.reset(token)
+            heartbeat.cancel()
+
+        job = await run_in_db_executor(IngestionJobs.update_job_by_id, job.id, updated)
+        if job:
+            await self._emit(job)
+
+    async def _dispatch(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        while True:
+            await semaphore.acquire()
+            job = None
+            try:
+                job_id = await self._pop()
+                if job_id:
+                    job = await run_in_db_executor(IngestionJobs.claim_job, job_id)
+            except Exception as e:
+                log.exception(f"Error claiming ingestion job: {e}")
+
+            if job is None:
+                semaphore.release()
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            task.add_done_callback(lambda _: semaphore.release())
+
+    async def _poll(self):
+        # Jobs queued before a restart may have been lost with an in-process queue
+        queued_before = int(time.time())
+        while True:
+            try:
+                await run_in_db_executor(self.requeue, queued_before)
+            except Exception as e:
+                log.exception(f"Error queuing ingestion jobs: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+            queued_before = int(time.time()) - self.lease
+
+    def start(self, app: FastAPI):
+        # Handlers reach the app state, e.g. the config, through a request of their own
+        self.request = Request({"type": "http", "app": app, "headers": []})
+        self.loop = asyncio.get_running_loop()
+        self.local_queue = asyncio.Queue()
+        self.tasks = [
+            asyncio.create_task(self._dispatch()),
+            asyncio.create_task(self._poll()),
+        ]
+
+    def stop(self):
+        # Interrupted jobs are queued again once their lease is over
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+
+INGESTION_QUEUE = IngestionQueue(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import random
+import time
+from typing import Optional
+
+from open_webui.config import (
+    OLLAMA_LOAD_BALANCING_STRATEGY,
+    OLLAMA_BACKEND_MAX_FAILURES,
+    OLLAMA_BACKEND_COOLDOWN,
+)
+from open_webui.env import SRC_LOG_LEVELS
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OLLAMA"])
+
+
+class BackendStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ewma_latency: Optional[float] = None
+        self.unhealthy_until = 0.0
+        self.last_error: Optional[str] = None
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def model_dump(self, now: float) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "ewma_latency": self.ewma_latency,
+            "healthy": self.is_healthy(now),
+            "unhealthy_for": max(self.unhealthy_until - now, 0.0),
+            "last_error": self.last_error,
+        }
+
+
+class LoadBalancer:
+    """
+    Picks one of several backend URLs serving the same model.
+
+    Every request is tracked with `acquire()` and `release()`, which feed the in-flight
+    counts, the EWMA of the time to first byte and the health of each backend. Backends
+    failing `max_failures` times in a row are skipped for `cooldown` seconds, unless no
+    healthy backend is left. Stats are kept per process.
+    """
+
+    STRATEGIES = ["random", "least_in_flight", "ewma", "weighted", "consistent_hash"]
+
+    def __init__(
+        self,
+        strategy: str = OLLAMA_LOAD_BALANCING_STRATEGY,
+        max_failures: int = OLLAMA_BACKEND_MAX_FAILURES,
+        cooldown: float = OLLAMA_BACKEND_COOLDOWN,
+        alpha: float = 0.3,
+    ):
+        if strategy not in self.STRATEGIES:
+            log.warning(
+                f"Unknown load balancing strategy {strategy}, using least_in_flight"
+            )
+            strategy = "least_in_flight"
+
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.backends: dict[str, BackendStats] = {}
+
+    def _get_stats(self, url: str) -> BackendStats:
+        if url not in self.backends:
+            self.backends[url] = BackendStats()
+        return self.backends[url]
+
+    def _hash(self, value: str) -> int:
+        return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+    def select(
+        self,
+        urls: list[str],
+        weights: Optional[list[float]] = None,
+        key: Optional[str] = None,
+    ) -> str:
+        if len(urls) == 1:
+            return urls[0]
+
+        weights = weights or [1.0] * len(urls)
+        now = time.monotonic()
+
+        candidates = [
+            (url, weight)
+            for url, weight in zip(urls, weights)
+            if self._get_stats(url).is_healthy(now) and weight > 0
+        ]
+        if not candidates:
+            candidates = list(zip(urls, weights))
+
+        if self.strategy == "random":
+            return random.choice(candidates)[0]
+
+        if self.strategy == "weighted":
+            weights = [max(weight, 0.0) for _, weight in candidates]
+            return random.choices(
+                [url for url, _ in candidates],
+                weights=weights if sum(weights) > 0 else None,
+            )[0]
+
+        if self.strategy == "consistent_hash" and key:
+            # Rendezvous hashing keeps a key on the same backend while it stays healthy
+            return max(
+                candidates,
+                key=lambda candidate: (
+                    self._hash(f"{key}:{candidate[0]}") * max(candidate[1], 0.0)
+                ),
+            )[0]
+
+        if self.strategy == "ewma":
+            # Backends without samples yet are tried first
+            def score(candidate):
+                stats = self._get_stats(candidate[0])
+                latency = stats.ewma_latency or 0.0
+                return latency * (stats.in_flight + 1) / max(candidate[1], 1e-6)
+
+        else:
+
+            def score(candidate):
+                stats = self._get_stats(candidate[0])
+                return stats.in_flight / max(candidate[1], 1e-6)
+
+        best = min(score(candidate) for candidate in candidates)
+        return random.choice(
+            [candidate for candidate in candidates if score(candidate) == best]
+        )[0]
+
+    def acquire(self, url: str) -> float:
+        stats = self._get_stats(url)
+        stats.in_flight += 1
+        stats.requests += 1
+        return time.monotonic()
+
+    def record_latency(self, url: str, started: float):
+        stats = self._get_stats(url)
+        latency = time.monotonic() - started
+        stats.ewma_latency = (
+            latency
+            if stats.ewma_latency is None
+            else self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+        )
+
+    def release(self, url: str, error: Optional[str] = None):
+        stats = self._get_stats(url)
+        stats.in_flight = max(stats.in_flight - 1, 0)
+
+        if error is None:
+            stats.consecutive_failures = 0
+            return
+
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.last_error = error
+
+        if stats.consecutive_failures >= self.max_failures:
+            log.warning(
+                f"Marking {url} unhealthy for {self.cooldown}s after {stats.consecutive_failures} failures: {error}"
+            )
+            stats.unhealthy_until = time.monotonic() + self.cooldown
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "backends": {
+                url: stats.model_dump(now) for url, stats in self.backends.items()
+            },
+        }
+
+
+OLLAMA_LOAD_BALANCER = LoadBalancer()
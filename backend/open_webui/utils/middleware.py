@@ -6,9 +6,10 @@ import base64
 
 import asyncio
 from aiocache import cached
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 import random
 import json
+import copy
 import html
 import inspect
 import re
@@ -22,12 +23,14 @@ from fastapi import Request, HTTPException
 from starlette.responses import Response, StreamingResponse
 
 
+from open_webui.internal.db import run_in_db_executor
 from open_webui.models.chats import Chats
 from open_webui.models.users import Users
 from open_webui.socket.main import (
     get_event_call,
     get_event_emitter,
     get_active_status_by_user_id,
+    get_session_ids_by_user_id,
 )
 from open_webui.routers.tasks import (
     generate_queries,
@@ -69,8 +72,9 @@ from open_webui.utils.misc import (
     convert_logit_bias_input_to_json,
 )
 from open_webui.utils.tools import get_tools
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.chat_buffer import MessageWriteBuffer
 from open_webui.utils.filter import (
+    get_filter_pipeline,
     get_sorted_filter_ids,
     process_filter_functions,
 )
@@ -370,55 +374,55 @@ async def chat_web_search_handler(
             }
         )
 
-        try:
-            results = await process_web_search(
-                request,
-                SearchForm(
-                    **{
-                        "query": searchQuery,
-                    }
-                ),
-                user=user,
-            )
+    try:
+        results = await process_web_search(
+            request,
+            SearchForm(
+                **{
+                    "queries": queries,
+                }
+            ),
+            user=user,
+        )
 
-            if results:
-                all_results.append(results)
-                files = form_data.get("files", [])
+        if results:
+            all_results.append(results)
+            files = form_data.get("files", [])
 
-                if results.get("collection_name"):
-                    files.append(
-                        {
-                            "collection_name": results["collection_name"],
-                            "name": searchQuery,
-                            "type": "web_search",
-                            "urls": results["filenames"],
-                        }
-                    )
-                elif results.get("docs"):
-                    files.append(
-                        {
-                            "docs": results.get("docs", []),
-                            "name": searchQuery,
-                            "type": "web_search",
-                            "urls": results["filenames"],
-                        }
-                    )
+            if results.get("collection_name"):
+                files.append(
+                    {
+                        "collection_name": results["collection_name"],
+                        "name": ", ".join(queries),
+                        "type": "web_search",
+                        "urls": results["filenames"],
+                    }
+                )
+            elif results.get("docs"):
+                files.append(
+                    {
+                        "docs": results.get("docs", []),
+                        "name": ", ".join(queries),
+                        "type": "web_search",
+                        "urls": results["filenames"],
+                    }
+                )
 
-                form_data["files"] = files
-        except Exception as e:
-            log.exception(e)
-            await event_emitter(
-                {
-                    "type": "status",
-                    "data": {
-                        "action": "web_search",
-                        "description": 'Error searching "{{searchQuery}}"',
-                        "query": searchQuery,
-                        "done": True,
-                        "error": True,
-                    },
-                }
-            )
+            form_data["files"] = files
+    except Exception as e:
+        log.exception(e)
+        await event_emitter(
+            {
+                "type": "status",
+                "data": {
+                    "action": "web_search",
+                    "description": 'Error searching "{{searchQuery}}"',
+                    "query": ", ".join(queries),
+                    "done": True,
+                    "error": True,
+                },
+            }
+        )
 
     if all_results:
         urls = []
@@ -750,8 +754,8 @@ async def process_chat_payload(request, form_data, user, metadata, model):
 
     try:
         filter_functions = [
-            Functions.get_function_by_id(filter_id)
-            for filter_id in get_sorted_filter_ids(model)
+            await Functions.get_function_by_id_async(filter_id)
+            for filter_id in await run_in_db_executor(get_sorted_filter_ids, model)
         ]
 
         form_data, flags = await process_filter_functions(
@@ -919,11 +923,97 @@ async def process_chat_payload(request, form_data, user, metadata, model):
     return form_data, metadata, events
 
 
+class ContentEventBuilder:
+    """
+    Build the chat:completion payloads of a streamed message.
+
+    While only the last block changes, a delta is sent with the block index and the
+    offset into the serialized message content from which it replaces the rest. A full
+    snapshot is sent whenever the earlier blocks or the block type change, or when a
+    new session of the user has connected since the last snapshot.
+    """
+
+    def __init__(
+        self,
+        serialize: Callable[[list], str],
+        get_session_ids: Callable[[], list[str]],
+    ):
+        self.serialize = serialize
+        self.get_session_ids = get_session_ids
+
+        # Copy of the earlier blocks, to notice them being modified in place
+        self.head_blocks: Optional[list] = None
+        self.type: Optional[str] = None
+        self.joiner: Optional[str] = None
+        self.head_length = 0
+        self.tail = ""
+        self.session_ids: Optional[set] = None
+        self.session_checked_at = 0.0
+
+    def _sessions_changed(self) -> bool:
+        now = time.monotonic()
+        if now - self.session_checked_at < 1:
+            return False
+
+        self.session_checked_at = now
+        session_ids = set(self.get_session_ids())
+        changed = self.session_ids is not None and not session_ids <= self.session_ids
+        self.session_ids = session_ids
+        return changed
+
+    def get_data(self, content_blocks: list[dict]) -> dict:
+        head_blocks = content_blocks[:-1]
+        block = content_blocks[-1]
+
+        sessions_changed = self._sessions_changed()
+        same_blocks = (
+            self.head_blocks is not None
+            and self.type == block["type"]
+            and self.head_blocks == head_blocks
+        )
+
+        block_content = self.serialize([block])
+
+        if not same_blocks or sessions_changed or self.joiner is None:
+            content = self.serialize(content_blocks)
+            head = self.serialize(head_blocks)
+
+            self.head_blocks = copy.deepcopy(head_blocks)
+            self.type = block["type"]
+            self.head_length = len(head)
+            self.tail = block_content
+            self.joiner = (
+                content[len(head) : len(content) - len(block_content)]
+                if block_content
+                and content.startswith(head)
+                and content.endswith(block_content)
+                else None
+            )
+            return {"content": content}
+
+        # Serialized blocks end with a newline or closing tag, so only the part after
+        # what they have in common with the previous event is sent
+        common = len(os.path.commonprefix([self.tail, block_content]))
+        offset = self.head_length + len(self.joiner) + common
+        delta = block_content[common:]
+
+        self.tail = block_content
+        return {
+            "delta": {
+                "index": len(head_blocks),
+                "offset": offset,
+                "content": delta,
+            }
+        }
+
+
 async def process_chat_response(
     request, response, form_data, user, metadata, model, events, tasks
 ):
     async def background_tasks_handler():
-        message_map = Chats.get_messages_by_chat_id(metadata["chat_id"])
+        message_map = await run_in_db_executor(
+            Chats.get_messages_by_chat_id, metadata["chat_id"]
+        )
         message = message_map.get(metadata["message_id"]) if message_map else None
 
         if message:
@@ -966,7 +1056,11 @@ async def process_chat_response(
                             if not title:
                                 title = messages[0].get("content", "New Chat")
 
-                            Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                            await run_in_db_executor(
+                                Chats.update_chat_title_by_id,
+                                metadata["chat_id"],
+                                title,
+                            )
 
                             await event_emitter(
                                 {
@@ -977,7 +1071,9 @@ async def process_chat_response(
                     elif len(messages) == 2:
                         title = messages[0].get("content", "New Chat")
 
-                        Chats.update_chat_title_by_id(metadata["chat_id"], title)
+                        await run_in_db_executor(
+                            Chats.update_chat_title_by_id, metadata["chat_id"], title
+                        )
 
                         await event_emitter(
                             {
@@ -1013,8 +1109,11 @@ async def process_chat_response(
 
                         try:
                             tags = json.loads(tags_string).get("tags", [])
-                            Chats.update_chat_tags_by_id(
-                                metadata["chat_id"], tags, user
+                            await run_in_db_executor(
+                                Chats.update_chat_tags_by_id,
+                                metadata["chat_id"],
+                                tags,
+                                user,
                             )
 
                             await event_emitter(
@@ -1044,7 +1143,7 @@ async def process_chat_response(
         if event_emitter:
             if "error" in response:
                 error = response["error"].get("detail", response["error"])
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     metadata["chat_id"],
                     metadata["message_id"],
                     {
@@ -1053,7 +1152,7 @@ async def process_chat_response(
                 )
 
             if "selected_model_id" in response:
-                Chats.upsert_message_to_chat_by_id_and_message_id(
+                await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                     metadata["chat_id"],
                     metadata["message_id"],
                     {
@@ -1074,7 +1173,7 @@ async def process_chat_response(
                         }
                     )
 
-                    title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                    title = await Chats.get_chat_title_by_id_async(metadata["chat_id"])
 
                     await event_emitter(
                         {
@@ -1088,7 +1187,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1098,7 +1197,9 @@ async def process_chat_response(
 
                     # Send a webhook notification if the user is not active
                     if get_active_status_by_user_id(user.id) is None:
-                        webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                        webhook_url = await Users.get_user_webhook_url_by_id_async(
+                            user.id
+                        )
                         if webhook_url:
                             post_webhook(
                                 request.app.state.WEBUI_NAME,
@@ -1139,8 +1240,8 @@ async def process_chat_response(
         "__model__": model,
     }
     filter_functions = [
-        Functions.get_function_by_id(filter_id)
-        for filter_id in get_sorted_filter_ids(model)
+        await Functions.get_function_by_id_async(filter_id)
+        for filter_id in await run_in_db_executor(get_sorted_filter_ids, model)
     ]
 
     # Streaming response
@@ -1148,7 +1249,7 @@ async def process_chat_response(
         task_id = str(uuid4())  # Create a unique task ID.
         model_id = form_data.get("model", "")
 
-        Chats.upsert_message_to_chat_by_id_and_message_id(
+        await Chats.upsert_message_to_chat_by_id_and_message_id_async(
             metadata["chat_id"],
             metadata["message_id"],
             {
@@ -1323,6 +1424,11 @@ async def process_chat_response(
 
                 return messages
 
+            get_content_event_data = ContentEventBuilder(
+                serialize_content_blocks,
+                lambda: get_session_ids_by_user_id(user.id),
+            ).get_data
+
             def tag_content_handler(content_type, tags, content, content_blocks):
                 end_flag = False
 
@@ -1470,7 +1576,7 @@ async def process_chat_response(
 
                 return content, content_blocks, end_flag
 
-            message = Chats.get_message_by_id_and_message_id(
+            message = await Chats.get_message_by_id_and_message_id_async(
                 metadata["chat_id"], metadata["message_id"]
             )
 
@@ -1519,6 +1625,10 @@ async def process_chat_response(
 
             solution_tags = [("|begin_of_solution|", "|end_of_solution|")]
 
+            message_write_buffer = MessageWriteBuffer(
+                metadata["chat_id"], metadata["message_id"]
+            )
+
             try:
                 for event in events:
                     await event_emitter(
@@ -1529,7 +1639,7 @@ async def process_chat_response(
                     )
 
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -1537,6 +1647,13 @@ async def process_chat_response(
                         },
                     )
 
+                stream_filter_pipeline = await get_filter_pipeline(
+                    request=request,
+                    filter_functions=filter_functions,
+                    filter_type="stream",
+                    extra_params=extra_params,
+                )
+
                 async def stream_body_handler(response):
                     nonlocal content
                     nonlocal content_blocks
@@ -1561,18 +1678,12 @@ async def process_chat_response(
                         try:
                             data = json.loads(data)
 
-                            data, _ = await process_filter_functions(
-                                request=request,
-                                filter_functions=filter_functions,
-                                filter_type="stream",
-                                form_data=data,
-                                extra_params=extra_params,
-                            )
+                            data = await stream_filter_pipeline.run(data)
 
                             if data:
                                 if "selected_model_id" in data:
                                     model_id = data["selected_model_id"]
-                                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                                         metadata["chat_id"],
                                         metadata["message_id"],
                                         {
@@ -1671,11 +1782,7 @@ async def process_chat_response(
 
                                         reasoning_block["content"] += reasoning_content
 
-                                        data = {
-                                            "content": serialize_content_blocks(
-                                                content_blocks
-                                            )
-                                        }
+                                        data = get_content_event_data(content_blocks)
 
                                     if value:
                                         if (
@@ -1749,21 +1856,17 @@ async def process_chat_response(
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
                                             # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
-                                                metadata["chat_id"],
-                                                metadata["message_id"],
+                                            await message_write_buffer.write(
                                                 {
                                                     "content": serialize_content_blocks(
                                                         content_blocks
                                                     ),
-                                                },
+                                                }
                                             )
                                         else:
-                                            data = {
-                                                "content": serialize_content_blocks(
-                                                    content_blocks
-                                                ),
-                                            }
+                                            data = get_content_event_data(
+                                                content_blocks
+                                            )
 
                                 await event_emitter(
                                     {
@@ -2132,16 +2235,22 @@ async def process_chat_response(
                             log.debug(e)
                             break
 
-                title = Chats.get_chat_title_by_id(metadata["chat_id"])
+                title = await Chats.get_chat_title_by_id_async(metadata["chat_id"])
                 data = {
                     "done": True,
                     "content": serialize_content_blocks(content_blocks),
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    await message_write_buffer.flush(
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        }
+                    )
+                else:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2151,7 +2260,7 @@ async def process_chat_response(
 
                 # Send a webhook notification if the user is not active
                 if get_active_status_by_user_id(user.id) is None:
-                    webhook_url = Users.get_user_webhook_url_by_id(user.id)
+                    webhook_url = await Users.get_user_webhook_url_by_id_async(user.id)
                     if webhook_url:
                         post_webhook(
                             request.app.state.WEBUI_NAME,
@@ -2177,9 +2286,15 @@ async def process_chat_response(
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "task-cancelled"})
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    await message_write_buffer.flush(
+                        {
+                            "content": serialize_content_blocks(content_blocks),
+                        }
+                    )
+                else:
                     # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
+                    await Chats.upsert_message_to_chat_by_id_and_message_id_async(
                         metadata["chat_id"],
                         metadata["message_id"],
                         {
@@ -2200,26 +2315,21 @@ async def process_chat_response(
             def wrap_item(item):
                 return f"data: {item}\n\n"
 
+            stream_filter_pipeline = await get_filter_pipeline(
+                request=request,
+                filter_functions=filter_functions,
+                filter_type="stream",
+                extra_params=extra_params,
+            )
+
             for event in events:
-                event, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=event,
-                    extra_params=extra_params,
-                )
+                event = await stream_filter_pipeline.run(event)
 
                 if event:
                     yield wrap_item(json.dumps(event))
 
             async for data in original_generator:
-                data, _ = await process_filter_functions(
-                    request=request,
-                    filter_functions=filter_functions,
-                    filter_type="stream",
-                    form_data=data,
-                    extra_params=extra_params,
-                )
+                data = await stream_filter_pipeline.run(data)
 
                 if data:
                     yield data
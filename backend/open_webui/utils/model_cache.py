@@ -0,0 +1,160 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from open_webui.env import (
+    MODEL_LIST_CACHE_TTL,
+    MODEL_LIST_CACHE_MAX_STALE,
+    MODEL_LIST_CACHE_REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MODELS"])
+
+
+class ModelListCache:
+    """
+    Cache of the model lists returned by each upstream connection.
+
+    Lists are keyed by connection (URL, API key and the user when user info headers are
+    forwarded). Fresh lists are served as is; stale ones are served while a single
+    background task refreshes them. A failed refresh keeps the last good list, so one
+    slow or broken upstream doesn't empty the catalog of the others. When a Redis URL is
+    configured, lists are stored there instead so that all instances share them.
+    """
+
+    def __init__(
+        self,
+        ttl: float = MODEL_LIST_CACHE_TTL,
+        max_stale: float = MODEL_LIST_CACHE_MAX_STALE,
+        redis_url: str = MODEL_LIST_CACHE_REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.entries: dict[str, dict] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        # Bumped on invalidation, so that refreshes started before it are not stored
+        self.generation = 0
+
+        self.redis = None
+        if redis_url:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+            except Exception as e:
+                log.exception(f"Error connecting to model list cache Redis: {e}")
+
+    @staticmethod
+    def get_key(*parts) -> str:
+        return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+    async def _get_entry(self, key: str) -> Optional[dict]:
+        if self.redis is None:
+            return self.entries.get(key)
+
+        try:
+            entry = await asyncio.to_thread(self.redis.get, f"open-webui:models:{key}")
+            return json.loads(entry) if entry else None
+        except Exception as e:
+            log.error(f"Error reading model list cache: {e}")
+            return self.entries.get(key)
+
+    async def _set_entry(self, key: str, entry: dict):
+        self.entries[key] = entry
+        if self.redis is None:
+            return
+
+        try:
+            await asyncio.to_thread(
+                self.redis.set,
+                f"open-webui:models:{key}",
+                json.dumps(entry),
+                ex=int(self.ttl + self.max_stale),
+            )
+        except Exception as e:
+            log.error(f"Error writing model list cache: {e}")
+
+    async def _refresh(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Optional[dict]]],
+        entry: Optional[dict],
+        generation: int,
+    ) -> Optional[dict]:
+        data = await fetch()
+
+        if data is None or (isinstance(data, dict) and "error" in data):
+            if entry is not None:
+                log.warning("Model list refresh failed, serving the last good list")
+                return entry["data"]
+            return data
+
+        if generation == self.generation:
+            await self._set_entry(key, {"data": data, "fetched_at": time.time()})
+        return data
+
+    def _start_refresh(self, key, fetch, entry) -> asyncio.Task:
+        # Share a single upstream request between concurrent callers
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._refresh(key, fetch, entry, self.generation)
+            )
+
+            def done(_):
+                # Unless replaced by a refresh started after an invalidation
+                if self.tasks.get(key) is task:
+                    del self.tasks[key]
+
+            task.add_done_callback(done)
+            self.tasks[key] = task
+        return task
+
+    async def get(
+        self, key: str, fetch: Callable[[], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        """
+        Return the cached model list of `key`, calling `fetch` to load or refresh it.
+        The result is a copy, callers are free to modify it.
+        """
+        entry = await self._get_entry(key)
+        age = time.time() - entry["fetched_at"] if entry else None
+
+        if entry is None or age > self.ttl + self.max_stale:
+            data = await asyncio.shield(self._start_refresh(key, fetch, entry))
+        else:
+            if age > self.ttl:
+                self._start_refresh(key, fetch, entry)
+            data = entry["data"]
+
+        return copy.deepcopy(data)
+
+    async def invalidate(self):
+        # Refreshes in flight may return the list from before the change
+        self.generation += 1
+        self.tasks = {}
+        self.entries = {}
+        if self.redis is None:
+            return
+
+        try:
+            keys = await asyncio.to_thread(
+                lambda: list(self.redis.scan_iter("open-webui:models:*"))
+            )
+            if keys:
+                await asyncio.to_thread(self.redis.delete, *keys)
+        except Exception as e:
+            log.error(f"Error clearing model list cache: {e}")
+
+
+MODEL_LIST_CACHE = ModelListCache(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
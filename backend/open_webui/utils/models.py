@@ -13,7 +13,7 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 
 
-from open_webui.utils.plugin import load_function_module_by_id
+from open_webui.utils.function_registry import FUNCTION_REGISTRY
 from open_webui.utils.access_control import has_access
 
 
@@ -102,48 +102,53 @@ async def get_all_models(request, user: UserModel = None):
             ]
         models = models + arena_models
 
-    global_action_ids = [
-        function.id for function in Functions.get_global_action_functions()
-    ]
-    enabled_action_ids = [
-        function.id
+    # Load every action function once, instead of once per model and action
+    action_functions = {
+        function.id: function
         for function in Functions.get_functions_by_type("action", active_only=True)
+    }
+    global_action_ids = [
+        function.id for function in action_functions.values() if function.is_global
     ]
 
+    # Index the models by id, and by id without the tag (e.g. "llama3" for
+    # "llama3:latest"), so custom models are matched without scanning the list
+    models_by_id = {}
+
+    def index_model(model):
+        for model_id in dict.fromkeys([model["id"], model["id"].split(":")[0]]):
+            models_by_id.setdefault(model_id, []).append(model)
+
+    for model in models:
+        index_model(model)
+
+    removed_model_ids = set()
     custom_models = Models.get_all_models()
     for custom_model in custom_models:
         if custom_model.base_model_id is None:
-            for model in models:
-                if (
-                    custom_model.id == model["id"]
-                    or custom_model.id == model["id"].split(":")[0]
-                ):
-                    if custom_model.is_active:
-                        model["name"] = custom_model.name
-                        model["info"] = custom_model.model_dump()
-
-                        action_ids = []
-                        if "info" in model and "meta" in model["info"]:
-                            action_ids.extend(
-                                model["info"]["meta"].get("actionIds", [])
-                            )
-
-                        model["action_ids"] = action_ids
-                    else:
-                        models.remove(model)
-
-        elif custom_model.is_active and (
-            custom_model.id not in [model["id"] for model in models]
+            for model in models_by_id.get(custom_model.id, []):
+                if custom_model.is_active:
+                    model["name"] = custom_model.name
+                    model["info"] = custom_model.model_dump()
+
+                    action_ids = []
+                    if "info" in model and "meta" in model["info"]:
+                        action_ids.extend(model["info"]["meta"].get("actionIds", []))
+
+                    model["action_ids"] = action_ids
+                else:
+                    removed_model_ids.add(model["id"])
+
+        elif custom_model.is_active and not any(
+            model["id"] == custom_model.id
+            for model in models_by_id.get(custom_model.id, [])
         ):
             owned_by = "openai"
             pipe = None
             action_ids = []
 
-            for model in models:
-                if (
-                    custom_model.base_model_id == model["id"]
-                    or custom_model.base_model_id == model["id"].split(":")[0]
-                ):
+            for model in models_by_id.get(custom_model.base_model_id, []):
+                if model["id"] not in removed_model_ids:
                     owned_by = model.get("owned_by", "unknown owner")
                     if "pipe" in model:
                         pipe = model["pipe"]
@@ -154,19 +159,22 @@ async def get_all_models(request, user: UserModel = None):
                 if "actionIds" in meta:
                     action_ids.extend(meta["actionIds"])
 
-            models.append(
-                {
-                    "id": f"{custom_model.id}",
-                    "name": custom_model.name,
-                    "object": "model",
-                    "created": custom_model.created_at,
-                    "owned_by": owned_by,
-                    "info": custom_model.model_dump(),
-                    "preset": True,
-                    **({"pipe": pipe} if pipe is not None else {}),
-                    "action_ids": action_ids,
-                }
-            )
+            model = {
+                "id": f"{custom_model.id}",
+                "name": custom_model.name,
+                "object": "model",
+                "created": custom_model.created_at,
+                "owned_by": owned_by,
+                "info": custom_model.model_dump(),
+                "preset": True,
+                **({"pipe": pipe} if pipe is not None else {}),
+                "action_ids": action_ids,
+            }
+            models.append(model)
+            index_model(model)
+
+    if removed_model_ids:
+        models = [model for model in models if model["id"] not in removed_model_ids]
 
     # Process action_ids to get the actions
     def get_action_items_from_module(function, module):
@@ -194,30 +202,21 @@ async def get_all_models(request, user: UserModel = None):
                 }
             ]
 
-    def get_function_module_by_id(function_id):
-        if function_id in request.app.state.FUNCTIONS:
-            function_module = request.app.state.FUNCTIONS[function_id]
-        else:
-            function_module, _, _ = load_function_module_by_id(function_id)
-            request.app.state.FUNCTIONS[function_id] = function_module
-
+    action_items = {}
     for model in models:
         action_ids = [
             action_id
             for action_id in list(set(model.pop("action_ids", []) + global_action_ids))
-            if action_id in enabled_action_ids
+            if action_id in action_functions
         ]
 
         model["actions"] = []
         for action_id in action_ids:
-            action_function = Functions.get_function_by_id(action_id)
-            if action_function is None:
-                raise Exception(f"Action not found: {action_id}")
-
-            function_module = get_function_module_by_id(action_id)
-            model["actions"].extend(
-                get_action_items_from_module(action_function, function_module)
-            )
+            if action_id not in action_items:
+                action_items[action_id] = get_action_items_from_module(
+                    action_functions[action_id], FUNCTION_REGISTRY.get(action_id)
+                )
+            model["actions"].extend(action_items[action_id])
     log.debug(f"get_all_models() returned {len(models)} models")
 
     request.app.state.MODELS = {model["id"]: model for model in models}
@@ -1,12 +1,16 @@
-import os
+import hashlib
+import marshal
 import re
 import subprocess
 import sys
+import time
+import uuid
+from functools import lru_cache
 from importlib import util
 import types
-import tempfile
 import logging
 
+from open_webui.config import CACHE_DIR
 from open_webui.env import SRC_LOG_LEVELS, PIP_OPTIONS, PIP_PACKAGE_INDEX_OPTIONS
 from open_webui.models.functions import Functions
 from open_webui.models.tools import Tools
@@ -14,6 +18,10 @@ from open_webui.models.tools import Tools
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+# Seconds the cached files of other versions of a module are kept, since other workers
+# may still be loading them
+MODULE_CACHE_MAX_AGE = 24 * 60 * 60
+
 
 def extract_frontmatter(content):
     """
@@ -68,6 +76,79 @@ def replace_imports(content):
     return content
 
 
+def get_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def compile_module_content(module_name: str, content: str) -> types.CodeType:
+    """
+    Compile the content of a tool or function module.
+
+    The source is stored under the cache directory so that `__file__` and tracebacks
+    point to a real file, next to its bytecode, which is reused by later loads and by
+    the other workers until the content changes.
+    """
+    content_hash = get_content_hash(content)
+    module_dir = CACHE_DIR / "modules" / module_name
+    source_path = module_dir / f"{content_hash}.py"
+    bytecode_path = module_dir / f"{content_hash}.{sys.implementation.cache_tag}.pyc"
+
+    try:
+        code = marshal.loads(bytecode_path.read_bytes())
+        if isinstance(code, types.CodeType):
+            return code
+        log.warning(f"Ignoring invalid bytecode cache {bytecode_path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning(f"Ignoring invalid bytecode cache {bytecode_path}: {e}")
+
+    code = compile(content, str(source_path), "exec")
+
+    try:
+        module_dir.mkdir(parents=True, exist_ok=True)
+        # Drop the files of other versions of the module that were not written lately
+        expired_at = time.time() - MODULE_CACHE_MAX_AGE
+        for path in module_dir.iterdir():
+            if not path.name.startswith(content_hash):
+                try:
+                    if path.stat().st_mtime < expired_at:
+                        path.unlink()
+                except FileNotFoundError:
+                    pass
+
+        # Write to temporary files first, so other workers never read a partial file
+        for path, data in [
+            (source_path, content.encode("utf-8")),
+            (bytecode_path, marshal.dumps(code)),
+        ]:
+            temp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+    except Exception as e:
+        log.warning(f"Error caching bytecode of {module_name}: {e}")
+
+    return code
+
+
+def exec_module_content(module_name: str, content: str) -> types.ModuleType:
+    module = types.ModuleType(module_name)
+    sys.modules[module_name] = module
+
+    try:
+        code = compile_module_content(module_name, content)
+        module.__dict__["__file__"] = code.co_filename
+
+        # Execute the content in the created module's namespace
+        exec(code, module.__dict__)
+        log.info(f"Loaded module: {module.__name__}")
+        return module
+    except Exception:
+        del sys.modules[module_name]  # Clean up
+        raise
+
+
 def load_tools_module_by_id(toolkit_id, content=None):
 
     if content is None:
@@ -75,32 +156,17 @@ def load_tools_module_by_id(toolkit_id, content=None):
         if not tool:
             raise Exception(f"Toolkit not found: {toolkit_id}")
 
-        content = tool.content
-
-        content = replace_imports(content)
-        Tools.update_tool_by_id(toolkit_id, {"content": content})
+        content = replace_imports(tool.content)
+        if content != tool.content:
+            Tools.update_tool_by_id(toolkit_id, {"content": content})
     else:
         frontmatter = extract_frontmatter(content)
         # Install required packages found within the frontmatter
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
-    module_name = f"tool_{toolkit_id}"
-    module = types.ModuleType(module_name)
-    sys.modules[module_name] = module
-
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
-
-        # Executing the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        module = exec_module_content(f"tool_{toolkit_id}", content)
         frontmatter = extract_frontmatter(content)
-        log.info(f"Loaded module: {module.__name__}")
 
         # Create and return the object if the class 'Tools' is found in the module
         if hasattr(module, "Tools"):
@@ -109,10 +175,7 @@ def load_tools_module_by_id(toolkit_id, content=None):
             raise Exception("No Tools class found in the module")
     except Exception as e:
         log.error(f"Error loading module: {toolkit_id}: {e}")
-        del sys.modules[module_name]  # Clean up
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
 def load_function_module_by_id(function_id, content=None):
@@ -120,31 +183,17 @@ def load_function_module_by_id(function_id, content=None):
         function = Functions.get_function_by_id(function_id)
         if not function:
             raise Exception(f"Function not found: {function_id}")
-        content = function.content
 
-        content = replace_imports(content)
-        Functions.update_function_by_id(function_id, {"content": content})
+        content = replace_imports(function.content)
+        if content != function.content:
+            Functions.update_function_by_id(function_id, {"content": content})
     else:
         frontmatter = extract_frontmatter(content)
         install_frontmatter_requirements(frontmatter.get("requirements", ""))
 
-    module_name = f"function_{function_id}"
-    module = types.ModuleType(module_name)
-    sys.modules[module_name] = module
-
-    # Create a temporary file and use it to define `__file__` so
-    # that it works as expected from the module's perspective.
-    temp_file = tempfile.NamedTemporaryFile(delete=False)
-    temp_file.close()
     try:
-        with open(temp_file.name, "w", encoding="utf-8") as f:
-            f.write(content)
-        module.__dict__["__file__"] = temp_file.name
-
-        # Execute the modified content in the created module's namespace
-        exec(content, module.__dict__)
+        module = exec_module_content(f"function_{function_id}", content)
         frontmatter = extract_frontmatter(content)
-        log.info(f"Loaded module: {module.__name__}")
 
         # Create appropriate object based on available class type in the module
         if hasattr(module, "Pipe"):
@@ -157,12 +206,8 @@ def load_function_module_by_id(function_id, content=None):
             raise Exception("No Function class found in the module")
     except Exception as e:
         log.error(f"Error loading module: {function_id}: {e}")
-        del sys.modules[module_name]  # Cleanup by removing the module in case of error
-
         Functions.update_function_by_id(function_id, {"is_active": False})
         raise e
-    finally:
-        os.unlink(temp_file.name)
 
 
 def install_frontmatter_requirements(requirements: str):
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from open_webui.env import (
+    AUTH_PRINCIPAL_CACHE_TTL,
+    AUTH_PRINCIPAL_CACHE_MAX_SIZE,
+    REDIS_URL,
+    REDIS_SENTINEL_HOSTS,
+    REDIS_SENTINEL_PORT,
+    SRC_LOG_LEVELS,
+)
+from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["OAUTH"])
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of the users resolved from JWTs and API keys, keyed by the hash
+    of the token.
+
+    Entries of a user are dropped whenever the user is updated or deleted, so role
+    changes and API key rotations apply immediately. When a Redis URL is configured,
+    entries are stored there so that invalidations reach all workers. The credentials
+    of the user are never cached.
+    """
+
+    SECRET_FIELDS = {"api_key", "oauth_sub"}
+
+    def __init__(
+        self,
+        ttl: int = AUTH_PRINCIPAL_CACHE_TTL,
+        max_size: int = AUTH_PRINCIPAL_CACHE_MAX_SIZE,
+        redis_url: str = REDIS_URL,
+        redis_sentinels: Optional[list] = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.user_keys: dict[str, set[str]] = {}
+        self.lock = threading.Lock()
+
+        self.redis = None
+        if redis_url and self.ttl > 0:
+            try:
+                self.redis = get_redis_connection(redis_url, redis_sentinels)
+            except Exception as e:
+                log.exception(f"Error connecting to principal cache Redis: {e}")
+
+    @staticmethod
+    def get_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        if self.ttl <= 0:
+            return None
+
+        key = self.get_key(token)
+        if self.redis is not None:
+            try:
+                user = self.redis.get(f"open-webui:principal:{key}")
+                return json.loads(user) if user else None
+            except Exception as e:
+                log.error(f"Error reading principal cache: {e}")
+                return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, token: str, user: dict):
+        if self.ttl <= 0:
+            return
+
+        user = {
+            field: value
+            for field, value in user.items()
+            if field not in self.SECRET_FIELDS
+        }
+
+        key = self.get_key(token)
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline()
+                pipeline.set(
+                    f"open-webui:principal:{key}", json.dumps(user), ex=self.ttl
+                )
+                pipeline.sadd(f"open-webui:principal:user:{user['id']}", key)
+                pipeline.expire(f"open-webui:principal:user:{user['id']}", self.ttl)
+                pipeline.execute()
+            except Exception as e:
+                log.error(f"Error writing principal cache: {e}")
+            return
+
+        with self.lock:
+            self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, user)
+            self.user_keys.setdefault(user["id"], set()).add(key)
+
+            while len(self.entries) > self.max_size:
+                self._remove(next(iter(self.entries)))
+
+    async def get_async(self, token: str) -> Optional[dict]:
+        # Keep Redis round trips off the event loop
+        if self.redis is None:
+            return self.get(token)
+        return await asyncio.to_thread(self.get, token)
+
+    async def set_async(self, token: str, user: dict):
+        if self.redis is None:
+            return self.set(token, user)
+        await asyncio.to_thread(self.set, token, user)
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            user_id = entry[1]["id"]
+            keys = self.user_keys.get(user_id, set())
+            keys.discard(key)
+            if not keys:
+                self.user_keys.pop(user_id, None)
+
+    def invalidate_token(self, token: str):
+        key = self.get_key(token)
+        if self.redis is not None:
+            try:
+                self.redis.delete(f"open-webui:principal:{key}")
+            except Exception as e:
+                log.error(f"Error clearing principal cache: {e}")
+            return
+
+        with self.lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id: str):
+        if self.redis is not None:
+            try:
+                keys = self.redis.smembers(f"open-webui:principal:user:{user_id}")
+                self.redis.delete(
+                    f"open-webui:principal:user:{user_id}",
+                    *[f"open-webui:principal:{key}" for key in keys],
+                )
+            except Exception as e:
+                log.error(f"Error clearing principal cache: {e}")
+            return
+
+        with self.lock:
+            for key in list(self.user_keys.get(user_id, [])):
+                self._remove(key)
+
+
+PRINCIPAL_CACHE = PrincipalCache(
+    redis_sentinels=get_sentinels_from_env(REDIS_SENTINEL_HOSTS, REDIS_SENTINEL_PORT)
+)
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import weakref
+from urllib.parse import urlparse
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_LIMIT_PER_HOST,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    SRC_LOG_LEVELS,
+)
+
+log = logging.getLogger(__name__)
+log.setLevel(SRC_LOG_LEVELS["MAIN"])
+
+
+class ClientSessionPool:
+    """
+    Application-lifetime aiohttp sessions, one per upstream base URL.
+
+    Reusing a session keeps its connections alive between requests, so calls to the
+    same upstream skip DNS, TCP and TLS setup. Timeouts are set per request since the
+    sessions are shared, and cookies are not kept since the sessions serve all users.
+    """
+
+    def __init__(
+        self,
+        limit_per_host: int = AIOHTTP_CLIENT_LIMIT_PER_HOST,
+        keepalive_timeout: float = AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    ):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        # Sessions are bound to the event loop they were created in
+        self.sessions: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, aiohttp.ClientSession]
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_key(self, url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        key = self._get_key(url)
+        sessions = self.sessions.setdefault(asyncio.get_running_loop(), {})
+        session = sessions.get(key)
+
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300,
+                ),
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trust_env=True,
+            )
+            sessions[key] = session
+            log.debug(f"Created client session for {key}")
+
+        return session
+
+    async def close(self):
+        sessions = self.sessions.pop(asyncio.get_running_loop(), {})
+        # Sessions of other loops cannot be closed from this one
+        self.sessions.clear()
+        for key, session in sessions.items():
+            try:
+                await session.close()
+            except Exception as e:
+                log.error(f"Error closing client session for {key}: {e}")
+
+
+SESSION_POOL = ClientSessionPool()
+
+
+def get_session(url: str) -> aiohttp.ClientSession:
+    return SESSION_POOL.get_session(url)
@@ -16,22 +16,23 @@ from langchain_core.utils.function_calling import convert_to_openai_function
 from open_webui.models.tools import Tools
 from open_webui.models.users import UserModel
 from open_webui.utils.plugin import load_tools_module_by_id
+from open_webui.utils.function_executor import FUNCTION_EXECUTOR
 
 log = logging.getLogger(__name__)
 
 
 def apply_extra_params_to_tool_function(
-    function: Callable, extra_params: dict
+    function: Callable, extra_params: dict, tool_id: str
 ) -> Callable[..., Awaitable]:
     sig = inspect.signature(function)
     extra_params = {k: v for k, v in extra_params.items() if k in sig.parameters}
     partial_func = partial(function, **extra_params)
-    if inspect.iscoroutinefunction(function):
-        update_wrapper(partial_func, function)
-        return partial_func
 
+    # Sync tools run off the event loop, all tools under their toolkit's limits
     async def new_function(*args, **kwargs):
-        return partial_func(*args, **kwargs)
+        return await FUNCTION_EXECUTOR.run(
+            f"tool:{tool_id}", partial_func, *args, **kwargs
+        )
 
     update_wrapper(new_function, function)
     return new_function
@@ -81,7 +82,9 @@ def get_tools(
 
             # convert to function that takes only model params and inserts custom params
             original_func = getattr(module, function_name)
-            callable = apply_extra_params_to_tool_function(original_func, extra_params)
+            callable = apply_extra_params_to_tool_function(
+                original_func, extra_params, tool_id
+            )
 
             if callable.__doc__ and callable.__doc__.strip() != "":
                 s = re.split(":(param|return)", callable.__doc__, 1)